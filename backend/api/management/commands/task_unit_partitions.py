@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from api.models import BatchJob, BatchJobStatus
+from api.utils.partitions import PARTITIONED_TABLES, is_partitioning_supported, is_partitioned, get_partitions, \
+    ensure_partitions, detach_partitions
+
+
+# Usage:
+# python manage.py task_unit_partitions
+# python manage.py task_unit_partitions --create-ahead <partitions>
+# python manage.py task_unit_partitions --drop <start> [--archive]
+#
+# Example:
+# python manage.py task_unit_partitions --drop 0 --archive
+# This will detach the partitions of BatchJob 0-99 from task_unit, task_unit_response and task_unit_files,
+# keep them as archived_* tables and delete the BatchJobs. Without --archive, the partitions are dropped.
+class Command(BaseCommand):
+    help = 'Show, create or drop the batch_job_id range partitions of the task unit tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create-ahead', type=int, default=None,
+                            help='Create partitions for the next N ranges after the latest BatchJob')
+        parser.add_argument('--drop', type=int, default=None, metavar='START',
+                            help='Drop the partitions starting at this batch_job_id and delete their BatchJobs')
+        parser.add_argument('--archive', action='store_true',
+                            help='With --drop, keep the detached partitions as archived_* tables')
+
+    def handle(self, *args, **kwargs):
+        from backend import settings
+
+        if not is_partitioning_supported(connection):
+            raise CommandError('Partitioning is only supported on PostgreSQL.')
+
+        with connection.cursor() as cursor:
+            if not all(is_partitioned(cursor, table) for table in PARTITIONED_TABLES):
+                raise CommandError('The task unit tables are not partitioned. Run migrate first.')
+
+        latest_id = BatchJob.objects.aggregate(latest_id=Max('id'))['latest_id'] or 0
+
+        if kwargs['create_ahead'] is not None:
+            created = ensure_partitions(latest_id + kwargs['create_ahead'] * settings.TASK_UNIT_PARTITION_SIZE)
+            self.stdout.write(self.style.SUCCESS(f"{len(created)} partitions have been created."))
+
+        if kwargs['drop'] is not None:
+            self.drop_partitions(kwargs['drop'], latest_id, kwargs['archive'])
+
+        self.show_partitions()
+
+    def drop_partitions(self, start, latest_id, archive):
+        with connection.cursor() as cursor:
+            partitions = {partition[1]: partition for partition in get_partitions(cursor, 'task_unit')}
+
+        if start not in partitions:
+            raise CommandError(f'There is no partition starting at {start}.')
+
+        end = partitions[start][2]
+        if end > latest_id:
+            # 새로 만들어지는 BatchJob이 아직 이 파티션에 저장될 수 있음
+            raise CommandError(f'The partition {start}-{end - 1} still receives new BatchJobs.')
+
+        batch_jobs = BatchJob.objects.filter(id__gte=start, id__lt=end)
+        running = batch_jobs.filter(batch_job_status__in=[BatchJobStatus.PENDING, BatchJobStatus.IN_PROGRESS])
+        if running.exists():
+            raise CommandError(f'BatchJobs {list(running.values_list("id", flat=True))} are still running.')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            detached = detach_partitions(cursor, start, archive=archive)
+
+            # 파티션을 분리했으므로 TaskUnit 등을 하나씩 삭제하지 않고, 작업 폴더만 함께 삭제됨
+            for batch_job in batch_jobs:
+                batch_job.delete()
+
+        action = 'archived' if archive else 'dropped'
+        self.stdout.write(self.style.SUCCESS(f"{', '.join(detached)} have been {action}."))
+
+    def show_partitions(self):
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                self.stdout.write(self.style.SUCCESS(table))
+
+                for name, start, end in get_partitions(cursor, table):
+                    cursor.execute("SELECT reltuples::bigint, pg_total_relation_size(oid) FROM pg_class "
+                                   "WHERE relname = %s", [name])
+                    rows, size = cursor.fetchone()
+                    jobs = BatchJob.objects.filter(id__gte=start, id__lt=end).count()
+                    self.stdout.write(f"  {name}: batch_job_id {start}-{end - 1} jobs={jobs} "
+                                      f"rows~{max(rows, 0)} size={size / 1024 / 1024:.1f}MB")
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicated_task_units(apps, schema_editor):
+    """같은 BatchJob에 같은 unit_index를 가진 TaskUnit이 있다면 가장 최근 것만 남김"""
+    TaskUnit = apps.get_model('api', 'TaskUnit')
+
+    duplicates = (TaskUnit.objects
+                  .values('batch_job_id', 'unit_index')
+                  .annotate(count=Count('id'), latest_id=Max('id'))
+                  .filter(count__gt=1))
+
+    for duplicate in duplicates:
+        (TaskUnit.objects
+         .filter(batch_job_id=duplicate['batch_job_id'], unit_index=duplicate['unit_index'])
+         .exclude(id=duplicate['latest_id'])
+         .delete())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0015_taskunit_is_valid_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicated_task_units, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskunit',
+            constraint=models.UniqueConstraint(fields=('batch_job', 'unit_index'), name='unique_task_unit_per_batch'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0016_taskunit_unique_task_unit_per_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskunitresponse',
+            name='is_cached',
+            field=models.BooleanField(default=False, help_text='GPTResponseCache에 저장된 응답을 재사용했는지 여부', verbose_name='Is Cached'),
+        ),
+        migrations.CreateModel(
+            name='GPTResponseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('cache_key', models.CharField(help_text='요청 내용의 SHA-256 해시', max_length=64, unique=True, verbose_name='Cache Key')),
+                ('gpt_model', models.CharField(max_length=255, verbose_name='GPT Model')),
+                ('response_data', models.JSONField(help_text='format_response로 정규화된 응답', verbose_name='Response Data')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='Hit Count')),
+                ('last_used_at', models.DateTimeField(verbose_name='Last Used At')),
+            ],
+            options={
+                'verbose_name': 'GPT Response Cache',
+                'verbose_name_plural': 'GPT Response Caches',
+                'db_table': 'gpt_response_cache',
+                'indexes': [models.Index(fields=['last_used_at'], name='gpt_respons_last_us_ec5d35_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0017_gptresponsecache_taskunitresponse_is_cached'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskunit',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='같은 Prompt를 대표로 요청하는 TaskUnit, 대표의 응답을 그대로 사용', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='api.taskunit', verbose_name='Duplicate Of'),
+        ),
+        migrations.AddField(
+            model_name='taskunit',
+            name='prompt_hash',
+            field=models.CharField(blank=True, help_text='Prompt와 첨부 파일 내용의 SHA-256 해시', max_length=64, null=True, verbose_name='Prompt Hash'),
+        ),
+        migrations.AlterField(
+            model_name='taskunitresponse',
+            name='is_cached',
+            field=models.BooleanField(default=False, help_text='GPT에 요청하지 않고 저장된 응답(GPTResponseCache, 중복 Prompt)을 재사용했는지 여부', verbose_name='Is Cached'),
+        ),
+    ]
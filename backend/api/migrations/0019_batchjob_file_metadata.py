@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0018_taskunit_prompt_hash_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batchjob',
+            name='file_metadata',
+            field=models.JSONField(blank=True, help_text='업로드 시 한 번만 만든 파일 정보 (행 개수, header, dtype, chunk 위치, 내용 해시)', null=True, verbose_name='File Metadata'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:54
+
+import api.utils.files_processor.file_settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0019_batchjob_file_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskunitfiles',
+            name='file_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='File Hash'),
+        ),
+        migrations.AlterField(
+            model_name='taskunitfiles',
+            name='file_data',
+            field=models.FileField(blank=True, max_length=255, upload_to=api.utils.files_processor.file_settings.FileSettings.get_task_unit_path, verbose_name='File Data'),
+        ),
+    ]
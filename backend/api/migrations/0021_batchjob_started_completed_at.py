@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0020_taskunitfiles_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batchjob',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Completed At'),
+        ),
+        migrations.AddField(
+            model_name='batchjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Started At'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0021_batchjob_started_completed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskunit',
+            name='task_unit_batch_j_461a93_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunit',
+            name='task_unit_task_un_ccab3d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunit',
+            name='task_unit_created_793cbc_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunit',
+            name='task_unit_unit_in_a9db97_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunit',
+            name='task_unit_is_vali_5490c2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunitfiles',
+            name='task_unit_f_task_un_e3b47a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunitresponse',
+            name='task_unit_r_task_un_e93c57_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunitresponse',
+            name='task_unit_r_task_re_ae7539_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunitresponse',
+            name='task_unit_r_batch_j_7da424_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskunitresponse',
+            name='task_unit_r_task_un_ccb5d9_idx',
+        ),
+        migrations.AlterField(
+            model_name='taskunit',
+            name='batch_job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_units', to='api.batchjob', verbose_name='Batch Job'),
+        ),
+        migrations.AlterField(
+            model_name='taskunitresponse',
+            name='task_unit',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='responses', to='api.taskunit', verbose_name='Task Unit'),
+        ),
+        migrations.AddIndex(
+            model_name='taskunit',
+            index=models.Index(fields=['batch_job', 'is_valid', 'unit_index'], name='task_unit_valid_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskunit',
+            index=models.Index(fields=['batch_job', 'task_unit_status'], name='task_unit_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskunit',
+            index=models.Index(condition=models.Q(('task_unit_status__in', ['PENDING', 'IN_PROGRESS'])), fields=['task_unit_status'], name='task_unit_outstanding_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskunitresponse',
+            index=models.Index(fields=['task_unit', 'created_at'], name='task_unit_response_order_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_batch_job(apps, schema_editor):
+    """기존 TaskUnitFiles의 batch_job을 TaskUnit에서 채움"""
+    TaskUnit = apps.get_model('api', 'TaskUnit')
+    TaskUnitFiles = apps.get_model('api', 'TaskUnitFiles')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        # 같은 트랜잭션에서 테이블을 변경할 수 있도록 FOREIGN KEY 검사를 미루지 않음
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    TaskUnitFiles.objects.update(
+        batch_job_id=Subquery(TaskUnit.objects.filter(id=OuterRef('task_unit_id')).values('batch_job_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0022_tune_task_unit_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskunitfiles',
+            name='batch_job',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.batchjob', verbose_name='Batch Job'),
+        ),
+        migrations.RunPython(fill_batch_job, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='taskunitfiles',
+            name='batch_job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.batchjob', verbose_name='Batch Job'),
+        ),
+    ]
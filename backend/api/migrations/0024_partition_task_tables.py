@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from api.utils.partitions import PARTITIONED_TABLES, is_partitioning_supported, rebuild_table
+
+
+def partition_tables(apps, schema_editor):
+    """task_unit, task_unit_response, task_unit_files를 batch_job_id 범위 파티션 테이블로 변환 (PostgreSQL)"""
+    from backend import settings
+
+    if not is_partitioning_supported(schema_editor.connection):
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for table in PARTITIONED_TABLES:
+            rebuild_table(cursor, table, partitioned=True, partition_size=settings.TASK_UNIT_PARTITION_SIZE)
+
+
+def unpartition_tables(apps, schema_editor):
+    if not is_partitioning_supported(schema_editor.connection):
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for table in PARTITIONED_TABLES:
+            rebuild_table(cursor, table, partitioned=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0023_taskunitfiles_batch_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskunit',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='같은 Prompt를 대표로 요청하는 TaskUnit, 대표의 응답을 그대로 사용', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='api.taskunit', verbose_name='Duplicate Of'),
+        ),
+        migrations.AlterField(
+            model_name='taskunit',
+            name='latest_response',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.taskunitresponse'),
+        ),
+        migrations.AlterField(
+            model_name='taskunitfiles',
+            name='task_unit',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='files', to='api.taskunit', verbose_name='Task Unit'),
+        ),
+        migrations.AlterField(
+            model_name='taskunitresponse',
+            name='task_unit',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='responses', to='api.taskunit', verbose_name='Task Unit'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0024_partition_task_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='batchjob',
+            name='batch_job_status',
+            field=models.CharField(choices=[('CREATED', 'Created'), ('UPLOADED', 'Uploaded'), ('STANDBY', 'Standby'), ('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('DELETING', 'Deleting')], default='CREATED', max_length=20, verbose_name='Status'),
+        ),
+    ]
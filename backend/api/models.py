@@ -1,11 +1,17 @@
+import base64
+import hashlib
 import logging
 import os
+import shutil
 
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.validators import FileExtensionValidator
 from django.db import models
 
 from api.utils.files_processor.file_settings import FileSettings
+from api.utils.files_processor.render_profiles import ImageFormat
 from users.models import User
 
 
@@ -26,6 +32,7 @@ class BatchJobStatus:
     IN_PROGRESS = 'IN_PROGRESS'
     COMPLETED = 'COMPLETED'
     FAILED = 'FAILED'
+    DELETING = 'DELETING'
 
     CREATED_DISPLAY = 'Created'
     UPLOADED_DISPLAY = 'Uploaded'
@@ -34,6 +41,7 @@ class BatchJobStatus:
     IN_PROGRESS_DISPLAY = 'In Progress'
     COMPLETED_DISPLAY = 'Completed'
     FAILED_DISPLAY = 'Failed'
+    DELETING_DISPLAY = 'Deleting'
 
     CHOICES = [
         (CREATED, CREATED_DISPLAY),
@@ -43,16 +51,19 @@ class BatchJobStatus:
         (IN_PROGRESS, IN_PROGRESS_DISPLAY),
         (COMPLETED, COMPLETED_DISPLAY),
         (FAILED, FAILED_DISPLAY),
+        (DELETING, DELETING_DISPLAY),
     ]
 
+    # 모든 상태에서 삭제(DELETING)할 수 있으며, 삭제 중에는 다른 상태로 돌아가지 않음
     VALID_TRANSITIONS = {
-        CREATED: [UPLOADED],
-        UPLOADED: [UPLOADED, CONFIGS],
-        CONFIGS: [CONFIGS, UPLOADED, PENDING, IN_PROGRESS],
-        PENDING: [PENDING, IN_PROGRESS, COMPLETED, FAILED],
-        IN_PROGRESS: [IN_PROGRESS, COMPLETED, FAILED],
-        COMPLETED: [COMPLETED, CONFIGS, PENDING, IN_PROGRESS],
-        FAILED: [FAILED, PENDING, IN_PROGRESS],
+        CREATED: [UPLOADED, DELETING],
+        UPLOADED: [UPLOADED, CONFIGS, DELETING],
+        CONFIGS: [CONFIGS, UPLOADED, PENDING, IN_PROGRESS, DELETING],
+        PENDING: [PENDING, IN_PROGRESS, COMPLETED, FAILED, DELETING],
+        IN_PROGRESS: [IN_PROGRESS, COMPLETED, FAILED, DELETING],
+        COMPLETED: [COMPLETED, CONFIGS, PENDING, IN_PROGRESS, DELETING],
+        FAILED: [FAILED, PENDING, IN_PROGRESS, DELETING],
+        DELETING: [DELETING],
     }
 
     @classmethod
@@ -99,6 +110,13 @@ class BatchJob(TimestampedModel):
         blank=True,
         null=True)
 
+    file_metadata = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="File Metadata",
+        help_text="업로드 시 한 번만 만든 파일 정보 (행 개수, header, dtype, 내용 해시)"
+    )
+
     """배치 작업 기본 설정"""
     configs = models.JSONField(
         null=True,
@@ -114,6 +132,18 @@ class BatchJob(TimestampedModel):
         verbose_name="Status"
     )
 
+    """마지막 실행의 시작, 종료 시각 (전체 소요 시간)"""
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Started At"
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Completed At"
+    )
+
     class Meta:
         """테이블 설정"""
         db_table = 'batch_job'  # 테이블 이름 지정
@@ -127,6 +157,13 @@ class BatchJob(TimestampedModel):
     def __str__(self):
         return f"BatchJob {self.id} - {self.user.email}"
 
+    @property
+    def elapsed_time(self):
+        """마지막 실행의 전체 소요 시간(초), 끝나지 않았다면 None"""
+        if not self.started_at or not self.completed_at:
+            return None
+        return (self.completed_at - self.started_at).total_seconds()
+
     def set_status(self, new_status):
         """상태 변경 메서드"""
         if not BatchJobStatus.is_valid_transition(self.batch_job_status, new_status):
@@ -148,6 +185,10 @@ class BatchJob(TimestampedModel):
         if self.pk:
             try:
                 old_instance = BatchJob.objects.get(pk=self.pk)
+                if old_instance.file != self.file and self.file_metadata == old_instance.file_metadata:
+                    # 새 파일의 메타데이터가 주어지지 않았다면 이전 파일의 메타데이터 삭제
+                    self.file_metadata = None
+
                 if old_instance.file and old_instance.file != self.file:
                     if os.path.isfile(old_instance.file.path):
                         os.remove(old_instance.file.path)
@@ -156,12 +197,24 @@ class BatchJob(TimestampedModel):
 
     def delete(self, *args, **kwargs):
         """객체 삭제 시 파일도 삭제"""
+        from api.utils.job_deletion import delete_task_units
+
         try:
             if self.file and os.path.isfile(self.file.path):
                 self.file.delete()
         except (OSError, AttributeError) as e:
             pass
 
+        # TaskUnit의 이미지 파일도 같은 폴더에 저장되므로 폴더째 삭제
+        try:
+            shutil.rmtree(default_storage.path(FileSettings.get_batch_job_directory(self.user_id, self.id)),
+                          ignore_errors=True)
+        except NotImplementedError:
+            pass
+
+        # Django가 TaskUnit 등을 모두 읽어 하나씩 삭제하지 않도록 batch_job_id로 먼저 삭제
+        delete_task_units(self.id)
+
         super().delete(*args, **kwargs)  # 부모 클래스의 delete 호출
 
     def save(self, *args, **kwargs):
@@ -179,6 +232,7 @@ class BatchJob(TimestampedModel):
 
         method_map = {
             'get_total_size': FileSettings.get_size,
+            'get_metadata': FileSettings.get_metadata,
         }
 
         method = method_map.get(method_name)
@@ -189,9 +243,46 @@ class BatchJob(TimestampedModel):
 
         return method(self.file)
 
+    def get_file_metadata(self):
+        """
+        저장된 파일 메타데이터 반환
+        업로드 시 저장한 내용 해시(content_hash)가 없거나 파일 크기가 달라졌다면 (파일이 바뀜) 파일을 다시 읽어 저장
+        백그라운드 계산(index_file_metadata)이 실패하여 total_size가 없다면 업로드 시 찾은 dialect로 여기서 계산
+        """
+        from django.core.cache import cache
+        from api.utils.cache_keys import file_index_celery_cache_key, batch_job_cache_key
+
+        metadata = self.file_metadata or {}
+        if not self.file or not metadata.get('content_hash') or metadata.get('file_size') != self.file.size:
+            metadata = self._process_file_method('get_metadata')
+        elif metadata.get('total_size') is None and not cache.get(file_index_celery_cache_key(self.id)):
+            # 인스턴스를 읽은 뒤에 백그라운드 계산이 끝났을 수 있으므로 저장된 값을 먼저 확인
+            self.refresh_from_db(fields=['file_metadata'])
+            metadata = self.file_metadata or {}
+            if metadata.get('total_size') is not None:
+                return metadata
+
+            logger = logging.getLogger(__name__)
+            logger.log(logging.WARNING, f"API: The file of job with ID {self.id} has not been indexed. Indexing now.")
+            metadata = {**metadata, **FileSettings.get_metadata(self.file, dialect=self.get_csv_dialect())}
+        else:
+            return metadata
+
+        self.file_metadata = metadata
+        self.save(update_fields=['file_metadata'])
+        cache.delete(batch_job_cache_key(self.id))  # 캐시된 BatchJob이 다시 계산하지 않도록
+        return metadata
+
     def get_size(self):
-        """파일 타입에 맞는 Total Size 로직 실행"""
-        return self._process_file_method('get_total_size')
+        """
+        파일 타입에 맞는 Total Size 반환 (파일 메타데이터 사용)
+        업로드 직후 백그라운드에서 행 개수를 세는 중이라면 None
+        """
+        return self.get_file_metadata().get('total_size')
+
+    def get_csv_dialect(self):
+        """업로드 시 찾은 CSV encoding, 구분자, header 여부"""
+        return (self.file_metadata or {}).get('dialect')
 
 
 class TaskUnitStatus:
@@ -212,7 +303,7 @@ class TaskUnitStatus:
         PENDING: [PENDING, IN_PROGRESS, FAILED],
         IN_PROGRESS: [IN_PROGRESS, COMPLETED, FAILED],
         COMPLETED: [],
-        FAILED: [],
+        FAILED: [IN_PROGRESS],  # 작업자가 실패한 TaskUnit을 재시도하는 경우
     }
 
     @classmethod
@@ -221,13 +312,35 @@ class TaskUnitStatus:
         return new_status in cls.VALID_TRANSITIONS.get(current_status, [])
 
 
+class TaskUnitQuerySet(models.QuerySet):
+    # latest_response를 batch_job_id까지 같은 응답으로만 조인하는 FilteredRelation 이름
+    LATEST_RESPONSE = 'partition_latest_response'
+
+    def alias_latest_response(self):
+        """
+        조인 조건에 batch_job_id를 포함하여 task_unit_response의 해당 BatchJob 파티션만 읽음
+        'partition_latest_response__<field>'로 응답의 필드 참조
+        """
+        return self.alias(**{self.LATEST_RESPONSE: models.FilteredRelation(
+            'latest_response', condition=models.Q(latest_response__batch_job_id=models.F('batch_job_id')))})
+
+    def select_latest_response(self):
+        """
+        select_related('latest_response')와 같으나 해당 BatchJob의 파티션만 조인
+        조인한 응답은 TaskUnit.get_latest_response()로 읽음 (latest_response로 읽으면 다시 조회)
+        """
+        return self.alias_latest_response().select_related(self.LATEST_RESPONSE)
+
+
 class TaskUnit(TimestampedModel):
     """배치 작업의 개별 작업 단위"""
+    # batch_job으로 시작하는 복합 인덱스가 있으므로 외래 키 인덱스는 따로 만들지 않음
     batch_job = models.ForeignKey(
         BatchJob,
         on_delete=models.CASCADE,
         related_name='task_units',
-        verbose_name="Batch Job"
+        verbose_name="Batch Job",
+        db_index=False,
     )
 
     unit_index = models.PositiveIntegerField(
@@ -252,12 +365,14 @@ class TaskUnit(TimestampedModel):
         verbose_name="Status"
     )
 
+    # 파티션 테이블의 id는 그것만으로 UNIQUE 제약을 둘 수 없으므로 DB의 FOREIGN KEY 제약 없이 Django에서만 관리
     latest_response = models.ForeignKey(
         'TaskUnitResponse',
         null=True,
         blank=True,
         on_delete=models.SET_NULL,
-        related_name='+'
+        related_name='+',
+        db_constraint=False,
     )
 
     is_valid = models.BooleanField(
@@ -265,16 +380,43 @@ class TaskUnit(TimestampedModel):
         verbose_name="Is Valid"
     )
 
+    prompt_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name="Prompt Hash",
+        help_text="Prompt와 첨부 파일 내용의 SHA-256 해시"
+    )
+
+    duplicate_of = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='duplicates',
+        verbose_name="Duplicate Of",
+        help_text="같은 Prompt를 대표로 요청하는 TaskUnit, 대표의 응답을 그대로 사용",
+        db_constraint=False,
+    )
+
+    objects = TaskUnitQuerySet.as_manager()
+
     class Meta:
         db_table = 'task_unit'
         verbose_name = 'Task Unit'
         verbose_name_plural = 'Task Units'
         indexes = [
-            models.Index(fields=['batch_job']),  # 배치 작업별 조회 최적화
-            models.Index(fields=['created_at']),  # 생성 날짜별 조회 최적화
-            models.Index(fields=['unit_index']),  # 작업 순서별 정렬 최적화
-            models.Index(fields=['is_valid']),  # 작업 순서별 정렬 최적화
-            models.Index(fields=['task_unit_status']),  # 상태별 조회 최적화
+            # 결과 목록, 다운로드: batch_job, is_valid로 찾아 unit_index 순서로 정렬
+            models.Index(fields=['batch_job', 'is_valid', 'unit_index'], name='task_unit_valid_order_idx'),
+            # 작업별 상태 집계, 상태별 조회
+            models.Index(fields=['batch_job', 'task_unit_status'], name='task_unit_job_status_idx'),
+            # resume_pending_tasks: 끝나지 않은 TaskUnit은 전체의 일부이므로 부분 인덱스로 작게 유지
+            models.Index(fields=['task_unit_status'], name='task_unit_outstanding_idx',
+                         condition=models.Q(task_unit_status__in=[TaskUnitStatus.PENDING, TaskUnitStatus.IN_PROGRESS])),
+        ]
+        constraints = [
+            # bulk_create(update_conflicts=True)의 충돌 기준
+            models.UniqueConstraint(fields=['batch_job', 'unit_index'], name='unique_task_unit_per_batch'),
         ]
 
     def __str__(self):
@@ -291,6 +433,18 @@ class TaskUnit(TimestampedModel):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
+    def get_latest_response(self):
+        """latest_response 반환, select_latest_response로 조인했다면 다시 조회하지 않음"""
+        if self.latest_response_id is None:
+            return None
+        # 조인한 응답이 없다면 FilteredRelation 속성이 설정되지 않으므로 latest_response로 조회
+        return getattr(self, TaskUnitQuerySet.LATEST_RESPONSE, None) or self.latest_response
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        """save()의 UPDATE에 파티션 키를 포함하여 모든 파티션의 id 인덱스를 찾지 않도록 함"""
+        return super()._do_update(base_qs.filter(batch_job_id=self.batch_job_id), using, pk_val, values,
+                                  update_fields, forced_update)
+
 
 class TaskUnitFiles(TimestampedModel):
     """TaskUnit 관련 파일 저장"""
@@ -298,14 +452,33 @@ class TaskUnitFiles(TimestampedModel):
         TaskUnit,
         on_delete=models.CASCADE,
         related_name="files",
-        verbose_name="Task Unit"
+        verbose_name="Task Unit",
+        db_constraint=False,
+    )
+
+    # TaskUnit과 같은 파티션에 저장하기 위한 파티션 키
+    batch_job = models.ForeignKey(
+        BatchJob,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Batch Job"
     )
 
     file_data = models.FileField(
         upload_to=FileSettings.get_task_unit_path,
+        max_length=255,
+        blank=True,
         verbose_name="File Data"
     )
 
+    file_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name="File Hash"
+    )
+
+    # 파일로 저장하기 전에 만들어진 TaskUnitFiles만 사용
     base64_image_data = models.TextField(
         blank=True,
         null=True,
@@ -316,9 +489,36 @@ class TaskUnitFiles(TimestampedModel):
         db_table = 'task_unit_files'
         verbose_name = 'Task Unit File'
         verbose_name_plural = 'Task Unit Files'
-        indexes = [
-            models.Index(fields=['task_unit']),  # 작업 단위별 응답 조회 최적화
-        ]
+
+    # base64 변환 시 한 번에 읽는 크기 (3의 배수여야 나누어 변환한 결과를 그대로 이어 붙일 수 있음)
+    BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+    @classmethod
+    def from_image(cls, task_unit, image):
+        """렌더링된 이미지(bytes)를 저장소에 쓰고 경로와 해시만 가지는 TaskUnitFiles 생성 (DB에는 저장하지 않음)"""
+        file_hash = hashlib.sha256(image).hexdigest()
+        extension = ImageFormat.EXTENSIONS[ImageFormat.detect(image)]
+
+        task_unit_file = cls(task_unit=task_unit, batch_job_id=task_unit.batch_job_id, file_hash=file_hash)
+        task_unit_file.file_data.save(f"{file_hash}{extension}", ContentFile(image), save=False)
+        return task_unit_file
+
+    def get_base64_data(self):
+        """저장된 이미지를 나누어 읽으며 base64로 변환"""
+        if not self.file_data:
+            return self.base64_image_data
+
+        encoded = []
+        with self.file_data.open('rb') as f:
+            for block in iter(lambda: f.read(self.BASE64_CHUNK_SIZE), b''):
+                encoded.append(base64.b64encode(block))
+
+        return b''.join(encoded).decode('ascii')
+
+    def get_data_url(self):
+        """요청에 사용하는 data URL (이미지 형식은 저장된 파일의 확장자로 판단)"""
+        mime_type = ImageFormat.MIME_TYPES[ImageFormat.from_file_name(self.file_data.name)]
+        return f"data:{mime_type};base64,{self.get_base64_data()}"
 
 
 class TaskUnitResponse(TimestampedModel):
@@ -330,13 +530,16 @@ class TaskUnitResponse(TimestampedModel):
         verbose_name="Batch Job"
     )
 
+    # (task_unit, created_at) 인덱스가 있으므로 외래 키 인덱스는 따로 만들지 않음
     task_unit = models.ForeignKey(
         TaskUnit,
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
         related_name="responses",
-        verbose_name="Task Unit"
+        verbose_name="Task Unit",
+        db_index=False,
+        db_constraint=False,
     )
 
     task_unit_index = models.PositiveIntegerField(
@@ -377,16 +580,20 @@ class TaskUnitResponse(TimestampedModel):
         help_text="요청 처리 시간 (초 단위)"
     )
 
+    is_cached = models.BooleanField(
+        default=False,
+        verbose_name="Is Cached",
+        help_text="GPT에 요청하지 않고 저장된 응답(GPTResponseCache, 중복 Prompt)을 재사용했는지 여부"
+    )
+
     class Meta:
         db_table = 'task_unit_response'
         verbose_name = 'Task Unit Response'
         verbose_name_plural = 'Task Unit Responses'
         ordering = ['task_unit', 'created_at']
         indexes = [
-            models.Index(fields=['batch_job']),  # 배치 작업별 응답 조회 최적화
-            models.Index(fields=['task_unit']),  # 작업 단위별 응답 조회 최적화
-            models.Index(fields=['task_unit_index']),  # 작업 순서별 정렬 최적화
-            models.Index(fields=['task_response_status']),  # 상태별 조회 최적화
+            # 작업 단위별 응답 조회 (ordering과 같은 순서), batch_job은 외래 키 인덱스 사용
+            models.Index(fields=['task_unit', 'created_at'], name='task_unit_response_order_idx'),
         ]
 
     def __str__(self):
@@ -401,3 +608,43 @@ class TaskUnitResponse(TimestampedModel):
             raise ValueError(f"Invalid status transition from {self.task_response_status} to {new_status}")
         self.task_response_status = new_status
         self.save()
+
+
+class GPTResponseCache(TimestampedModel):
+    """동일한 요청(gpt_model, Prompt, 이미지, max_tokens)에 대한 GPT 응답 캐시"""
+    cache_key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="Cache Key",
+        help_text="요청 내용의 SHA-256 해시"
+    )
+
+    gpt_model = models.CharField(
+        max_length=255,
+        verbose_name="GPT Model"
+    )
+
+    response_data = models.JSONField(
+        verbose_name="Response Data",
+        help_text="format_response로 정규화된 응답"
+    )
+
+    hit_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Hit Count"
+    )
+
+    last_used_at = models.DateTimeField(
+        verbose_name="Last Used At"
+    )
+
+    class Meta:
+        db_table = 'gpt_response_cache'
+        verbose_name = 'GPT Response Cache'
+        verbose_name_plural = 'GPT Response Caches'
+        indexes = [
+            models.Index(fields=['last_used_at']),  # 오래된 캐시 삭제 최적화
+        ]
+
+    def __str__(self):
+        return f"GPTResponseCache {self.cache_key} - {self.gpt_model}"
@@ -16,8 +16,9 @@ class BatchJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = BatchJob
         # fields = "__all__"
-        fields = ['id', 'created_at', 'updated_at', 'title', 'description', 'file_name', 'batch_job_status']
-        read_only_fields = ['id', 'created_at', 'updated_at']  # 읽기 전용 필드 지정
+        fields = ['id', 'created_at', 'updated_at', 'title', 'description', 'file_name', 'batch_job_status',
+                  'started_at', 'completed_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'started_at', 'completed_at']  # 읽기 전용 필드 지정
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -4,6 +4,7 @@ from django.dispatch import receiver
 
 from api.models import TaskUnit, BatchJob, TaskUnitResponse
 from api.utils.cache_keys import batch_job_cache_key, task_unit_cache_key, task_unit_response_cache_key
+from api.utils.partitions import ensure_partitions
 
 
 def register_signals():
@@ -11,6 +12,13 @@ def register_signals():
     def update_batch_job_cache(sender, instance, **kwargs):
         cache.set(batch_job_cache_key(instance.id), instance, timeout=300)
 
+    # 함수 안에서 정의한 receiver는 약한 참조로 연결하면 함수가 끝난 뒤 사라지므로 강한 참조로 연결
+    @receiver(post_save, sender=BatchJob, weak=False)
+    def create_task_unit_partitions(sender, instance, created, **kwargs):
+        # TaskUnit을 저장하기 전에 BatchJob의 파티션 생성 (PostgreSQL)
+        if created:
+            ensure_partitions(instance.id)
+
     @receiver(post_delete, sender=BatchJob)
     def delete_batch_job_cache(sender, instance, **kwargs):
         cache.delete(batch_job_cache_key(instance.id))
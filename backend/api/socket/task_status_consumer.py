@@ -44,3 +44,13 @@ class TaskStatusConsumer(AsyncWebsocketConsumer):
                 "result": event["result"],
             }))
             self.task_units.remove(task_unit_id)
+
+    async def job_status(self, event):
+        """ BatchJob이 끝났을 때, 작업을 구독 중인 클라이언트에게 알림 전송 """
+        logger.log(logging.DEBUG, f"API: job_status {event['batch_id']} sent to clients")
+        await self.send(text_data=json.dumps({
+            "batch_id": event["batch_id"],
+            "status": event["status"],
+            "elapsed_time": event["elapsed_time"],
+            "counters": event["counters"],
+        }))
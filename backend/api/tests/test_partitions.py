@@ -0,0 +1,100 @@
+from unittest import skipUnless
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import BatchJob, BatchJobStatus, TaskUnit, TaskUnitResponse, TaskUnitStatus
+from api.utils.partitions import PARTITIONED_TABLES, get_partitions, is_partitioning_supported
+from users.models import User
+
+
+@skipUnless(is_partitioning_supported(connection), "Partitioning is only supported on PostgreSQL.")
+class TaskUnitPartitionTest(TransactionTestCase):
+    # 다른 테스트가 증가시킨 batch_job id sequence와 관계없이 첫 BatchJob이 0번 파티션에 저장되도록 함
+    reset_sequences = True
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+
+    def get_partition_starts(self, table):
+        with connection.cursor() as cursor:
+            return [start for _, start, _ in get_partitions(cursor, table)]
+
+    def test_partitions_are_created_with_batch_job(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT setval(pg_get_serial_sequence('batch_job', 'id'), 250)")
+
+        batch_job = BatchJob.objects.create(user=self.user)
+        TaskUnit.objects.create(batch_job=batch_job, unit_index=1)
+
+        for table in PARTITIONED_TABLES:
+            self.assertIn(200, self.get_partition_starts(table))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM "task_unit_p200"')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_worker_queries_read_one_partition(self):
+        # 다른 테스트가 삭제한 파티션과 겹치지 않도록 300, 400번 파티션 사용
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT setval(pg_get_serial_sequence('batch_job', 'id'), 350)")
+        old_job = BatchJob.objects.create(user=self.user)
+        TaskUnit.objects.create(batch_job=old_job, unit_index=1)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT setval(pg_get_serial_sequence('batch_job', 'id'), 450)")
+        batch_job = BatchJob.objects.create(user=self.user)
+        task_unit = TaskUnit.objects.create(batch_job=batch_job, unit_index=1)
+
+        plans = [
+            TaskUnit.objects.filter(id=task_unit.id, batch_job_id=batch_job.id).explain(),
+            TaskUnit.objects.filter(batch_job_id=batch_job.id).select_latest_response().explain(),
+        ]
+        for plan in plans:
+            self.assertRegex(plan, r'task_unit_p400\b')
+            self.assertNotRegex(plan, r'task_unit_(response_)?p300\b')
+
+        with CaptureQueriesContext(connection) as queries:
+            task_unit.save()
+        self.assertIn('"batch_job_id" =', queries[-1]['sql'])
+
+    def test_drop_partition(self):
+        old_job = BatchJob.objects.create(user=self.user, batch_job_status=BatchJobStatus.COMPLETED)
+        TaskUnit.objects.create(batch_job=old_job, unit_index=1)
+
+        with self.assertRaises(CommandError):
+            # 아직 새 BatchJob이 저장되는 파티션
+            call_command('task_unit_partitions', drop=0)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT setval(pg_get_serial_sequence('batch_job', 'id'), 150)")
+        BatchJob.objects.create(user=self.user)
+
+        call_command('task_unit_partitions', drop=0, archive=True)
+
+        self.assertFalse(BatchJob.objects.filter(id=old_job.id).exists())
+        self.assertNotIn(0, self.get_partition_starts('task_unit'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM "archived_task_unit_p0"')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('DROP TABLE "archived_task_unit_p0", "archived_task_unit_response_p0", '
+                           '"archived_task_unit_files_p0"')
+
+
+class LatestResponseJoinTest(TestCase):
+    def test_latest_response_is_joined(self):
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        batch_job = BatchJob.objects.create(user=user)
+        answered = TaskUnit.objects.create(batch_job=batch_job, unit_index=1)
+        TaskUnit.objects.create(batch_job=batch_job, unit_index=2)
+        answered.latest_response = TaskUnitResponse.objects.create(
+            batch_job=batch_job, task_unit=answered, task_unit_index=1, task_response_status=TaskUnitStatus.COMPLETED)
+        answered.save()
+
+        with self.assertNumQueries(1):
+            task_units = list(TaskUnit.objects.filter(batch_job=batch_job).select_latest_response()
+                              .order_by('unit_index'))
+            responses = [task_unit.get_latest_response() for task_unit in task_units]
+
+        self.assertEqual(responses[0].id, answered.latest_response.id)
+        self.assertIsNone(responses[1])
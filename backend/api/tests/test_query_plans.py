@@ -0,0 +1,104 @@
+import re
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import TestCase
+
+from api.models import BatchJob, TaskUnitStatus
+from api.utils.partitions import ensure_partitions
+from api.views import TaskUnitResponseListAPIView, BatchJobResultDownload
+from tasks.queue_task_units import get_resumable_task_units
+from users.models import User
+
+SEED_SQL = {
+    'postgresql': """
+        INSERT INTO task_unit (created_at, updated_at, batch_job_id, unit_index, has_files, task_unit_status, is_valid)
+        SELECT now(), now(), %(first_job_id)s + n / %(units_per_job)s, n %% %(units_per_job)s, false,
+               CASE n %% 100 WHEN 0 THEN 'PENDING' WHEN 1 THEN 'IN_PROGRESS' ELSE 'COMPLETED' END,
+               n %% 20 <> 0
+        FROM generate_series(0, %(rows)s - 1) AS seq(n)
+    """,
+    'sqlite': """
+        WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n + 1 < %(rows)s)
+        INSERT INTO task_unit (created_at, updated_at, batch_job_id, unit_index, has_files, task_unit_status, is_valid)
+        SELECT CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, %(first_job_id)s + n / %(units_per_job)s,
+               n %% %(units_per_job)s, 0,
+               CASE n %% 100 WHEN 0 THEN 'PENDING' WHEN 1 THEN 'IN_PROGRESS' ELSE 'COMPLETED' END,
+               n %% 20 <> 0
+        FROM seq
+    """,
+}
+
+
+class TaskUnitQueryPlanTest(TestCase):
+    """
+    1,000,000개의 TaskUnit(작업 100개)에서 결과 목록, 다운로드, resume 쿼리가 인덱스를 사용하는지 확인
+    PENDING, IN_PROGRESS는 각각 1%, 무효화된 TaskUnit은 5%
+    """
+    rows = 1_000_000
+    jobs = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        job_ids = [job.id for job in BatchJob.objects.bulk_create([BatchJob(user=user) for _ in range(cls.jobs)])]
+        if job_ids != list(range(job_ids[0], job_ids[0] + cls.jobs)):
+            raise AssertionError("BatchJob ids are not consecutive.")
+        # bulk_create는 post_save 시그널을 보내지 않으므로 파티션을 직접 생성
+        ensure_partitions(job_ids[-1])
+
+        cls.batch_job_id = job_ids[cls.jobs // 2]
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_SQL[connection.vendor] % {
+                "rows": cls.rows,
+                "units_per_job": cls.rows // cls.jobs,
+                "first_job_id": job_ids[0],
+            })
+            cursor.execute("ANALYZE task_unit")
+
+    def assertUsesIndex(self, queryset, ordered=False):
+        """task_unit 전체를 읽지 않고, ordered라면 따로 정렬하지 않는지 확인"""
+        plan = queryset.explain()
+
+        if connection.vendor == 'postgresql':
+            self.assertNotRegex(plan, r'Seq Scan on task_unit\b(?!_)')
+            self.assertRegex(plan, r'Index (Only )?Scan')
+            if ordered:
+                self.assertNotRegex(plan, r'\bSort\b')
+        else:
+            scans = [line for line in plan.splitlines() if re.search(r'(SCAN|SEARCH) task_unit\b(?!_)', line)]
+            self.assertTrue(scans, plan)
+            for line in scans:
+                self.assertIn('USING', line, plan)
+            if ordered:
+                self.assertNotIn('TEMP B-TREE', plan)
+
+        return plan
+
+    @staticmethod
+    def get_index_names(index):
+        """인덱스와, 파티션 테이블이라면 각 파티션에 만들어진 인덱스의 이름"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass", [index])
+            return [index] + [row[0] for row in cursor.fetchall()]
+
+    def test_list(self):
+        view = TaskUnitResponseListAPIView()
+        view.kwargs = {'batch_id': self.batch_job_id}
+
+        view.request = SimpleNamespace(GET={})
+        self.assertUsesIndex(view.get_queryset()[:50], ordered=True)
+
+        view.request = SimpleNamespace(GET={'status': TaskUnitStatus.FAILED})
+        self.assertUsesIndex(view.get_queryset()[:50])
+
+    def test_download(self):
+        self.assertUsesIndex(BatchJobResultDownload.get_queryset(self.batch_job_id))
+
+    def test_resume(self):
+        plan = self.assertUsesIndex(get_resumable_task_units()[:1000])
+
+        # SQLite는 task_unit_status = 'PENDING'이 부분 인덱스의 IN 조건에 포함된다고 판단하지 못함
+        if connection.vendor == 'postgresql':
+            index_names = self.get_index_names('task_unit_outstanding_idx')
+            self.assertTrue(any(name in plan for name in index_names), plan)
@@ -7,6 +7,8 @@ urlpatterns = [
     path('create/', batch_jobs.CreateBatchJobsView.as_view(), name='batch-job-create'),
     path('supported-file-types/', batch_jobs.BatchJobSupportFileType.as_view(), name='batch-job-support-file-type'),
     path('supported-pdf-modes/', batch_jobs.BatchJobSupportPDFMode.as_view(), name='batch-job-support-pdf-mode'),
+    path('supported-render-profiles/', batch_jobs.BatchJobSupportRenderProfile.as_view(),
+         name='batch-job-support-render-profile'),
 
     path('<int:batch_id>/', batch_jobs.BatchJobDetailView.as_view(), name='batch-job-detail'),
     path('<int:batch_id>/upload/', batch_jobs.BatchJobFileUploadView.as_view(), name='batch-job-upload-files'),
@@ -8,6 +8,8 @@ from django.shortcuts import get_object_or_404
 CACHE_TIMEOUT_BATCH_JOB = 60
 CACHE_TIMEOUT_TASK_UNIT = 60
 CACHE_TIMEOUT_TASK_UNIT_RESPONSE = 60
+CACHE_TIMEOUT_FILE_INDEX = 60 * 10  # 이 시간 안에 행 개수를 세지 못하면 실패한 것으로 보고 다시 계산
+CACHE_TIMEOUT_BATCH_JOB_CELERY = 60 * 5  # 파일을 읽는 동안 갱신하며, 작업자가 죽으면 이 시간 뒤 만료
 
 
 def get_cache_or_database(
@@ -51,5 +53,29 @@ def task_unit_celery_cache_key(task_unit_id):
     return f"Celery:task_unit:request.id:{task_unit_id}"
 
 
+def file_index_celery_cache_key(batch_job_id):
+    return f"Celery:batch_job:file_index:{batch_job_id}"
+
+
 def locked_celery_cache_key(task_type):
     return f"Celery:task:locking:{task_type}"
+
+
+def rate_limit_cache_key(gpt_model):
+    return f"RateLimit:gpt_model:{gpt_model}"
+
+
+def concurrency_cache_key(gpt_model):
+    return f"Concurrency:gpt_model:{gpt_model}"
+
+
+def concurrency_history_cache_key(gpt_model):
+    return f"Concurrency:gpt_model:history:{gpt_model}"
+
+
+def ocr_cache_key(page_hash, language, dpi):
+    return f"OCR:page:{language}:{dpi}:{page_hash}"
+
+
+def job_counter_cache_key(batch_job_id, field):
+    return f"JobCounters:batch_job:{batch_job_id}:{field}"
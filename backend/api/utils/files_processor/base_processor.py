@@ -1,6 +1,11 @@
+import hashlib
+import os
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from enum import Enum
 
+from django.core.files.uploadedfile import UploadedFile
+
 
 class ResultType(str, Enum):
     TEXT = "text"
@@ -8,6 +13,42 @@ class ResultType(str, Enum):
     FILE = "file"
 
 
+@contextmanager
+def open_binary_file(file):
+    """파일 경로, 업로드 파일, FieldFile을 처음부터 읽는 바이너리 파일 객체로 반환"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            yield f
+
+    elif isinstance(file, UploadedFile) or not hasattr(file, 'open'):
+        # 업로드 파일(또는 이미 열린 파일 객체)은 이후에 다시 사용되므로 닫지 않고 위치만 되돌림
+        file.seek(0)
+        try:
+            yield file
+        finally:
+            file.seek(0)
+
+    else:
+        with file.open('rb') as f:
+            yield f
+
+
+def get_content_hash(file):
+    """
+    파일을 나누어 읽어 계산한 내용 해시(sha256)와 크기(바이트)
+    :return: (content_hash, file_size)
+    """
+    digest = hashlib.sha256()
+    file_size = 0
+
+    with open_binary_file(file) as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+            file_size += len(block)
+
+    return digest.hexdigest(), file_size
+
+
 class BaseFileProcessor(ABC):
     @abstractmethod
     def process(self, file, *args, **kwargs):
@@ -28,3 +69,25 @@ class BaseFileProcessor(ABC):
     def get_preview(self, file, *args, **kwargs):
         """파일 미리보기 반환"""
         pass
+
+    def get_metadata(self, file, *args, **kwargs):
+        """
+        업로드 시 한 번만 만들어 BatchJob에 저장하는 파일 메타데이터
+        :return: content_hash, file_size(바이트), total_size(작업 단위 수)
+        """
+        content_hash, file_size = get_content_hash(file)
+
+        return {
+            "content_hash": content_hash,
+            "file_size": file_size,
+            "total_size": self.get_size(file),
+        }
+
+    def sniff(self, file, *args, **kwargs):
+        """
+        업로드 요청 안에서 빠르게 확인할 수 있는 파일 정보
+        전체 파일을 읽어야 하는 정보는 get_metadata로 백그라운드에서 계산
+        """
+        return {
+            "total_size": self.get_size(file),
+        }
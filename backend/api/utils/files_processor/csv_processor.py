@@ -1,19 +1,81 @@
+import codecs
+import csv
+import hashlib
+import io
 import logging
-import os
 from typing import Generator
 
+import chardet
+
 import pandas as pd
-from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 
-from api.utils.files_processor.base_processor import BaseFileProcessor, ResultType
-from api.utils.generate_prompt import get_prompt
-from backend import settings
+from api.utils.files_processor.base_processor import BaseFileProcessor, ResultType, open_binary_file
+from api.utils.generate_prompt import get_prompt, PromptTemplate
 
 CHUNK_SIZE = 1000
 DEFAULT_ENCODING = "utf-8"
+DEFAULT_DELIMITER = ","
+
+# 업로드 시 encoding, 구분자, header를 판단하기 위해 읽는 앞부분 크기
+SNIFF_SIZE = 64 * 1024
+SNIFF_ENCODINGS = ["utf-8", "cp949"]  # cp949는 euc-kr을 포함
+SNIFF_DELIMITERS = ",;\t|"
+
 logger = logging.getLogger(__name__)
 
 
+def get_pandas_options(dialect=None):
+    """sniff로 찾은 dialect를 pd.read_csv 인자로 변환"""
+    dialect = dialect or {}
+    return {
+        "encoding": dialect.get('encoding', DEFAULT_ENCODING),
+        "sep": dialect.get('delimiter', DEFAULT_DELIMITER),
+        "header": 0 if dialect.get('has_header', True) else None,
+    }
+
+
+def detect_encoding(sample):
+    """앞부분 바이트로 encoding 판단 (UTF-8 BOM, UTF-8, CP949 순서)"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    for encoding in SNIFF_ENCODINGS:
+        try:
+            # 앞부분만 읽었으므로 마지막 글자가 잘려 있을 수 있음
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    return chardet.detect(sample).get('encoding') or DEFAULT_ENCODING
+
+
+def is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def is_data_row(first_row, next_rows):
+    """
+    첫 행이 header가 아닌 데이터 행인지 판단 (기본은 pandas와 같이 첫 행을 header로 사용)
+    모든 값이 숫자이고, 이어지는 행도 열 개수가 같으며 같은 열의 값이 숫자(또는 빈 값)인 경우만 데이터로 판단
+    """
+    if not all(value.strip() and is_number(value) for value in first_row):
+        return False
+
+    return all(len(row) == len(first_row) and all(not value.strip() or is_number(value) for value in row)
+               for row in next_rows)
+
+
+class CSVEngine:
+    """CSV 파일을 읽어 Prompt를 렌더링하는 방식"""
+    PANDAS = 'pandas'  # pandas C 엔진, 모든 열을 CHUNK_SIZE 행씩 읽음
+    PYARROW = 'pyarrow'  # pyarrow 멀티스레드 파서, Prompt에 필요한 열만 record batch 단위로 읽음
+
+
 class CSVProcessor(BaseFileProcessor):
 
     def process(self, file, *args, **kwargs) -> Generator[dict, None, None]:
@@ -23,23 +85,84 @@ class CSVProcessor(BaseFileProcessor):
         :yield: 한 행씩 반환 (dict 형태)
         """
         try:
-            for chunk in pd.read_csv(file, chunksize=CHUNK_SIZE):
+            for chunk in pd.read_csv(file, chunksize=CHUNK_SIZE, **get_pandas_options(kwargs.get('dialect'))):
                 for row in chunk.itertuples(index=False):
-                    yield ResultType.TEXT, (chunk.columns, row)
+                    yield ResultType.TEXT, ([str(column) for column in chunk.columns], row)
+
+        except Exception as e:
+            logger.log(logging.ERROR, f"API: Unknown error: {str(e)}")
+            raise e
 
-            # batch_job = BatchJob.objects.get(id=batch_job_id)
-            # prompt = batch_job.configs['prompt']
-            # selected_headers = batch_job.configs['selected_headers']
-            # selected_headers = [header.strip() for header in selected_headers]
-            #
-            # if prompt is None or selected_headers is None:
-            #     logger.log(logging.ERROR, f"API: Cannot generate prompts because prompt or selected_headers is None")
-            #     raise ValueError("Cannot generate prompts because prompt or selected_headers is None")
+    def process_prompts(self, file, prompt, selected_headers, *args, **kwargs) -> Generator[tuple, None, None]:
+        """
+        CSV 파일을 chunk 단위로 읽어 Prompt를 열 단위로 렌더링
+        Prompt는 한 번만 해석하고, key 검사는 header 행으로 한 번만 수행
+        settings.CSV_ENGINE으로 읽는 방식을 선택
+        :yield: 한 행씩 (ResultType.TEXT, Prompt) 반환
+        """
+        from backend import settings
+
+        template = PromptTemplate(prompt)
+        dialect = kwargs.get('dialect') or {}
+
+        try:
+            if settings.CSV_ENGINE == CSVEngine.PYARROW:
+                yield from self._render_with_pyarrow(file, template, selected_headers, dialect,
+                                                     settings.CSV_ARROW_BLOCK_SIZE)
+            else:
+                yield from self._render_with_pandas(file, template, selected_headers, dialect)
 
         except Exception as e:
             logger.log(logging.ERROR, f"API: Unknown error: {str(e)}")
             raise e
 
+    def _render_with_pandas(self, file, template, selected_headers, dialect):
+        columns = None
+
+        for chunk in pd.read_csv(file, chunksize=CHUNK_SIZE, **get_pandas_options(dialect)):
+            if columns is None:
+                columns = template.get_columns(chunk.columns, selected_headers)
+
+            for text_data in template.render_frame(chunk, columns):
+                yield ResultType.TEXT, text_data
+
+    def _render_with_pyarrow(self, file, template, selected_headers, dialect, block_size):
+        """
+        Prompt에 사용되는 열만 문자열 그대로 읽어 Arrow 배열 상태로 렌더링
+        pandas와 달리 값의 타입을 추론하지 않으므로 원본 문자열을 그대로 사용 (예: 90.0이 아닌 90, nan이 아닌 빈 문자열)
+        """
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        encoding = dialect.get('encoding', DEFAULT_ENCODING)
+        read_options = pa_csv.ReadOptions(
+            use_threads=True,
+            block_size=block_size,
+            # pyarrow는 UTF-8 BOM을 스스로 건너뛰므로 변환 없이 읽음
+            encoding="utf8" if encoding in ["utf-8", "utf-8-sig"] else encoding,
+            column_names=None if dialect.get('has_header', True) else dialect.get('headers'),
+        )
+        parse_options = pa_csv.ParseOptions(delimiter=dialect.get('delimiter', DEFAULT_DELIMITER))
+
+        # header 행만 읽어 key 검사 후 필요한 열 결정
+        with open_binary_file(file) as f:
+            reader = pa_csv.open_csv(f, read_options=read_options, parse_options=parse_options)
+            columns = template.get_columns(reader.schema.names, selected_headers)
+            reader.close()
+
+        include_columns = list(dict.fromkeys(columns))
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=include_columns,
+            column_types={column: pa.string() for column in include_columns},
+            strings_can_be_null=False,
+        )
+
+        with open_binary_file(file) as f:
+            for batch in pa_csv.open_csv(f, read_options=read_options, parse_options=parse_options,
+                                         convert_options=convert_options):
+                for text_data in template.render_arrow(batch, columns):
+                    yield ResultType.TEXT, text_data
+
     def process_text(self, prompt, *args, **kwargs):
         columns = kwargs.get('columns')
         row = kwargs.get('row')
@@ -51,21 +174,116 @@ class CSVProcessor(BaseFileProcessor):
 
     def get_size(self, file, *args, **kwargs):
         """
-        CSV 파일의 전체 열 개수 반환
+        CSV 파일의 전체 행 개수 반환
         :param file:
         :return:
         """
+        return self.get_metadata(file)['total_size']
+
+    def sniff(self, file, *args, **kwargs):
+        """
+        앞부분(SNIFF_SIZE 바이트)만 읽어 encoding, 구분자, header 여부를 판단
+        파일 크기와 관계없이 일정한 시간에 끝나며, 전체 행 개수는 get_metadata에서 따로 계산
+        :return: dialect와 headers, total_size는 아직 모르므로 None
+        """
+        try:
+            with open_binary_file(file) as f:
+                sample = f.read(SNIFF_SIZE)
+
+            encoding = detect_encoding(sample)
+            text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=False)
+
+            # 앞부분만 읽었다면 마지막 줄은 잘렸을 수 있으므로 제외
+            lines = text.splitlines()
+            if len(sample) >= SNIFF_SIZE and len(lines) > 1:
+                lines = lines[:-1]
+            text = '\n'.join(lines)
+
+            try:
+                delimiter = csv.Sniffer().sniff(text, delimiters=SNIFF_DELIMITERS).delimiter
+            except csv.Error:
+                delimiter = DEFAULT_DELIMITER
+
+            rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row]
+            if not rows:
+                raise ValueError("The file is empty.")
+
+            # 빈 header(pandas index), 숫자 header(연도)도 있으므로 첫 행이 확실히 데이터일 때만 header가 없다고 판단
+            first_row = rows[0]
+            has_header = not is_data_row(first_row, rows[1:])
+            if has_header and len(rows) < 2:
+                raise ValueError("The file has no rows.")
+
+            # 빈 header(Unnamed: 0), 중복 header(name.1)는 pandas와 같은 이름을 사용
+            # header가 없다면 pandas와 같이 열 번호를 열 이름으로 사용
+            if has_header:
+                columns = pd.read_csv(io.StringIO(text), sep=delimiter, nrows=0).columns
+                headers = [str(column).strip() for column in columns]
+            else:
+                headers = [str(index) for index in range(len(first_row))]
+
+            return {
+                "dialect": {
+                    "encoding": encoding,
+                    "delimiter": delimiter,
+                    "has_header": has_header,
+                    "headers": headers,
+                },
+                "headers": headers,
+                "total_size": None,
+            }
+
+        except Exception as e:
+            logger.log(logging.ERROR, f"API: Cannot read CSV files: {str(e)}")
+            raise ValueError(f"Cannot read CSV files: {str(e)}")
+
+    def get_metadata(self, file, *args, **kwargs):
+        """
+        파일을 한 번만 읽어 행 개수, header, dtype, 내용 해시를 반환
+        행은 sniff로 찾은 dialect의 csv.reader로 세므로 따옴표 안의 줄바꿈, 필드 중간의 따옴표(55" 등)도 pandas와 같음
+        pandas처럼 빈 줄은 건너뜀
+        :param dialect: sniff로 찾은 dialect, 없다면 다시 sniff
+        """
+        dialect = kwargs.get('dialect') or self.sniff(file)['dialect']
+        pandas_options = get_pandas_options(dialect)
+
         try:
-            total_rows = 0
-            file_path = file if isinstance(file, (InMemoryUploadedFile, TemporaryUploadedFile)) else os.path.join(
-                settings.BASE_DIR, file.path)
+            digest = hashlib.sha256()
+            file_size = 0
+
+            def decode_lines(f):
+                """해시와 크기를 계산하면서 줄 단위로 decode"""
+                nonlocal file_size
+                decoder = codecs.getincrementaldecoder(pandas_options['encoding'])()
+                for line in f:
+                    digest.update(line)
+                    file_size += len(line)
+                    yield decoder.decode(line)
+                yield decoder.decode(b'', final=True)
 
-            # 파일을 청크 단위로 읽기
-            chunks = pd.read_csv(file_path, chunksize=CHUNK_SIZE)
-            for chunk in chunks:
-                total_rows += len(chunk)
+            with open_binary_file(file) as f:
+                rows = csv.reader(decode_lines(f), delimiter=pandas_options['sep'])
+                total_rows = sum(1 for row in rows if row and (len(row) > 1 or row[0].strip()))
 
-            return total_rows
+            if dialect.get('has_header', True) and total_rows:
+                total_rows -= 1
+
+            with open_binary_file(file) as f:
+                # pandas는 mode가 없는 Django File 객체를 텍스트로 보고 encoding을 무시하므로 직접 decode
+                text = io.TextIOWrapper(f, encoding=pandas_options['encoding'], newline='')
+                try:
+                    df = pd.read_csv(text, nrows=CHUNK_SIZE, **pandas_options)
+                finally:
+                    text.detach()  # 업로드 파일은 이후에 다시 사용되므로 닫지 않음
+
+            return {
+                "dialect": dialect,
+                "content_hash": digest.hexdigest(),
+                "file_size": file_size,
+                "total_size": total_rows,
+                "headers": [str(column).strip() for column in df.columns],
+                "dtypes": {str(column).strip(): str(dtype) for column, dtype in df.dtypes.items()},
+            }
 
         except Exception as e:
             logger.log(logging.ERROR, f"API: Cannot read CSV files: {str(e)}")
@@ -80,8 +298,8 @@ class CSVProcessor(BaseFileProcessor):
         try:
             # 파일을 읽어 3행만 가져오기
             # TODO 수정
-            df = pd.read_csv(file, nrows=3)
-            df.columns = df.columns.str.strip()
+            df = pd.read_csv(file, nrows=3, **get_pandas_options(kwargs.get('dialect')))
+            df.columns = [str(column).strip() for column in df.columns]
             df = df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
 
             final_data = {
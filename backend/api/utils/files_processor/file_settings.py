@@ -2,6 +2,7 @@ import hashlib
 import logging
 import os
 
+from api.utils.files_processor.base_processor import get_content_hash
 from api.utils.files_processor.csv_processor import CSVProcessor
 from api.utils.files_processor.pdf_processor import PDFProcessor
 
@@ -23,21 +24,29 @@ class FileSettings:
 
     FILE_TYPE_CHOICES = [(key, key) for key in FILE_TYPES.keys()]  # 상수를 기반으로 선택지 생성
 
+    @staticmethod
+    def get_batch_job_directory(user_id, batch_job_id):
+        """BatchJob 파일과 TaskUnit 파일이 저장되는 폴더"""
+        return f"uploads/user_{user_id}/batch_{batch_job_id}"
+
     @staticmethod
     def get_upload_path(instance, filename):
         """사용자 ID별 파일 업로드 경로 설정"""
         name, ext = os.path.splitext(filename)
         hashed_name = hashlib.sha256(name.encode('utf-8')).hexdigest()
 
-        return f"uploads/user_{instance.user.id}/batch_{instance.id}/{hashed_name}{ext}"
+        return f"{FileSettings.get_batch_job_directory(instance.user.id, instance.id)}/{hashed_name}{ext}"
 
     @staticmethod
     def get_task_unit_path(instance, filename):
-        """사용자 ID별 파일 업로드 경로 설정"""
+        """TaskUnitFiles의 사용자 ID, BatchJob ID, 작업 단위별 파일 경로 설정"""
         name, ext = os.path.splitext(filename)
         hashed_name = hashlib.sha256(name.encode('utf-8')).hexdigest()
 
-        return f"uploads/user_{instance.user.id}/batch_{instance.batch_job.id}/index_{instance.unit_index}_{hashed_name}{ext}"
+        task_unit = instance.task_unit
+        batch_job = task_unit.batch_job
+        directory = FileSettings.get_batch_job_directory(batch_job.user_id, batch_job.id)
+        return f"{directory}/index_{task_unit.unit_index}_{hashed_name}{ext}"
 
     @staticmethod
     def get_file_extension(file_name):
@@ -81,6 +90,18 @@ class FileSettings:
     def get_size(file):
         return FileSettings.handle_file_processor_method(file, 'get_size')
 
+    @staticmethod
+    def sniff(file):
+        return FileSettings.handle_file_processor_method(file, 'sniff')
+
+    @staticmethod
+    def get_content_hash(file):
+        return get_content_hash(file)
+
+    @staticmethod
+    def get_metadata(file, **kwargs):
+        return FileSettings.handle_file_processor_method(file, 'get_metadata', **kwargs)
+
     @staticmethod
     def get_preview(file, work_unit=1):
         return FileSettings.handle_file_processor_method(file, 'get_preview', work_unit)
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+
+import fitz
+
+from api.utils.cache_keys import ocr_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def check_ocr_available():
+    """PyMuPDF가 사용할 Tesseract(tessdata)가 설치되어 있는지 확인"""
+    try:
+        fitz.get_tessdata()
+    except RuntimeError as e:
+        logger.log(logging.ERROR, f"API: Tesseract is not installed: {str(e)}")
+        raise NotImplementedError(f"OCR is not available because Tesseract is not installed: {str(e)}")
+
+
+def get_page_hash(doc, page_num):
+    """
+    렌더링하지 않고 페이지의 내용 스트림과 이미지 데이터로 계산한 해시
+    다른 파일이라도 같은 스캔 페이지라면 같은 값을 가짐
+    """
+    page = doc[page_num]
+    digest = hashlib.sha256(f"{page.rect}:{page.rotation}".encode('utf-8'))
+    digest.update(page.read_contents())
+
+    for image in page.get_images(full=True):
+        digest.update(b'\0')
+        digest.update(doc.xref_stream_raw(image[0]) or b'')
+
+    return digest.hexdigest()
+
+
+def ocr_page(page, language, dpi):
+    """페이지를 dpi로 렌더링하여 Tesseract로 인식한 텍스트 반환"""
+    text_page = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+    return page.get_text(textpage=text_page)
+
+
+def ocr_pages(file_path, page_numbers, language, dpi):
+    """
+    프로세스 풀의 작업자에서 실행
+    작업자마다 문서를 직접 열어 여러 페이지를 순서대로 인식
+    """
+    with fitz.open(file_path) as doc:
+        return [ocr_page(doc[page_num], language, dpi) for page_num in page_numbers]
+
+
+def get_cached_ocr_texts(page_hashes, language, dpi):
+    """
+    캐시된 OCR 결과 반환
+    :param page_hashes: page_num -> 페이지 해시
+    :return: page_num -> 텍스트 (캐시된 페이지만)
+    """
+    from django.core.cache import cache
+
+    cache_keys = {page_num: ocr_cache_key(page_hash, language, dpi) for page_num, page_hash in page_hashes.items()}
+    cached = cache.get_many(list(cache_keys.values()))
+    return {page_num: cached[cache_key] for page_num, cache_key in cache_keys.items() if cache_key in cached}
+
+
+def save_ocr_texts(page_hashes, texts, language, dpi, timeout):
+    """
+    OCR 결과를 페이지 해시별로 캐시에 저장
+    :param texts: page_num -> 텍스트
+    """
+    from django.core.cache import cache
+
+    cache.set_many({ocr_cache_key(page_hashes[page_num], language, dpi): text for page_num, text in texts.items()},
+                   timeout=timeout)
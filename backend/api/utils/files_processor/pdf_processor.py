@@ -1,12 +1,18 @@
 import base64
-import io
 import logging
+import os
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 
+import billiard
 import fitz
-from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
 
 from api.utils.files_processor.base_processor import BaseFileProcessor, ResultType
+from api.utils.files_processor.pdf_ocr import check_ocr_available, get_page_hash, ocr_page, ocr_pages, \
+    get_cached_ocr_texts, save_ocr_texts
+from api.utils.files_processor.render_profiles import PDFRenderProfile, render_page
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +22,7 @@ class PDFProcessMode(Enum):
     TEXT = "text"
     IMAGE = "image"
     IMAGE_OCR = "image_ocr"
+    HYBRID = "hybrid"
 
     # 각 모드의 설명을 매핑
     @classmethod
@@ -24,6 +31,7 @@ class PDFProcessMode(Enum):
             cls.TEXT.value: "Extract text from the PDF.",
             cls.IMAGE.value: "Extract images from the PDF.",
             cls.IMAGE_OCR.value: "Extract text from the PDF using OCR.",
+            cls.HYBRID.value: "Extract text, and convert only pages without enough text into images or OCR.",
         }
 
     @classmethod
@@ -33,97 +41,379 @@ class PDFProcessMode(Enum):
 
         try:
             return {mode.value: mode for mode in cls}[value]
-        except KeyError:
+        except (KeyError, TypeError):
             raise NotImplementedError(f"The given PDF mode '{value}' is not supported in the available modes.")
 
+    @classmethod
+    def hybrid_fallback(cls, value=None):
+        """HYBRID 모드에서 텍스트 레이어가 부족한 작업 단위를 처리할 모드 (IMAGE(기본) 또는 IMAGE_OCR)"""
+        fallback = cls.from_string(value or cls.IMAGE)
+        if fallback not in [cls.IMAGE, cls.IMAGE_OCR]:
+            raise NotImplementedError(f"The given hybrid fallback '{fallback.value}' is not supported.")
+        return fallback
+
     @classmethod
     def __contains__(cls, item):
         return item in cls._value2member_map_
 
 
+def extract_text(doc, start_page, end_page, render_profile=None):
+    """열려 있는 문서에서 start_page ~ end_page의 텍스트 추출 (render_profile은 사용하지 않음)"""
+    start_page = max(0, start_page)
+    end_page = min(len(doc) - 1, end_page)
+
+    all_text = [doc[page_num].get_text() for page_num in range(start_page, end_page + 1)]
+    return ResultType.TEXT, '\n'.join(all_text)
+
+
+def extract_images(doc, start_page, end_page, render_profile=None):
+    """
+    열려 있는 문서에서 start_page ~ end_page를 render_profile에 따라 이미지(bytes)로 렌더링
+    base64 변환은 요청을 만들거나 응답할 때에만 수행
+    """
+    render_profile = render_profile or PDFRenderProfile.resolve()
+    start_page = max(0, start_page)
+    end_page = min(len(doc) - 1, end_page)
+
+    images = [render_page(doc.load_page(page_num), render_profile)
+              for page_num in range(start_page, end_page + 1)]
+    return ResultType.IMAGE, images
+
+
+def get_image_coverage(page):
+    """페이지 면적 중 이미지가 차지하는 비율 (0 ~ 1)"""
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0
+
+    image_area = sum(abs(fitz.Rect(image['bbox']) & page.rect) for image in page.get_image_info())
+    return min(1, image_area / page_area)
+
+
+def has_text_layer(page, text, min_chars, max_image_coverage):
+    """텍스트 레이어에 글자가 min_chars 이상이고 이미지가 max_image_coverage 이하로 덮는 페이지인지 확인"""
+    return len(''.join(text.split())) >= min_chars and get_image_coverage(page) <= max_image_coverage
+
+
+PDF_MODE_EXTRACTORS = {
+    PDFProcessMode.TEXT.value: extract_text,
+    PDFProcessMode.IMAGE.value: extract_images,
+}
+
+
+def extract_page_ranges(file_path, pdf_mode, page_ranges, render_profile=None):
+    """
+    프로세스 풀의 작업자에서 실행
+    작업자마다 문서를 직접 열어 여러 작업 단위(page_ranges)를 순서대로 추출
+    """
+    extractor = PDF_MODE_EXTRACTORS[pdf_mode]
+
+    with fitz.open(file_path) as doc:
+        return [extractor(doc, start_page, end_page, render_profile) for start_page, end_page in page_ranges]
+
+
+@contextmanager
+def process_pool(workers):
+    """
+    Celery 워커의 연결, 스레드를 물려받지 않도록 spawn으로 만든 프로세스 풀, 사용 후 남은 작업은 취소
+    Celery prefork 워커는 daemon 프로세스이므로 multiprocessing으로는 자식 프로세스를 만들 수 없어
+    daemon 프로세스에서도 자식 프로세스를 허용하는 billiard(Celery의 multiprocessing)를 사용
+    풀을 만들 수 없다면 None을 반환하며, 호출한 쪽은 현재 프로세스에서 순서대로 처리
+    """
+    try:
+        pool = billiard.get_context('spawn').Pool(processes=workers)
+    except Exception as e:
+        logger.log(logging.WARNING, f"API: Cannot start the process pool, falling back to serial: {str(e)}")
+        yield None
+        return
+
+    try:
+        yield pool
+    finally:
+        # 미리보기처럼 중간에 읽기를 멈춘 경우 남은 작업은 취소
+        pool.terminate()
+        pool.join()
+
+
+def iter_pool_results(pool, function, tasks, window):
+    """
+    tasks(인자 tuple)를 프로세스 풀에서 실행하고 요청 순서대로 결과 반환
+    메모리를 제한하기 위해 window개만 미리 요청
+    """
+    tasks = iter(tasks)
+    pending = deque()
+
+    def submit_next():
+        args = next(tasks, None)
+        if args is not None:
+            pending.append(pool.apply_async(function, args))
+
+    for _ in range(window):
+        submit_next()
+
+    while pending:
+        result = pending.popleft().get()
+        submit_next()
+        yield result
+
+
+class PDFDocument:
+    """
+    PDF 파일을 한 번만 열어 페이지 수, 미리보기, 페이지 추출에 재사용하는 세션
+    경로로 열 수 있는 파일은 경로로 열어 필요한 페이지만 읽고, 메모리에 있는 업로드 파일은 복사 없이 bytes로 열기
+
+    with PDFDocument(file) as document:
+        processor.get_size(document)
+        processor.process(document, work_unit=1, pdf_mode="text")
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.path = None
+        self.doc = None
+
+    def open(self):
+        if self.doc is not None:
+            return self
+
+        file = self.file
+        if isinstance(file, (str, os.PathLike)):
+            self.path = str(file)
+        elif isinstance(file, TemporaryUploadedFile):
+            self.path = file.temporary_file_path()
+        else:
+            try:
+                self.path = file.path  # FieldFile
+            except (AttributeError, NotImplementedError):
+                self.path = None
+
+        if self.path:
+            self.doc = fitz.open(self.path)
+        else:
+            # 메모리에 있는 업로드 파일은 이후에 다시 사용되므로 위치를 되돌림
+            file.seek(0)
+            self.doc = fitz.open(stream=file.read(), filetype="pdf")
+            file.seek(0)
+
+        return self
+
+    def close(self):
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def page_count(self):
+        return len(self.doc)
+
+    def extract(self, pdf_mode, start_page, end_page, render_profile=None):
+        """열려 있는 문서에서 pdf_mode에 따라 start_page ~ end_page 추출"""
+        extractor = PDF_MODE_EXTRACTORS.get(PDFProcessMode.from_string(pdf_mode).value)
+        if not extractor:
+            raise NotImplementedError(f"The given PDF mode '{pdf_mode}' is not supported yet.")
+
+        return extractor(self.doc, start_page, end_page, render_profile)
+
+
+@contextmanager
+def open_pdf_document(file):
+    """이미 열린 PDFDocument는 그대로 사용하고 닫지 않으며, 그 외에는 새로 열고 사용 후 닫음"""
+    if isinstance(file, PDFDocument) and file.doc is not None:
+        yield file
+        return
+
+    document = file if isinstance(file, PDFDocument) else PDFDocument(file)
+    with document:
+        yield document
+
+
 class PDFProcessor(BaseFileProcessor):
 
     def process(self, file, *args, **kwargs):
+        """
+        PDF를 work_unit 페이지씩 추출하여 반환
+        :param file: 파일 경로, 업로드 파일, FieldFile 또는 열려 있는 PDFDocument (문서는 한 번만 열림)
+        :param render_profile: 이미지 모드의 렌더링 프로필 이름 또는 dict (PDFRenderProfile)
+        """
+        from backend import settings
+
         try:
             work_unit = kwargs.get('work_unit', 1)
             pdf_mode = PDFProcessMode.from_string(kwargs.get('pdf_mode'))
 
-            if pdf_mode not in PDFProcessMode:
-                raise NotImplementedError(f"Not Implemented PDF mode: {pdf_mode}")
+            if pdf_mode not in [PDFProcessMode.IMAGE_OCR, PDFProcessMode.HYBRID] \
+                    and pdf_mode.value not in PDF_MODE_EXTRACTORS:
+                raise NotImplementedError(f"The given PDF mode '{pdf_mode}' is not supported yet.")
 
-            mode_actions = {
-                PDFProcessMode.TEXT: self._extract_text_from_pdf,
-                PDFProcessMode.IMAGE: self._extract_images_from_pdf,
-            }
+            render_profile = PDFRenderProfile.resolve(kwargs.get('render_profile'))
 
-            action = mode_actions.get(pdf_mode)
-            if not action:
-                raise NotImplementedError(f"The given PDF mode '{pdf_mode}' is not supported yet.")
+            with open_pdf_document(file) as document:
+                total_pages = document.page_count
+                page_ranges = [(start_index, min(start_index + work_unit - 1, total_pages - 1))
+                               for start_index in range(0, total_pages, work_unit)]
+
+                if pdf_mode == PDFProcessMode.IMAGE_OCR:
+                    yield from self._process_ocr(document, page_ranges, settings.PDF_OCR_WORKERS,
+                                                 settings.PDF_EXTRACT_UNITS_PER_TASK)
+                    return
+
+                if pdf_mode == PDFProcessMode.HYBRID:
+                    yield from self._process_hybrid(document, page_ranges, render_profile,
+                                                    kwargs.get('hybrid_fallback'))
+                    return
+
+                # 작업자가 파일을 직접 열어야 하므로 경로가 있는 파일만 병렬로 추출
+                workers = settings.PDF_EXTRACT_WORKERS
+                if workers > 1 and document.path and len(page_ranges) > 1:
+                    yield from self._process_parallel(document.path, pdf_mode, page_ranges, workers,
+                                                      settings.PDF_EXTRACT_UNITS_PER_TASK, render_profile)
+                    return
 
-            total_pages = self.get_size(file)
-            for start_index in range(0, total_pages, work_unit):
-                end_index = min(start_index + work_unit - 1, total_pages - 1)
-                yield action(file, start_page=start_index, end_page=end_index)
+                for start_index, end_index in page_ranges:
+                    yield document.extract(pdf_mode, start_index, end_index, render_profile)
 
         except Exception as e:
             logger.log(logging.ERROR, f"API: Cannot process PDF: {str(e)}")
             raise e
 
+    def _process_parallel(self, file_path, pdf_mode, page_ranges, workers, units_per_task, render_profile=None):
+        """작업 단위를 units_per_task개씩 묶어 프로세스 풀에 나누어 추출하고, 작업 단위 순서대로 반환"""
+        tasks = [(str(file_path), pdf_mode.value, page_ranges[index:index + units_per_task], render_profile)
+                 for index in range(0, len(page_ranges), units_per_task)]
+
+        with process_pool(workers) as pool:
+            if pool is None:
+                with fitz.open(file_path) as doc:
+                    for start_page, end_page in page_ranges:
+                        yield PDF_MODE_EXTRACTORS[pdf_mode.value](doc, start_page, end_page, render_profile)
+                return
+
+            for results in iter_pool_results(pool, extract_page_ranges, tasks, workers * 2):
+                yield from results
+
+    def _process_ocr(self, document, page_ranges, workers, units_per_task):
+        """
+        페이지를 Tesseract로 인식하여 작업 단위별 텍스트(ResultType.TEXT)로 반환
+        경로가 있는 파일은 프로세스 풀에서 병렬로 인식
+        """
+        check_ocr_available()
+
+        # 메모리를 제한하기 위해 작업자 수의 2배만큼의 작업 단위씩 인식
+        batch_size = units_per_task * workers * 2
+        use_pool = workers > 1 and document.path
+
+        with (process_pool(workers) if use_pool else nullcontext()) as pool:
+            for index in range(0, len(page_ranges), batch_size):
+                batch = page_ranges[index:index + batch_size]
+                page_numbers = [page_num for start_page, end_page in batch for page_num in range(start_page, end_page + 1)]
+                texts = self._recognize_pages(document, page_numbers, pool, workers, units_per_task)
+
+                for start_page, end_page in batch:
+                    yield ResultType.TEXT, '\n'.join(texts[page_num] for page_num in range(start_page, end_page + 1))
+
+    def _process_hybrid(self, document, page_ranges, render_profile, fallback=None):
+        """
+        텍스트 레이어가 충분한 작업 단위는 텍스트로, 그 외의 작업 단위는 fallback(이미지 또는 OCR)으로 반환
+        이미지로 보내는 작업 단위는 요청 하나에 텍스트와 이미지를 섞지 않도록 모든 페이지를 이미지로 렌더링
+        :param fallback: PDFProcessMode.IMAGE(기본) 또는 PDFProcessMode.IMAGE_OCR
+        """
+        from backend import settings
+
+        fallback = PDFProcessMode.hybrid_fallback(fallback)
+        if fallback == PDFProcessMode.IMAGE_OCR:
+            check_ocr_available()
+
+        workers = settings.PDF_OCR_WORKERS
+        units_per_task = settings.PDF_EXTRACT_UNITS_PER_TASK
+        batch_size = units_per_task * workers * 2
+        use_pool = fallback == PDFProcessMode.IMAGE_OCR and workers > 1 and document.path
+        counts = {ResultType.TEXT: 0, fallback: 0}
+
+        with (process_pool(workers) if use_pool else nullcontext()) as pool:
+            for index in range(0, len(page_ranges), batch_size):
+                batch = page_ranges[index:index + batch_size]
+
+                texts = {}
+                scanned_pages = []
+                for start_page, end_page in batch:
+                    for page_num in range(start_page, end_page + 1):
+                        page = document.doc[page_num]
+                        texts[page_num] = page.get_text()
+                        if not has_text_layer(page, texts[page_num], settings.PDF_HYBRID_MIN_CHARS,
+                                              settings.PDF_HYBRID_MAX_IMAGE_COVERAGE):
+                            scanned_pages.append(page_num)
+
+                # OCR은 텍스트 레이어가 부족한 페이지만 인식
+                if fallback == PDFProcessMode.IMAGE_OCR and scanned_pages:
+                    texts.update(self._recognize_pages(document, scanned_pages, pool, workers, units_per_task))
+
+                scanned_pages = set(scanned_pages)
+                for start_page, end_page in batch:
+                    unit_pages = range(start_page, end_page + 1)
+                    if fallback == PDFProcessMode.IMAGE and scanned_pages.intersection(unit_pages):
+                        counts[fallback] += 1
+                        yield extract_images(document.doc, start_page, end_page, render_profile)
+                    else:
+                        counts[ResultType.TEXT if scanned_pages.isdisjoint(unit_pages) else fallback] += 1
+                        yield ResultType.TEXT, '\n'.join(texts[page_num] for page_num in unit_pages)
+
+        logger.log(logging.INFO, f"API: Hybrid PDF: {counts[ResultType.TEXT]} work units are sent as text, "
+                                 f"{counts[fallback]} work units use {fallback.value}.")
+
+    def _recognize_pages(self, document, page_numbers, pool=None, workers=1, units_per_task=1):
+        """
+        페이지 해시별 캐시에 없는 페이지만 OCR하고 결과를 캐시에 저장
+        같은 내용의 페이지는 한 번만 인식
+        :return: page_num -> 텍스트
+        """
+        from backend import settings
+
+        language = settings.PDF_OCR_LANGUAGE
+        dpi = settings.PDF_OCR_DPI
+
+        page_hashes = {page_num: get_page_hash(document.doc, page_num) for page_num in page_numbers}
+        texts = get_cached_ocr_texts(page_hashes, language, dpi)
+
+        # 페이지 해시 -> 인식할 페이지 (같은 해시는 처음 나온 페이지만)
+        missing = {}
+        for page_num in page_numbers:
+            if page_num not in texts:
+                missing.setdefault(page_hashes[page_num], page_num)
+        missing_pages = list(missing.values())
+
+        if pool and len(missing_pages) > 1:
+            tasks = [(document.path, missing_pages[index:index + units_per_task], language, dpi)
+                     for index in range(0, len(missing_pages), units_per_task)]
+            results = [text for chunk in iter_pool_results(pool, ocr_pages, tasks, workers * 2) for text in chunk]
+        else:
+            results = [ocr_page(document.doc[page_num], language, dpi) for page_num in missing_pages]
+
+        recognized = dict(zip(missing_pages, results))
+        if recognized:
+            save_ocr_texts(page_hashes, recognized, language, dpi, settings.PDF_OCR_CACHE_TIMEOUT)
+
+        for page_num in page_numbers:
+            if page_num not in texts:
+                texts[page_num] = recognized[missing[page_hashes[page_num]]]
+
+        logger.log(logging.DEBUG, f"API: {len(recognized)} of {len(page_numbers)} pages are recognized by OCR.")
+        return texts
+
     def process_text(self, prompt, *args, **kwargs):
         """파일 텍스트 Prompt 처리 로직"""
         data = kwargs.get('data')
         return f'{prompt}\n\n{data}'
 
-    def _extract_text_from_pdf(self, file, start_page=None, end_page=None):
-        if start_page is None or end_page is None:
-            logger.log(logging.ERROR, f"API: start_page and end_page must be provided")
-            raise ValueError("start_page and end_page must be provided")
-
-        doc = fitz.open(file)
-        all_text = []
-
-        start_page = max(0, start_page)
-        end_page = min(len(doc) - 1, end_page)
-
-        for page_num in range(start_page, end_page + 1):
-            page = doc[page_num]
-            all_text.append(page.get_text())
-
-        doc.close()
-        return ResultType.TEXT, '\n'.join(all_text)
-
-    def _extract_images_from_pdf(self, file, start_page=None, end_page=None, dpi=72):
-        if start_page is None or end_page is None:
-            logger.log(logging.ERROR, f"API: start_page and end_page must be provided")
-            raise ValueError("start_page and end_page must be provided")
-
-        doc = fitz.open(file)
-        images_base64 = []
-
-        start_page = max(0, start_page)
-        end_page = min(len(doc) - 1, end_page)
-
-        for page_num in range(start_page, end_page + 1):
-            page = doc.load_page(page_num)
-
-            zoom_matrix = fitz.Matrix(dpi / 72, dpi / 72)
-            pix = page.get_pixmap(matrix=zoom_matrix)
-
-            img_base64 = base64.b64encode(pix.tobytes(output="jpeg")).decode('utf-8')
-            images_base64.append(img_base64)
-
-        doc.close()
-        return ResultType.IMAGE, images_base64
-
     def get_size(self, file):
         try:
-            if isinstance(file, (InMemoryUploadedFile, TemporaryUploadedFile)):
-                file_bytes = io.BytesIO(file.read())
-                doc = fitz.open(stream=file_bytes, filetype="pdf")
-            else:
-                doc = fitz.open(file)
-
-            return len(doc)
+            with open_pdf_document(file) as document:
+                return document.page_count
         except Exception as e:
             logger.log(logging.ERROR, f"API: Cannot read PDF size: {str(e)}")
             raise ValueError(f"Cannot read PDF size: {str(e)}")
@@ -134,16 +424,26 @@ class PDFProcessor(BaseFileProcessor):
             pdf_mode = PDFProcessMode.from_string(kwargs.get('pdf_mode'))
 
             json_data = []
-            for index, (result_type, result) in enumerate(self.process(file, work_unit=work_unit, pdf_mode=pdf_mode)):
-                data = {
-                    "index": index,
-                    "preview": result,
-                    "type": result_type,
-                }
-
-                json_data.append(data)
-                if index >= 2:  # 3개 제시함
-                    break
+            with open_pdf_document(file) as document:
+                pages = self.process(document, work_unit=work_unit, pdf_mode=pdf_mode,
+                                     render_profile=kwargs.get('render_profile'),
+                                     hybrid_fallback=kwargs.get('hybrid_fallback'))
+                for index, (result_type, result) in enumerate(pages):
+                    if result_type == ResultType.IMAGE:
+                        result = [base64.b64encode(image).decode('utf-8') for image in result]
+
+                    data = {
+                        "index": index,
+                        "preview": result,
+                        "type": result_type,
+                    }
+
+                    json_data.append(data)
+                    if index >= 2:  # 3개 제시함
+                        break
+
+                # 남은 추출(병렬 작업 포함)을 문서를 닫기 전에 정리
+                pages.close()
 
             final_data = {
                 "preview_type": "pdf",
@@ -0,0 +1,214 @@
+import logging
+import math
+
+import fitz
+
+logger = logging.getLogger(__name__)
+
+# 여백을 자를 때 내용 주변에 남기는 여백 (pt)
+CROP_MARGIN = 12
+
+
+class ImageFormat:
+    """렌더링한 이미지의 형식"""
+    JPEG = 'jpeg'
+    WEBP = 'webp'  # Pillow 필요
+
+    MIME_TYPES = {
+        JPEG: 'image/jpeg',
+        WEBP: 'image/webp',
+    }
+
+    EXTENSIONS = {
+        JPEG: '.jpg',
+        WEBP: '.webp',
+    }
+
+    @classmethod
+    def detect(cls, image):
+        """이미지(bytes)의 앞부분으로 형식 판단"""
+        if image[:4] == b'RIFF' and image[8:12] == b'WEBP':
+            return cls.WEBP
+        return cls.JPEG
+
+    @classmethod
+    def from_file_name(cls, file_name):
+        """저장된 파일의 확장자로 형식 판단 (예전 데이터는 JPEG)"""
+        for image_format, extension in cls.EXTENSIONS.items():
+            if file_name and file_name.lower().endswith(extension):
+                return image_format
+        return cls.JPEG
+
+
+class PDFRenderProfile:
+    """
+    이미지 모드에서 PDF 페이지를 렌더링하는 설정
+    BatchJob.configs['render_profile']에 이름을 지정하거나, {"name": ..., 값...} 형태로 일부 값만 바꾸어 사용
+
+    max_long_side, max_short_side는 OpenAI high detail 기준(긴 변 2048px, 짧은 변 768px로 축소 후 512px 타일)에 맞추어
+    요청 후 축소되어 버려지는 해상도를 처음부터 렌더링하지 않도록 제한
+    """
+    DEFAULT = 'default'
+    DETAILS = [None, 'low', 'high', 'auto']
+
+    PROFILES = {
+        # 기존 렌더링 방식 (72 DPI, JPEG 품질 95)
+        'default': {
+            "dpi": 72,
+            "max_long_side": None,
+            "max_short_side": None,
+            "grayscale": False,
+            "format": ImageFormat.JPEG,
+            "quality": 95,
+            "crop_whitespace": False,
+            "detail": None,
+        },
+        # 본문을 읽을 수 있는 해상도, 짧은 변 768px 이하 (A4 한 쪽이 타일 6개 이하)
+        'document': {
+            "dpi": 150,
+            "max_long_side": 1536,
+            "max_short_side": 768,
+            "grayscale": False,
+            "format": ImageFormat.JPEG,
+            "quality": 80,
+            "crop_whitespace": True,
+            "detail": "high",
+        },
+        # 흑백 문서용, 회색조 WebP로 전송 크기를 줄임
+        'document_gray': {
+            "dpi": 150,
+            "max_long_side": 1536,
+            "max_short_side": 768,
+            "grayscale": True,
+            "format": ImageFormat.WEBP,
+            "quality": 70,
+            "crop_whitespace": True,
+            "detail": "high",
+        },
+        # 페이지 전체를 512px 이하로 보내는 low detail 요청, 큰 글씨나 도표 위주의 페이지용
+        'thumbnail': {
+            "dpi": 72,
+            "max_long_side": 512,
+            "max_short_side": 512,
+            "grayscale": False,
+            "format": ImageFormat.JPEG,
+            "quality": 70,
+            "crop_whitespace": True,
+            "detail": "low",
+        },
+    }
+
+    @classmethod
+    def get_descriptions(cls):
+        return {
+            'default': "72 DPI JPEG, the original page size.",
+            'document': "Readable text with at most 768px on the short side.",
+            'document_gray': "Grayscale WebP for black-and-white documents.",
+            'thumbnail': "A single low-detail tile per page.",
+        }
+
+    @classmethod
+    def resolve(cls, profile=None):
+        """
+        이름 또는 dict로 지정된 프로필을 모든 값이 채워진 dict로 변환
+        프로세스 풀의 작업자에게 그대로 전달할 수 있도록 dict로 반환
+        """
+        if isinstance(profile, dict):
+            options = dict(profile)
+            name = options.pop('name', cls.DEFAULT)
+        else:
+            options = {}
+            name = profile or cls.DEFAULT
+
+        if not isinstance(name, str):
+            raise ValueError(f"The render profile name must be a string: {name!r}")
+        if name not in cls.PROFILES:
+            raise NotImplementedError(f"The given render profile '{name}' is not supported.")
+
+        unknown_keys = set(options) - set(cls.PROFILES[name])
+        if unknown_keys:
+            raise ValueError(f"Unknown render profile options: {', '.join(sorted(unknown_keys))}")
+
+        resolved = {**cls.PROFILES[name], **options}
+        # JSON으로 받은 값("150", 150.0 등)을 렌더링에 사용하는 타입으로 변환
+        resolved['dpi'] = cls._to_number(resolved, 'dpi', float)
+        resolved['quality'] = cls._to_number(resolved, 'quality', int)
+        for key in ['max_long_side', 'max_short_side']:
+            if resolved[key] is not None:
+                resolved[key] = cls._to_number(resolved, key, int)
+        for key in ['grayscale', 'crop_whitespace']:
+            if not isinstance(resolved[key], bool):
+                raise ValueError(f"The render profile option '{key}' must be true or false.")
+
+        if not isinstance(resolved['format'], str) or resolved['format'] not in ImageFormat.MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {resolved['format']}")
+        if resolved['detail'] not in cls.DETAILS:
+            raise ValueError(f"Unsupported image detail: {resolved['detail']}")
+        if not 1 <= resolved['quality'] <= 100:
+            raise ValueError("The image quality must be between 1 and 100.")
+        if not math.isfinite(resolved['dpi']) or resolved['dpi'] <= 0:
+            raise ValueError("The DPI must be greater than 0.")
+        for key in ['max_long_side', 'max_short_side']:
+            if resolved[key] is not None and resolved[key] <= 0:
+                raise ValueError(f"The render profile option '{key}' must be greater than 0.")
+
+        return resolved
+
+    @staticmethod
+    def _to_number(options, key, number_type):
+        """옵션 값을 number_type으로 변환, 숫자가 아니라면 ValueError (bool은 숫자로 보지 않음)"""
+        value = options[key]
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            return number_type(float(value)) if number_type is int else number_type(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"The render profile option '{key}' must be a number: {value!r}")
+
+
+def get_content_rect(page, margin=CROP_MARGIN):
+    """텍스트, 이미지, 도형이 그려진 영역을 합친 사각형 (여백 포함), 내용이 없다면 페이지 전체"""
+    content_rect = fitz.Rect()
+    for _, bbox in page.get_bboxlog():
+        content_rect |= fitz.Rect(bbox)
+
+    if content_rect.is_empty or content_rect.is_infinite:
+        return page.rect
+
+    content_rect = (content_rect + (-margin, -margin, margin, margin)) & page.rect
+    return page.rect if content_rect.is_empty else content_rect
+
+
+def get_render_options(page, render_profile):
+    """
+    프로필에 따라 렌더링할 영역(clip)과 배율(matrix) 계산
+    :return: (matrix, clip), 렌더링된 이미지 크기는 (clip * matrix).irect
+    """
+    clip = page.rect
+    # 회전된 페이지는 그려진 영역의 좌표계가 달라지므로 여백을 자르지 않음
+    if render_profile['crop_whitespace'] and not page.rotation:
+        clip = get_content_rect(page)
+
+    zoom = render_profile['dpi'] / 72
+    long_side = max(clip.width, clip.height) * zoom
+    short_side = min(clip.width, clip.height) * zoom
+
+    if render_profile['max_long_side'] and long_side > render_profile['max_long_side']:
+        zoom *= render_profile['max_long_side'] / long_side
+        short_side *= render_profile['max_long_side'] / long_side
+    if render_profile['max_short_side'] and short_side > render_profile['max_short_side']:
+        zoom *= render_profile['max_short_side'] / short_side
+
+    return fitz.Matrix(zoom, zoom), clip
+
+
+def render_page(page, render_profile):
+    """프로필에 따라 페이지 하나를 이미지(bytes)로 렌더링"""
+    matrix, clip = get_render_options(page, render_profile)
+    colorspace = fitz.csGRAY if render_profile['grayscale'] else fitz.csRGB
+    pix = page.get_pixmap(matrix=matrix, clip=clip, colorspace=colorspace)
+
+    quality = int(render_profile['quality'])
+    if render_profile['format'] == ImageFormat.WEBP:
+        return pix.pil_tobytes(format="WEBP", quality=quality)
+    return pix.tobytes(output="jpeg", jpg_quality=quality)
@@ -0,0 +1,122 @@
+import codecs
+import hashlib
+import io
+from unittest import mock
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from api.utils.files_processor.base_processor import ResultType
+from api.utils.files_processor.csv_processor import CSVProcessor, CSVEngine
+
+CSV_DATA = "name, score ,memo,unused\n Kim ,90,hello {x},a\nLee,85.5,,b\nPark,,world ,c\n"
+
+
+class CSVProcessorTest(SimpleTestCase):
+    prompt = "{name} scored {score} ({memo}) / {name}"
+    selected_headers = ["name", "score", "memo"]
+
+    def test_process_prompts_matches_process_text(self):
+        processor = CSVProcessor()
+
+        expected = [
+            processor.process_text(self.prompt, columns=columns, row=row, selected_headers=self.selected_headers)
+            for _, (columns, row) in processor.process(io.StringIO(CSV_DATA))
+        ]
+        rendered = [text_data for result_type, text_data in
+                    processor.process_prompts(io.StringIO(CSV_DATA), self.prompt, self.selected_headers)]
+
+        self.assertEqual(rendered, expected)
+        self.assertEqual(rendered[0], "Kim scored 90.0 (hello {x}) / Kim")
+
+    @mock.patch('backend.settings.CSV_ENGINE', CSVEngine.PYARROW)
+    def test_pyarrow_engine_reads_original_strings(self):
+        processor = CSVProcessor()
+
+        rendered = [text_data for result_type, text_data in
+                    processor.process_prompts(io.BytesIO(CSV_DATA.encode('utf-8')), self.prompt, self.selected_headers)]
+
+        self.assertEqual(rendered, [
+            "Kim scored 90 (hello {x}) / Kim",
+            "Lee scored 85.5 () / Lee",
+            "Park scored  (world) / Park",
+        ])
+
+    def test_missing_key_is_checked_against_header(self):
+        processor = CSVProcessor()
+
+        with self.assertRaises(ValueError):
+            list(processor.process_prompts(io.StringIO(CSV_DATA), "{unused}", self.selected_headers))
+
+    def test_prompt_without_keys(self):
+        processor = CSVProcessor()
+
+        rendered = list(processor.process_prompts(io.StringIO(CSV_DATA), "static", self.selected_headers))
+        self.assertEqual(rendered, [(ResultType.TEXT, "static")] * 3)
+
+
+class CSVMetadataTest(SimpleTestCase):
+    def test_metadata_matches_pandas(self):
+        csv_data = 'name,memo\nKim,"line 1\nline 2"\n\nLee,"say ""hi"""\nTV,55" screen\n' + 'Park,end\n' * 1000
+        metadata = CSVProcessor().get_metadata(SimpleUploadedFile("test.csv", csv_data.encode('utf-8')))
+
+        self.assertEqual(metadata['total_size'], len(pd.read_csv(io.StringIO(csv_data))))
+        self.assertEqual(metadata['headers'], ["name", "memo"])
+        self.assertEqual(metadata['file_size'], len(csv_data.encode('utf-8')))
+        self.assertEqual(metadata['content_hash'], hashlib.sha256(csv_data.encode('utf-8')).hexdigest())
+
+
+class CSVSniffTest(SimpleTestCase):
+    def sniff(self, data):
+        return CSVProcessor().sniff(SimpleUploadedFile("test.csv", data))
+
+    def test_cp949_with_semicolon(self):
+        data = "이름;점수\n김철수;90\n이영희;85\n".encode('cp949')
+        dialect = self.sniff(data)['dialect']
+
+        self.assertEqual(dialect['encoding'], "cp949")
+        self.assertEqual(dialect['delimiter'], ";")
+        self.assertEqual(dialect['headers'], ["이름", "점수"])
+
+        rendered = list(CSVProcessor().process_prompts(io.BytesIO(data), "{이름}={점수}", ["이름", "점수"],
+                                                       dialect=dialect))
+        self.assertEqual(rendered[0], (ResultType.TEXT, "김철수=90"))
+
+    def test_utf8_bom_without_header(self):
+        data = codecs.BOM_UTF8 + "1,0.5\n2,\n".encode('utf-8')
+        metadata = self.sniff(data)
+
+        self.assertEqual(metadata['dialect']['encoding'], "utf-8-sig")
+        self.assertFalse(metadata['dialect']['has_header'])
+        self.assertEqual(metadata['headers'], ["0", "1"])
+        self.assertIsNone(metadata['total_size'])
+
+        full_metadata = CSVProcessor().get_metadata(SimpleUploadedFile("test.csv", data),
+                                                    dialect=metadata['dialect'])
+        self.assertEqual(full_metadata['total_size'], 2)
+
+    def test_empty_and_numeric_headers(self):
+        # pandas to_csv의 빈 index header, 연도 header는 header로 사용
+        for data, headers in [(",name,age\n0,김철수,20\n1,이영희,30\n", ["Unnamed: 0", "name", "age"]),
+                              ("id,2023,2024\n1,10,20\n2,30,40\n", ["id", "2023", "2024"]),
+                              ("name,memo\n1,2\n", ["name", "memo"])]:
+            dialect = self.sniff(data.encode('utf-8'))['dialect']
+            self.assertTrue(dialect['has_header'])
+            self.assertEqual(dialect['headers'], headers)
+
+    @mock.patch('api.utils.files_processor.csv_processor.SNIFF_SIZE', 64)
+    def test_only_prefix_is_read(self):
+        class RecordingFile(io.BytesIO):
+            read_sizes = []
+
+            def read(self, size=-1):
+                self.read_sizes.append(size)
+                return super().read(size)
+
+        data = ("name,memo\n" + "".join(f"name {index},memo {index}\n" for index in range(1000))).encode('utf-8')
+        file = RecordingFile(data)
+        metadata = CSVProcessor().sniff(file)
+
+        self.assertEqual(file.read_sizes, [64])
+        self.assertEqual(metadata['dialect']['delimiter'], ",")
@@ -0,0 +1,317 @@
+import os
+import tempfile
+from unittest import mock
+
+import billiard
+import fitz
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from api.utils.files_processor.base_processor import ResultType
+from api.utils.files_processor.pdf_processor import PDFProcessor, PDFDocument, PDFProcessMode
+from api.utils.files_processor.render_profiles import PDFRenderProfile, ImageFormat
+
+
+def write_pdf(file_path, pages):
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            doc.new_page().insert_text((50, 72), f"Page {page_num}")
+        doc.save(file_path)
+
+
+def extract_in_daemon_worker(file_path, workers):
+    """Celery prefork 워커와 같은 daemon 프로세스 안에서 추출하고, 프로세스 풀을 사용했는지 함께 반환"""
+    from api.utils.files_processor import pdf_processor
+
+    with mock.patch('backend.settings.PDF_EXTRACT_WORKERS', workers), \
+            mock.patch('backend.settings.PDF_EXTRACT_UNITS_PER_TASK', 2), \
+            mock.patch.object(pdf_processor, 'iter_pool_results', wraps=pdf_processor.iter_pool_results) as pool:
+        results = list(PDFProcessor().process(file_path, work_unit=2, pdf_mode="text"))
+
+    return billiard.current_process().daemon, pool.called, results
+
+
+def fake_ocr_pages(file_path, page_numbers, language, dpi):
+    """Tesseract 없이 프로세스 풀에서 실행되는 OCR (page 번호와 프로세스 id 반환)"""
+    return [f"ocr {page_num} {os.getpid()}" for page_num in page_numbers]
+
+
+def ocr_in_daemon_worker(file_path, ocr_pages=None):
+    """Celery prefork 워커와 같은 daemon 프로세스 안에서 IMAGE_OCR 모드로 2개의 프로세스를 사용하여 인식"""
+    from api.utils.files_processor import pdf_processor
+
+    cache.clear()
+    patches = [
+        mock.patch('backend.settings.PDF_OCR_WORKERS', 2),
+        mock.patch('backend.settings.PDF_EXTRACT_UNITS_PER_TASK', 1),
+    ]
+    if ocr_pages:
+        patches += [mock.patch.object(pdf_processor, 'check_ocr_available'),
+                    mock.patch.object(pdf_processor, 'ocr_pages', ocr_pages)]
+
+    for patch in patches:
+        patch.start()
+    try:
+        results = list(PDFProcessor().process(file_path, work_unit=1, pdf_mode="image_ocr"))
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    return os.getpid(), results
+
+
+class PDFParallelExtractTest(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "sample.pdf")
+        write_pdf(self.file_path, 7)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def extract(self, workers, pdf_mode):
+        with mock.patch('backend.settings.PDF_EXTRACT_WORKERS', workers), \
+                mock.patch('backend.settings.PDF_EXTRACT_UNITS_PER_TASK', 2):
+            return list(PDFProcessor().process(self.file_path, work_unit=2, pdf_mode=pdf_mode))
+
+    def test_parallel_extraction_keeps_order(self):
+        serial = self.extract(1, "text")
+        parallel = self.extract(2, "text")
+
+        self.assertEqual(len(serial), 4)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel[-1], (ResultType.TEXT, "Page 6\n"))
+
+    def test_parallel_image_extraction(self):
+        self.assertEqual(self.extract(2, "image"), self.extract(1, "image"))
+
+    def test_parallel_extraction_in_celery_worker(self):
+        worker = billiard.Pool(1)
+        try:
+            daemon, used_pool, results = worker.apply(extract_in_daemon_worker, (self.file_path, 2))
+        finally:
+            worker.terminate()
+            worker.join()
+
+        self.assertTrue(daemon)
+        self.assertTrue(used_pool)
+        self.assertEqual(results, self.extract(1, "text"))
+
+
+class PDFDocumentTest(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "sample.pdf")
+        write_pdf(self.file_path, 5)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_process_opens_document_once(self):
+        with mock.patch('api.utils.files_processor.pdf_processor.fitz.open', wraps=fitz.open) as fitz_open:
+            pages = list(PDFProcessor().process(self.file_path, work_unit=1, pdf_mode="text"))
+
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(fitz_open.call_count, 1)
+
+    def test_session_is_shared_by_size_preview_and_process(self):
+        processor = PDFProcessor()
+
+        with mock.patch('api.utils.files_processor.pdf_processor.fitz.open', wraps=fitz.open) as fitz_open:
+            with PDFDocument(self.file_path) as document:
+                size = processor.get_size(document)
+                preview = processor.get_preview(document, work_unit=2, pdf_mode="text")
+                pages = list(processor.process(document, work_unit=2, pdf_mode="text"))
+            self.assertIsNone(document.doc)
+
+        self.assertEqual(fitz_open.call_count, 1)
+        self.assertEqual(size, 5)
+        self.assertEqual(len(preview['data']), 3)
+        self.assertEqual(pages[0], (ResultType.TEXT, "Page 0\n\nPage 1\n"))
+
+    def test_in_memory_upload(self):
+        with open(self.file_path, 'rb') as f:
+            upload = SimpleUploadedFile("sample.pdf", f.read(), content_type="application/pdf")
+
+        processor = PDFProcessor()
+        self.assertEqual(processor.get_size(upload), 5)
+        self.assertEqual(len(list(processor.process(upload, work_unit=1, pdf_mode="text"))), 5)
+        self.assertEqual(upload.tell(), 0)
+
+
+class PDFRenderProfileTest(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "sample.pdf")
+        write_pdf(self.file_path, 2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def render(self, render_profile):
+        pages = PDFProcessor().process(self.file_path, work_unit=1, pdf_mode="image", render_profile=render_profile)
+        return [images[0] for _, images in pages]
+
+    def test_default_profile_keeps_original_rendering(self):
+        with fitz.open(self.file_path) as doc:
+            expected = doc[0].get_pixmap(matrix=fitz.Matrix(1, 1)).tobytes(output="jpeg")
+
+        self.assertEqual(self.render(None)[0], expected)
+
+    def test_profile_limits_size_and_crops_whitespace(self):
+        image = self.render({"name": "thumbnail", "crop_whitespace": False})[0]
+        cropped = self.render("thumbnail")[0]
+
+        pix = fitz.Pixmap(image)
+        self.assertLessEqual(max(pix.width, pix.height), 512)
+        self.assertLess(fitz.Pixmap(cropped).width, pix.width)
+
+    def test_grayscale_webp(self):
+        image = self.render({"name": "document_gray"})[0]
+        self.assertEqual(ImageFormat.detect(image), ImageFormat.WEBP)
+
+    def test_invalid_profile(self):
+        with self.assertRaises(NotImplementedError):
+            PDFRenderProfile.resolve("unknown")
+        with self.assertRaises(ValueError):
+            PDFRenderProfile.resolve({"name": "document", "dpii": 100})
+        with self.assertRaises(ValueError):
+            PDFRenderProfile.resolve({"quality": 0})
+
+        for profile in [{"name": ["document"]}, {"dpi": "high"}, {"dpi": None}, {"quality": [80]},
+                        {"max_long_side": "large"}, {"grayscale": "false"}, {"format": {}}, {"detail": "medium"}]:
+            with self.assertRaises(ValueError, msg=profile):
+                PDFRenderProfile.resolve(profile)
+
+    def test_profile_options_are_coerced(self):
+        resolved = PDFRenderProfile.resolve({"name": "document", "dpi": "100", "quality": 80.0, "max_long_side": "1024"})
+        self.assertEqual((resolved['dpi'], resolved['quality'], resolved['max_long_side']), (100.0, 80, 1024))
+
+
+class PDFOCRTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "scanned.pdf")
+
+        # 1, 3쪽은 같은 내용
+        with fitz.open() as doc:
+            for text in ["same page", "other page", "same page"]:
+                doc.new_page().insert_text((50, 72), text)
+            doc.save(self.file_path)
+
+        patches = [
+            mock.patch('api.utils.files_processor.pdf_processor.check_ocr_available'),
+            mock.patch('api.utils.files_processor.pdf_processor.ocr_page',
+                       side_effect=lambda page, language, dpi: f"ocr {page.number}"),
+            mock.patch('backend.settings.PDF_OCR_WORKERS', 1),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def process(self):
+        return list(PDFProcessor().process(self.file_path, work_unit=2, pdf_mode="image_ocr"))
+
+    def test_ocr_feeds_text_path_and_skips_identical_pages(self):
+        from api.utils.files_processor import pdf_processor
+
+        self.assertEqual(self.process(), [(ResultType.TEXT, "ocr 0\nocr 1"), (ResultType.TEXT, "ocr 0")])
+        self.assertEqual(pdf_processor.ocr_page.call_count, 2)
+
+    def run_in_celery_worker(self, *args):
+        worker = billiard.Pool(1)
+        try:
+            return worker.apply(ocr_in_daemon_worker, (self.file_path,) + args)
+        finally:
+            worker.terminate()
+            worker.join()
+
+    def test_ocr_pool_in_celery_worker(self):
+        worker_pid, results = self.run_in_celery_worker(fake_ocr_pages)
+
+        # 같은 내용의 3쪽은 1쪽의 결과를 사용하고, 나머지는 워커가 아닌 풀의 프로세스에서 인식
+        texts = [text for _, text in results]
+        self.assertEqual([text.split()[:2] for text in texts], [["ocr", "0"], ["ocr", "1"], ["ocr", "0"]])
+        self.assertNotIn(str(worker_pid), [text.split()[2] for text in texts])
+
+    def test_tesseract_in_celery_worker(self):
+        try:
+            fitz.get_tessdata()
+        except RuntimeError:
+            self.skipTest("Tesseract is not installed.")
+
+        with mock.patch('backend.settings.PDF_OCR_LANGUAGE', 'eng'):
+            _, results = self.run_in_celery_worker()
+
+        self.assertEqual([result_type for result_type, _ in results], [ResultType.TEXT] * 3)
+        self.assertIn("other", results[1][1])
+
+    def test_ocr_results_are_cached_per_page_hash(self):
+        from api.utils.files_processor import pdf_processor
+
+        first = self.process()
+        pdf_processor.ocr_page.reset_mock()
+
+        self.assertEqual(self.process(), first)
+        pdf_processor.ocr_page.assert_not_called()
+
+
+class PDFHybridTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "mixed.pdf")
+
+        # 2쪽은 페이지 전체를 덮는 스캔 이미지만 있음
+        with fitz.open() as doc:
+            scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 60, 80), False)
+            scan.clear_with(200)
+            for page_num in range(3):
+                page = doc.new_page()
+                if page_num == 1:
+                    page.insert_image(page.rect, pixmap=scan)
+                else:
+                    page.insert_text((50, 72), f"Page {page_num} has a text layer with enough characters to be sent as text.")
+            doc.save(self.file_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def process(self, work_unit, fallback=None):
+        return list(PDFProcessor().process(self.file_path, work_unit=work_unit, pdf_mode="hybrid",
+                                           hybrid_fallback=fallback))
+
+    def test_only_scanned_pages_are_rasterized(self):
+        results = self.process(1)
+
+        self.assertEqual([result_type for result_type, _ in results],
+                         [ResultType.TEXT, ResultType.IMAGE, ResultType.TEXT])
+        self.assertIn("Page 2 has a text layer", results[2][1])
+        self.assertEqual(len(results[1][1]), 1)
+
+    def test_mixed_work_unit_is_sent_as_images(self):
+        results = self.process(2)
+
+        self.assertEqual([result_type for result_type, _ in results], [ResultType.IMAGE, ResultType.TEXT])
+        self.assertEqual(len(results[0][1]), 2)
+
+    @mock.patch('backend.settings.PDF_OCR_WORKERS', 1)
+    @mock.patch('api.utils.files_processor.pdf_processor.check_ocr_available')
+    @mock.patch('api.utils.files_processor.pdf_processor.ocr_page', return_value="recognized")
+    def test_ocr_fallback_only_recognizes_scanned_pages(self, ocr_page, _):
+        results = self.process(2, fallback="image_ocr")
+
+        self.assertEqual([result_type for result_type, _ in results], [ResultType.TEXT, ResultType.TEXT])
+        self.assertTrue(results[0][1].endswith("\nrecognized"))
+        self.assertEqual(ocr_page.call_count, 1)
+
+    def test_invalid_fallback(self):
+        self.assertEqual(PDFProcessMode.hybrid_fallback(None), PDFProcessMode.IMAGE)
+        for fallback in ["text", "hybrid", "unknown", ["image"]]:
+            with self.assertRaises(NotImplementedError):
+                PDFProcessMode.hybrid_fallback(fallback)
@@ -26,3 +26,72 @@ def get_prompt(prompt, data):
         logger = logging.getLogger(__name__)
         logger.log(logging.ERROR, f"API: An unexpected error occurred when generating prompt: {e}")
         raise ValueError(f"An unexpected error occurred when generating prompt: {e}")
+
+
+class PromptTemplate:
+    """
+    작업마다 한 번만 해석해 두는 Prompt 렌더링 계획
+    Prompt를 고정 문자열과 {key} 자리로 나누어 두고, pandas chunk의 열 단위로 한 번에 렌더링
+    """
+    KEY_PATTERN = re.compile(r"{(.+?)}")
+
+    def __init__(self, prompt):
+        # 나눈 결과는 [고정 문자열, key, 고정 문자열, key, ..., 고정 문자열]
+        parts = self.KEY_PATTERN.split(prompt)
+        self.literals = parts[0::2]
+        self.keys = parts[1::2]
+
+    def get_columns(self, columns, selected_headers):
+        """
+        header 행으로 Prompt의 모든 key가 선택된 열에 있는지 한 번만 확인
+        :return: key 순서의 실제 열 이름 목록
+        """
+        selected_headers = {str(header).strip() for header in selected_headers}
+        column_map = {str(column).strip(): column for column in columns if str(column).strip() in selected_headers}
+
+        missing_keys = [key for key in self.keys if key not in column_map]
+        if missing_keys:
+            logger = logging.getLogger(__name__)
+            logger.log(logging.ERROR, f"API: Missing key: {', '.join(missing_keys)} in prompt or data. "
+                                      f"Headers provided: {list(column_map.keys())}")
+            raise ValueError(f"Missing key: {', '.join(missing_keys)} in prompt or data. "
+                             f"Headers provided: {list(column_map.keys())}")
+
+        return [column_map[key] for key in self.keys]
+
+    def render_frame(self, df, columns):
+        """
+        DataFrame의 모든 행을 한 번에 렌더링
+        :param columns: get_columns로 얻은 열 이름 목록
+        :return: 행 순서의 Prompt 목록
+        """
+        if not self.keys:
+            return [self.literals[0]] * len(df)
+
+        values = {column: df[column].astype(str).str.strip() for column in set(columns)}
+
+        rendered = self.literals[0] + values[columns[0]]
+        for literal, column in zip(self.literals[1:], columns[1:]):
+            rendered = rendered + literal + values[column]
+        rendered = rendered + self.literals[-1]
+
+        return rendered.tolist()
+
+    def render_arrow(self, batch, columns):
+        """
+        pyarrow RecordBatch의 모든 행을 Arrow 문자열 연산으로 렌더링하고, 마지막에 Python 문자열로 변환
+        :param columns: get_columns로 얻은 열 이름 목록
+        """
+        import pyarrow.compute as pc
+
+        if not self.keys:
+            return [self.literals[0]] * batch.num_rows
+
+        values = {column: pc.utf8_trim_whitespace(batch.column(column)) for column in set(columns)}
+
+        parts = [self.literals[0]]
+        for column, literal in zip(columns, self.literals[1:]):
+            parts += [values[column], literal]
+
+        # 마지막 인자는 구분자
+        return pc.binary_join_element_wise(*parts, "").to_pylist()
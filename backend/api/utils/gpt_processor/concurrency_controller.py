@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+
+import redis
+from openai import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+
+from api.utils.cache_keys import concurrency_cache_key, concurrency_history_cache_key
+from api.utils.gpt_processor.rate_limiter import RedisBucketStore
+
+logger = logging.getLogger(__name__)
+
+LEASE_PREFIX = 'lease:'
+
+_concurrency_controller = None
+
+
+class ConcurrencySignal:
+    """요청 결과로 Controller에 전달하는 신호"""
+    SUCCESS = 'success'
+    RATE_LIMITED = 'rate_limited'  # 429 응답
+    ERROR = 'error'  # 5xx 응답, 타임아웃, 연결 오류
+    LATENCY = 'latency'  # 응답 시간이 기준보다 크게 늘어남
+
+
+def get_error_signal(error):
+    """요청 실패 원인에 맞는 신호 반환, 요청 내용의 문제라면 None (제한 값을 조절하지 않음)"""
+    if isinstance(error, RateLimitError):
+        return ConcurrencySignal.RATE_LIMITED
+    if isinstance(error, (APITimeoutError, APIConnectionError, InternalServerError)):
+        return ConcurrencySignal.ERROR
+    return None
+
+
+class AIMDConcurrencyController:
+    """
+    gpt_model별 동시 요청 수(in-flight) 제한을 AIMD 방식으로 조절
+    - 성공: 제한 값 만큼 성공할 때마다 1씩 증가 (Additive Increase)
+    - 429, 오류, 응답 시간 증가: decrease_factor를 곱하여 감소 (Multiplicative Decrease)
+    요청 중인 슬롯은 만료 시각을 가진 lease로 저장하므로 워커가 종료되어도 슬롯이 남지 않음
+    """
+
+    def __init__(self, store, min_limit=1, max_limit=256, initial_limit=8, decrease_factor=0.5,
+                 latency_decrease_factor=0.9, latency_tolerance=3.0, lease_timeout=660, history_size=100,
+                 poll_interval=0.1, clock=time.time, sleep=time.sleep):
+        self.store = store
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.initial_limit = initial_limit
+        self.decrease_factor = decrease_factor
+        self.latency_decrease_factor = latency_decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.lease_timeout = lease_timeout
+        self.history_size = history_size
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def _leases(self, state, now):
+        """만료되지 않은 lease만 남김"""
+        for key in [key for key in state if key.startswith(LEASE_PREFIX) and state[key] <= now]:
+            del state[key]
+        return [key for key in state if key.startswith(LEASE_PREFIX)]
+
+    def _limit(self, state):
+        return state.get('limit', self.initial_limit)
+
+    def try_acquire(self, model):
+        """
+        슬롯이 남아 있다면 lease를 발급
+        :return: lease_id, 슬롯이 없다면 None
+        """
+
+        def take(state):
+            now = self.clock()
+            in_flight = len(self._leases(state, now))
+            if in_flight >= max(self.min_limit, math.floor(self._limit(state))):
+                return state, None
+
+            lease_id = uuid.uuid4().hex
+            state[f"{LEASE_PREFIX}{lease_id}"] = now + self.lease_timeout
+            return state, lease_id
+
+        try:
+            return self.store.update(concurrency_cache_key(model), take)
+        except redis.WatchError:
+            # 다른 워커들과 계속 충돌했다면 슬롯이 없는 것으로 보고 poll_interval 뒤에 다시 시도
+            return None
+
+    def acquire(self, model):
+        """슬롯이 생길 때까지 기다린 뒤 lease 발급"""
+        while (lease_id := self.try_acquire(model)) is None:
+            self.sleep(self.poll_interval)
+        return lease_id
+
+    async def acquire_async(self, model):
+        """acquire와 같으나, Redis 요청은 이벤트 루프를 막지 않도록 스레드에서 실행"""
+        while (lease_id := await asyncio.to_thread(self.try_acquire, model)) is None:
+            await asyncio.sleep(self.poll_interval)
+        return lease_id
+
+    def release(self, model, lease_id, latency, signal):
+        """lease를 반납하고 요청 결과에 따라 제한 값을 조절"""
+
+        def update(state):
+            now = self.clock()
+            state.pop(f"{LEASE_PREFIX}{lease_id}", None)
+            in_flight = len(self._leases(state, now))
+
+            old_limit = self._limit(state)
+            limit = old_limit
+            reason = signal
+
+            # 동시에 실패한 요청들이 제한 값을 한꺼번에 줄이지 않도록 응답 시간 한 번에 한 번만 감소
+            cooldown = max(1.0, state.get('latency_ewma', 0.0))
+            can_decrease = now - state.get('decreased_at', 0.0) >= cooldown
+
+            if signal is None:
+                pass
+
+            elif signal == ConcurrencySignal.SUCCESS:
+                latency_ewma = latency if 'latency_ewma' not in state else 0.8 * state['latency_ewma'] + 0.2 * latency
+                # 기준 응답 시간은 천천히 늘어나도록 하여 Provider의 상태 변화를 따라감
+                latency_min = min(state.get('latency_min', latency) * 1.01, latency)
+                state['latency_ewma'] = latency_ewma
+                state['latency_min'] = latency_min
+
+                if latency_ewma > latency_min * self.latency_tolerance:
+                    reason = ConcurrencySignal.LATENCY
+                    if can_decrease:
+                        limit = old_limit * self.latency_decrease_factor
+                else:
+                    limit = old_limit + 1 / old_limit
+
+            elif can_decrease:
+                limit = old_limit * self.decrease_factor
+
+            limit = min(self.max_limit, max(self.min_limit, limit))
+            if limit < old_limit:
+                state['decreased_at'] = now
+            state['limit'] = limit
+
+            return state, {
+                "at": now,
+                "limit": limit,
+                "previous_limit": old_limit,
+                "reason": reason,
+                "latency": latency,
+                "in_flight": in_flight,
+            }
+
+        entry = self.store.update(concurrency_cache_key(model), update)
+
+        # 정수 단위로 제한 값이 바뀐 경우만 기록
+        if math.floor(entry['limit']) != math.floor(entry['previous_limit']):
+            self.store.push_history(concurrency_history_cache_key(model), entry, self.history_size)
+
+            if entry['limit'] < entry['previous_limit']:
+                logger.log(logging.INFO, f"Celery: The concurrency limit for {model} decreased to "
+                                         f"{math.floor(entry['limit'])} ({entry['reason']}).")
+
+    def get_status(self, model):
+        """현재 제한 값, 요청 중인 수, 응답 시간과 변경 기록 반환"""
+        state = self.store.get(concurrency_cache_key(model))
+        return {
+            "model": model,
+            "limit": math.floor(self._limit(state)),
+            "in_flight": len(self._leases(state, self.clock())),
+            "latency_ewma": state.get('latency_ewma'),
+            "latency_min": state.get('latency_min'),
+            "history": self.store.get_history(concurrency_history_cache_key(model)),
+        }
+
+
+def get_concurrency_controller():
+    """
+    현재 프로세스에서 재사용되는 Controller 반환 (REDIS_DB_DJANGO 공유)
+    GPT_ADAPTIVE_CONCURRENCY가 꺼져 있다면 None
+    """
+    global _concurrency_controller
+    from backend import settings
+
+    if not settings.GPT_ADAPTIVE_CONCURRENCY:
+        return None
+
+    if _concurrency_controller is None:
+        _concurrency_controller = AIMDConcurrencyController(
+            store=RedisBucketStore(redis.Redis.from_url(settings.REDIS_DB_DJANGO),
+                                   expire=int(settings.GPT_CLIENT_TIMEOUT) + 3600),
+            min_limit=settings.GPT_CONCURRENCY_MIN_LIMIT,
+            max_limit=settings.GPT_CONCURRENCY_MAX_LIMIT,
+            initial_limit=settings.GPT_CONCURRENCY_INITIAL_LIMIT,
+            latency_tolerance=settings.GPT_CONCURRENCY_LATENCY_TOLERANCE,
+            lease_timeout=settings.GPT_CLIENT_TIMEOUT + 60,
+        )
+    return _concurrency_controller
@@ -0,0 +1,116 @@
+import logging
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from api.utils.gpt_processor.gpt_settings import COMPANY_PROCESSORS
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스마다 하나씩 유지되는 company별 GPT Client
+_clients = {}
+
+
+def get_client_options():
+    """settings.py의 GPT Client 연결 풀, 타임아웃 설정 반환"""
+    from backend import settings
+
+    return {
+        "api_key": settings.OPENAI_API_KEY,
+        "base_url": settings.OPENAI_BASE_URL,
+        "max_connections": settings.GPT_CLIENT_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.GPT_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": settings.GPT_CLIENT_KEEPALIVE_EXPIRY,
+        "timeout": settings.GPT_CLIENT_TIMEOUT,
+        "connect_timeout": settings.GPT_CLIENT_CONNECT_TIMEOUT,
+        "max_retries": settings.GPT_CLIENT_MAX_RETRIES,
+    }
+
+
+def _httpx_options(options):
+    return {
+        "limits": httpx.Limits(
+            max_connections=options["max_connections"],
+            max_keepalive_connections=options["max_keepalive_connections"],
+            keepalive_expiry=options["keepalive_expiry"],
+        ),
+        "timeout": httpx.Timeout(options["timeout"], connect=options["connect_timeout"]),
+    }
+
+
+def create_openai_client(options):
+    return OpenAI(
+        api_key=options["api_key"],
+        base_url=options["base_url"],
+        max_retries=options["max_retries"],
+        http_client=DefaultHttpxClient(**_httpx_options(options)),
+    )
+
+
+def create_openai_async_client(options):
+    return AsyncOpenAI(
+        api_key=options["api_key"],
+        base_url=options["base_url"],
+        max_retries=options["max_retries"],
+        http_client=DefaultAsyncHttpxClient(**_httpx_options(options)),
+    )
+
+
+# gpt_settings.COMPANY_PROCESSORS와 같은 company 키 사용
+COMPANY_CLIENTS = {
+    "openai": create_openai_client,
+}
+
+COMPANY_ASYNC_CLIENTS = {
+    "openai": create_openai_async_client,
+}
+
+
+def _get_factory(factories, company):
+    if not company or company.lower() not in COMPANY_PROCESSORS:
+        logger.log(logging.ERROR, f"API: Unsupported GPT provider.: {company}")
+        raise ValueError(f"API: Unsupported GPT provider.: {company}")
+
+    factory = factories.get(company.lower())
+    if not factory:
+        logger.log(logging.ERROR, f"API: GPT client is not defined for the provider: {company}")
+        raise ValueError(f"API: GPT client is not defined for the provider: {company}")
+    return factory
+
+
+def init_gpt_clients(**overrides):
+    """워커 프로세스 시작 시 모든 company의 GPT Client를 생성"""
+    options = {**get_client_options(), **overrides}
+
+    close_gpt_clients()
+    for company, factory in COMPANY_CLIENTS.items():
+        _clients[company] = factory(options)
+
+    logger.log(logging.INFO, f"Celery: GPT clients are initialized: {', '.join(_clients.keys())}")
+
+
+def close_gpt_clients():
+    """워커 프로세스 종료 시 연결 풀 정리"""
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+
+
+def get_gpt_client(*, company=None):
+    """현재 프로세스에서 재사용되는 GPT Client 반환 (없다면 생성)"""
+    factory = _get_factory(COMPANY_CLIENTS, company)
+
+    client = _clients.get(company.lower())
+    if client is None:
+        client = factory(get_client_options())
+        _clients[company.lower()] = client
+    return client
+
+
+def create_async_gpt_client(*, company=None, **overrides):
+    """
+    비동기 GPT Client 생성
+    이벤트 루프마다 연결 풀이 달라야 하므로 캐싱하지 않으며, 호출한 쪽에서 close() 해야 함
+    """
+    factory = _get_factory(COMPANY_ASYNC_CLIENTS, company)
+    return factory({**get_client_options(), **overrides})
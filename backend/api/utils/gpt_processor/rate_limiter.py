@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+
+import redis
+
+from api.utils.cache_keys import rate_limit_cache_key
+
+logger = logging.getLogger(__name__)
+
+# 요청 전 토큰 수를 추정할 때 사용하는 값
+CHARS_PER_TOKEN = 4
+TOKENS_PER_IMAGE = 765
+
+# OpenAI 이미지 입력 토큰 계산 기준
+IMAGE_BASE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+IMAGE_TILE_SIZE = 512
+IMAGE_MAX_LONG_SIDE = 2048
+IMAGE_MAX_SHORT_SIDE = 768
+
+# 부동소수점 오차로 아주 짧은 대기가 반복되지 않도록 허용하는 오차
+EPSILON = 1e-6
+
+_rate_limiter = None
+
+
+class RedisBucketStore:
+    """모든 워커가 공유하는 Redis에 상태(숫자 값의 hash)를 저장"""
+
+    def __init__(self, client, expire=120, max_attempts=10):
+        self.client = client
+        self.expire = expire
+        self.max_attempts = max_attempts
+
+    def get(self, key):
+        return {k.decode(): float(v) for k, v in self.client.hgetall(key).items()}
+
+    def update(self, key, func):
+        """
+        key의 상태를 읽어 func(state) -> (new_state, result)를 원자적으로 반영
+        상태가 바뀌지 않았다면 쓰지 않으므로, 슬롯을 기다리며 반복 확인하는 워커가 다른 워커의 WATCH를 깨지 않음
+        max_attempts번 모두 다른 워커와 충돌했다면 redis.WatchError
+        """
+        with self.client.pipeline() as pipeline:
+            for _ in range(self.max_attempts):
+                try:
+                    pipeline.watch(key)
+                    state = {k.decode(): float(v) for k, v in pipeline.hgetall(key).items()}
+                    new_state, result = func(dict(state))
+
+                    if new_state == state:
+                        pipeline.unwatch()
+                        return result
+
+                    pipeline.multi()
+                    pipeline.delete(key)
+                    if new_state:
+                        pipeline.hset(key, mapping=new_state)
+                        pipeline.expire(key, self.expire)
+                    pipeline.execute()
+                    return result
+
+                except redis.WatchError:
+                    # 다른 워커가 먼저 갱신했으므로 다시 시도
+                    continue
+
+        logger.log(logging.WARNING, f"Celery: Cannot update {key} after {self.max_attempts} attempts.")
+        raise redis.WatchError(f"Cannot update {key} after {self.max_attempts} attempts.")
+
+    def push_history(self, key, entry, max_length):
+        pipeline = self.client.pipeline()
+        pipeline.lpush(key, json.dumps(entry))
+        pipeline.ltrim(key, 0, max_length - 1)
+        pipeline.execute()
+
+    def get_history(self, key):
+        return [json.loads(entry) for entry in self.client.lrange(key, 0, -1)]
+
+
+class LocalBucketStore:
+    """프로세스 메모리에 상태를 저장 (테스트 및 단일 프로세스용)"""
+
+    def __init__(self):
+        self.states = {}
+        self.histories = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return dict(self.states.get(key, {}))
+
+    def update(self, key, func):
+        with self.lock:
+            new_state, result = func(dict(self.states.get(key, {})))
+            self.states[key] = new_state
+            return result
+
+    def push_history(self, key, entry, max_length):
+        with self.lock:
+            self.histories[key] = ([entry] + self.histories.get(key, []))[:max_length]
+
+    def get_history(self, key):
+        with self.lock:
+            return list(self.histories.get(key, []))
+
+
+class TokenBucketRateLimiter:
+    """
+    gpt_model별 분당 요청 수(rpm), 분당 토큰 수(tpm)를 지키는 Token Bucket
+    버킷의 크기는 분당 제한 값이며, 초당 제한 값 / 60 만큼 다시 채워짐
+    """
+
+    def __init__(self, store, limits=None, default_limits=None, clock=time.time, sleep=time.sleep):
+        self.store = store
+        self.limits = limits or {}
+        self.default_limits = default_limits or {}
+        self.clock = clock
+        self.sleep = sleep
+
+    def get_limits(self, model):
+        limits = {**self.default_limits, **self.limits.get(model, {})}
+        return limits.get('rpm') or 0, limits.get('tpm') or 0
+
+    def _refill(self, state, now, rpm, tpm):
+        elapsed = max(0.0, now - state.get('updated_at', now))
+        return {
+            'requests': min(rpm, state.get('requests', rpm) + elapsed * rpm / 60),
+            'tokens': min(tpm, state.get('tokens', tpm) + elapsed * tpm / 60),
+            'blocked_until': state.get('blocked_until', 0.0),
+            'updated_at': now,
+        }
+
+    def reserve(self, model, tokens=0):
+        """
+        용량이 있다면 요청 1개와 tokens를 차감
+        :return: 차감했다면 0, 아니라면 다시 시도하기까지 기다려야 하는 시간(초)
+        """
+        rpm, tpm = self.get_limits(model)
+        if not rpm and not tpm:
+            return 0.0
+
+        # 버킷보다 큰 요청은 가득 찬 버킷 하나를 사용하도록 제한
+        tokens = min(tokens, tpm) if tpm else 0
+
+        def take(state):
+            now = self.clock()
+            state = self._refill(state, now, rpm or 1, tpm or 1)
+
+            if state['blocked_until'] > now:
+                return state, state['blocked_until'] - now
+
+            wait = 0.0
+            if rpm and state['requests'] < 1 - EPSILON:
+                wait = max(wait, (1 - state['requests']) * 60 / rpm)
+            if tpm and state['tokens'] < tokens - EPSILON:
+                wait = max(wait, (tokens - state['tokens']) * 60 / tpm)
+
+            if wait > 0:
+                return state, wait
+
+            state['requests'] -= 1 if rpm else 0
+            state['tokens'] -= tokens
+            return state, 0.0
+
+        return self.store.update(rate_limit_cache_key(model), take)
+
+    def acquire(self, model, tokens=0):
+        """용량이 생길 때까지 기다린 뒤 차감"""
+        while (wait := self.reserve(model, tokens)) > 0:
+            logger.log(logging.DEBUG, f"Celery: Rate limit reached for {model}. Waiting {wait:.2f}s.")
+            self.sleep(wait)
+
+    async def acquire_async(self, model, tokens=0):
+        """acquire와 같으나, Redis 요청은 이벤트 루프를 막지 않도록 스레드에서 실행"""
+        while (wait := await asyncio.to_thread(self.reserve, model, tokens)) > 0:
+            logger.log(logging.DEBUG, f"Celery: Rate limit reached for {model}. Waiting {wait:.2f}s.")
+            await asyncio.sleep(wait)
+
+    def adjust(self, model, tokens):
+        """추정한 토큰 수와 실제 사용량의 차이를 반영 (양수면 추가 차감, 음수면 반환)"""
+        rpm, tpm = self.get_limits(model)
+        if not tpm or not tokens:
+            return
+
+        def update(state):
+            state = self._refill(state, self.clock(), rpm or 1, tpm)
+            state['tokens'] = min(tpm, state['tokens'] - tokens)
+            return state, None
+
+        self.store.update(rate_limit_cache_key(model), update)
+
+    def penalize(self, model, seconds):
+        """Provider가 429를 반환했다면 모든 워커가 seconds 동안 요청하지 않도록 차단"""
+        rpm, tpm = self.get_limits(model)
+
+        def update(state):
+            now = self.clock()
+            state = self._refill(state, now, rpm or 1, tpm or 1)
+            state['blocked_until'] = max(state['blocked_until'], now + seconds)
+            return state, None
+
+        self.store.update(rate_limit_cache_key(model), update)
+
+
+def estimate_tokens(request_kwargs):
+    """chat.completions.create 요청 인자로 사용할 토큰 수를 대략 추정"""
+    tokens = request_kwargs.get('max_tokens') or 0
+
+    for message in request_kwargs.get('messages', []):
+        content = message.get('content')
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+
+        for item in content or []:
+            if item.get('type') == 'text':
+                tokens += math.ceil(len(item.get('text') or '') / CHARS_PER_TOKEN)
+            elif item.get('type') == 'image_url':
+                detail = item.get('image_url', {}).get('detail')
+                tokens += IMAGE_BASE_TOKENS if detail == 'low' else TOKENS_PER_IMAGE
+
+    return tokens
+
+
+def estimate_image_tokens(width, height, detail=None):
+    """
+    이미지 크기로 OpenAI 이미지 입력 토큰 수 추정
+    high detail: 긴 변 2048px, 짧은 변 768px 안으로 축소한 뒤 512px 타일 수 * 170 + 85
+    """
+    if detail == 'low':
+        return IMAGE_BASE_TOKENS
+
+    scale = min(1, IMAGE_MAX_LONG_SIDE / max(width, height))
+    width, height = width * scale, height * scale
+
+    scale = min(1, IMAGE_MAX_SHORT_SIDE / min(width, height))
+    width, height = width * scale, height * scale
+
+    tiles = math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE)
+    return IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * tiles
+
+
+def get_retry_after(error, default):
+    """RateLimitError 응답의 Retry-After 헤더(초) 반환"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return default
+
+
+def get_rate_limiter():
+    """현재 프로세스에서 재사용되는 Rate Limiter 반환 (REDIS_DB_DJANGO 공유)"""
+    global _rate_limiter
+    from backend import settings
+
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucketRateLimiter(
+            store=RedisBucketStore(redis.Redis.from_url(settings.REDIS_DB_DJANGO)),
+            limits=settings.GPT_RATE_LIMITS,
+            default_limits={'rpm': settings.GPT_RATE_LIMIT_DEFAULT_RPM, 'tpm': settings.GPT_RATE_LIMIT_DEFAULT_TPM},
+        )
+    return _rate_limiter
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def get_response_cache_key(request_kwargs):
+    """
+    chat.completions.create 요청 인자로 응답 캐시 키 생성
+    gpt_model, Prompt, 이미지 데이터(detail 포함)의 해시, max_tokens가 모두 같으면 같은 키
+    """
+    texts = []
+    image_hashes = []
+
+    for message in request_kwargs.get('messages', []):
+        content = message.get('content')
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+
+        for item in content or []:
+            if item.get('type') == 'text':
+                texts.append(item.get('text') or '')
+            elif item.get('type') == 'image_url':
+                # detail이 다르면 같은 이미지도 다른 응답을 받으므로 함께 해시
+                image_url = item.get('image_url', {}).get('url', '') + (item.get('image_url', {}).get('detail') or '')
+                image_hashes.append(hashlib.sha256(image_url.encode('utf-8')).hexdigest())
+
+    payload = json.dumps({
+        "model": request_kwargs.get('model'),
+        "texts": texts,
+        "images": image_hashes,
+        "max_tokens": request_kwargs.get('max_tokens'),
+    }, ensure_ascii=False, sort_keys=True)
+
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cached_response(cache_key):
+    """캐시된 정규화 응답 반환, 없다면 None"""
+    from api.models import GPTResponseCache
+
+    cached = GPTResponseCache.objects.filter(cache_key=cache_key).only('id', 'response_data').first()
+    if not cached:
+        return None
+
+    GPTResponseCache.objects.filter(id=cached.id).update(hit_count=F('hit_count') + 1, last_used_at=timezone.now())
+    return cached.response_data
+
+
+def save_cached_response(cache_key, gpt_model, response_data):
+    """정규화된 응답을 캐시에 저장 (이미 있다면 갱신)"""
+    from api.models import GPTResponseCache
+
+    GPTResponseCache.objects.bulk_create(
+        [GPTResponseCache(cache_key=cache_key, gpt_model=gpt_model, response_data=response_data,
+                          last_used_at=timezone.now())],
+        update_conflicts=True,
+        unique_fields=['cache_key'],
+        update_fields=['response_data', 'last_used_at', 'updated_at'],
+    )
+
+
+def evict_cached_responses(max_entries, ttl_days):
+    """
+    ttl_days 동안 사용되지 않은 캐시를 삭제하고,
+    그래도 max_entries를 넘는다면 가장 오래 사용되지 않은 캐시부터 삭제 (LRU)
+    :return: 삭제한 캐시 수
+    """
+    from api.models import GPTResponseCache
+
+    deleted, _ = GPTResponseCache.objects.filter(
+        last_used_at__lt=timezone.now() - timedelta(days=ttl_days)).delete()
+
+    threshold = (GPTResponseCache.objects
+                 .order_by('-last_used_at')
+                 .values_list('last_used_at', flat=True)[max_entries:max_entries + 1]
+                 .first())
+    if threshold:
+        evicted, _ = GPTResponseCache.objects.filter(last_used_at__lte=threshold).delete()
+        deleted += evicted
+
+    logger.log(logging.INFO, f"Celery: {deleted} cached GPT responses are evicted.")
+    return deleted
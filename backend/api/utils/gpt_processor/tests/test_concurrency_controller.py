@@ -0,0 +1,96 @@
+from unittest import mock
+
+import redis
+from django.test import SimpleTestCase
+from openai import APIConnectionError, BadRequestError
+
+from api.utils.gpt_processor.concurrency_controller import AIMDConcurrencyController, ConcurrencySignal, \
+    get_error_signal
+from api.utils.gpt_processor.rate_limiter import LocalBucketStore, RedisBucketStore
+from api.utils.gpt_processor.tests.test_rate_limiter import FakeClock
+
+
+class AIMDConcurrencyControllerTest(SimpleTestCase):
+    model = "gpt-4o-mini"
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.controller = AIMDConcurrencyController(
+            store=LocalBucketStore(), min_limit=1, max_limit=64, initial_limit=4, lease_timeout=60, clock=self.clock)
+
+    def complete(self, latency, signal=ConcurrencySignal.SUCCESS):
+        lease_id = self.controller.try_acquire(self.model)
+        self.clock.now += latency
+        self.controller.release(self.model, lease_id, latency, signal)
+
+    def test_slots_are_limited(self):
+        leases = [self.controller.try_acquire(self.model) for _ in range(4)]
+        self.assertNotIn(None, leases)
+        self.assertIsNone(self.controller.try_acquire(self.model))
+
+        self.controller.release(self.model, leases[0], 1.0, ConcurrencySignal.SUCCESS)
+        self.assertIsNotNone(self.controller.try_acquire(self.model))
+
+    def test_waiting_for_slot_does_not_write(self):
+        client = mock.MagicMock()
+        pipeline = client.pipeline.return_value.__enter__.return_value
+        pipeline.hgetall.return_value = {b'limit': b'1', b'lease:a': str(self.clock.now + 60).encode()}
+        controller = AIMDConcurrencyController(store=RedisBucketStore(client), min_limit=1, max_limit=4,
+                                               initial_limit=1, lease_timeout=60, clock=self.clock)
+
+        # 슬롯이 없어 기다리는 워커는 다른 워커의 WATCH를 깨지 않음
+        self.assertIsNone(controller.try_acquire(self.model))
+        pipeline.multi.assert_not_called()
+
+        # 다른 워커들과 계속 충돌하면 슬롯이 없는 것으로 처리
+        pipeline.hgetall.return_value = {}
+        pipeline.execute.side_effect = redis.WatchError
+        self.assertIsNone(controller.try_acquire(self.model))
+
+    def test_expired_leases_are_released(self):
+        for _ in range(4):
+            self.controller.try_acquire(self.model)
+
+        self.clock.now += 61
+        self.assertIsNotNone(self.controller.try_acquire(self.model))
+
+    def test_additive_increase(self):
+        for _ in range(40):
+            self.complete(1.0)
+        self.assertGreaterEqual(self.controller.get_status(self.model)['limit'], 9)
+
+    def test_multiplicative_decrease_once_per_cooldown(self):
+        for _ in range(40):
+            self.complete(1.0)
+        limit = self.controller.get_status(self.model)['limit']
+
+        leases = [self.controller.try_acquire(self.model) for _ in range(4)]
+        for lease_id in leases:
+            self.controller.release(self.model, lease_id, 0.1, ConcurrencySignal.RATE_LIMITED)
+
+        status = self.controller.get_status(self.model)
+        self.assertEqual(status['limit'], limit // 2)
+        self.assertEqual(status['history'][0]['reason'], ConcurrencySignal.RATE_LIMITED)
+
+    def test_latency_increase_decreases_limit(self):
+        for _ in range(40):
+            self.complete(1.0)
+        limit = self.controller.get_status(self.model)['limit']
+
+        for _ in range(10):
+            self.complete(10.0)
+
+        status = self.controller.get_status(self.model)
+        self.assertLess(status['limit'], limit)
+        self.assertEqual(status['history'][0]['reason'], ConcurrencySignal.LATENCY)
+
+    def test_limit_is_bounded(self):
+        for _ in range(10):
+            self.complete(0.1, ConcurrencySignal.ERROR)
+            self.clock.now += 10
+        self.assertEqual(self.controller.get_status(self.model)['limit'], 1)
+
+    def test_error_signal(self):
+        self.assertEqual(get_error_signal(APIConnectionError(request=None)), ConcurrencySignal.ERROR)
+        self.assertIsNone(get_error_signal(ValueError()))
+        self.assertIsNone(get_error_signal(BadRequestError.__new__(BadRequestError)))
@@ -0,0 +1,28 @@
+from django.test import TestCase
+
+from api.utils.gpt_processor.gpt_clients import get_gpt_client, init_gpt_clients, close_gpt_clients
+from api.utils.gpt_processor.gpt_settings import COMPANY_PROCESSORS
+
+
+class GptClientsTest(TestCase):
+    def setUp(self):
+        init_gpt_clients(api_key="test")
+
+    def tearDown(self):
+        close_gpt_clients()
+
+    def test_init_creates_client_for_every_company(self):
+        for company in COMPANY_PROCESSORS.keys():
+            self.assertEqual(get_gpt_client(company=company).api_key, "test")
+
+    def test_client_is_reused_per_company(self):
+        client = get_gpt_client(company="openai")
+        self.assertIs(client, get_gpt_client(company="OpenAI"))
+
+    def test_rate_limit_is_not_retried_by_sdk(self):
+        # 429는 request_chat_completion에서 공유 Rate Limiter로 처리
+        self.assertEqual(get_gpt_client(company="openai").max_retries, 0)
+
+    def test_unsupported_company(self):
+        with self.assertRaises(ValueError):
+            get_gpt_client(company="unknown")
@@ -0,0 +1,151 @@
+import heapq
+from unittest import mock
+
+import redis
+from django.test import SimpleTestCase
+
+from api.utils.gpt_processor.rate_limiter import TokenBucketRateLimiter, LocalBucketStore, RedisBucketStore, \
+    estimate_tokens, estimate_image_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate_workers(rate_limiter, clock, model, workers, duration, tokens, latency):
+    """
+    여러 워커가 동시에 요청하는 상황을 가상 시계로 재현
+    각 워커는 용량이 없으면 reserve가 알려준 시간만큼 기다리고, 요청 후 latency만큼 응답을 기다림
+    :return: 요청이 전송된 시각 목록
+    """
+    end_at = clock.now + duration
+    events = [(clock.now, worker) for worker in range(workers)]
+    heapq.heapify(events)
+    sent_at = []
+
+    while events:
+        at, worker = heapq.heappop(events)
+        if at > end_at:
+            continue
+        clock.now = max(clock.now, at)
+
+        wait = rate_limiter.reserve(model, tokens)
+        if wait > 0:
+            heapq.heappush(events, (clock.now + wait, worker))
+        else:
+            sent_at.append(clock.now)
+            heapq.heappush(events, (clock.now + latency, worker))
+
+    return sent_at
+
+
+def max_in_window(sent_at, window):
+    start_index = 0
+    best = 0
+    for end_index, at in enumerate(sent_at):
+        while at - sent_at[start_index] >= window:
+            start_index += 1
+        best = max(best, end_index - start_index + 1)
+    return best
+
+
+class TokenBucketRateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleeps = []
+        self.rate_limiter = TokenBucketRateLimiter(
+            store=LocalBucketStore(),
+            limits={"gpt-4o-mini": {"rpm": 60, "tpm": 6000}},
+            clock=self.clock,
+            sleep=self.sleeps.append,
+        )
+
+    def test_unlimited_model(self):
+        self.assertEqual(self.rate_limiter.reserve("unknown-model", 10 ** 9), 0)
+
+    def test_requests_per_minute(self):
+        sent_at = simulate_workers(self.rate_limiter, self.clock, "gpt-4o-mini",
+                                   workers=50, duration=600, tokens=0, latency=0.5)
+
+        # 가득 찬 버킷(60) + 10분 동안 채워지는 양(600)
+        self.assertLessEqual(len(sent_at), 60 + 600)
+        self.assertGreaterEqual(len(sent_at), 600)
+        # 초기 버스트 이후에는 분당 제한을 넘지 않음
+        steady = [at for at in sent_at if at >= sent_at[0] + 60]
+        self.assertLessEqual(max_in_window(steady, 60), 61)
+
+    def test_tokens_per_minute(self):
+        sent_at = simulate_workers(self.rate_limiter, self.clock, "gpt-4o-mini",
+                                   workers=50, duration=600, tokens=500, latency=0.5)
+
+        # 분당 6000 토큰 / 요청당 500 토큰 = 분당 12개
+        self.assertLessEqual(len(sent_at), 12 + 120)
+        self.assertGreaterEqual(len(sent_at), 118)
+
+    def test_acquire_waits_instead_of_failing(self):
+        for _ in range(60):
+            self.rate_limiter.acquire("gpt-4o-mini")
+
+        def advance(seconds):
+            self.sleeps.append(seconds)
+            self.clock.now += seconds
+
+        self.rate_limiter.sleep = advance
+        self.rate_limiter.acquire("gpt-4o-mini")
+        self.assertAlmostEqual(sum(self.sleeps), 1.0)
+
+    def test_penalize_blocks_every_worker(self):
+        self.rate_limiter.penalize("gpt-4o-mini", 30)
+        self.assertAlmostEqual(self.rate_limiter.reserve("gpt-4o-mini"), 30)
+
+        self.clock.now += 30
+        self.assertEqual(self.rate_limiter.reserve("gpt-4o-mini"), 0)
+
+    def test_adjust_returns_unused_tokens(self):
+        self.rate_limiter.reserve("gpt-4o-mini", 6000)
+        self.assertGreater(self.rate_limiter.reserve("gpt-4o-mini", 1000), 0)
+
+        self.rate_limiter.adjust("gpt-4o-mini", -1000)
+        self.assertEqual(self.rate_limiter.reserve("gpt-4o-mini", 1000), 0)
+
+    def test_estimate_tokens(self):
+        request_kwargs = {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": "a" * 400},
+                {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,"}},
+            ]}],
+            "max_tokens": 500,
+        }
+        self.assertEqual(estimate_tokens(request_kwargs), 100 + 765 + 500)
+
+    def test_estimate_image_tokens(self):
+        self.assertEqual(estimate_image_tokens(1024, 1024), 765)
+        self.assertEqual(estimate_image_tokens(2048, 4096), 1105)
+        self.assertEqual(estimate_image_tokens(512, 512), 255)
+        self.assertEqual(estimate_image_tokens(4096, 4096, detail='low'), 85)
+
+
+class RedisBucketStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.pipeline = self.client.pipeline.return_value.__enter__.return_value
+        self.pipeline.hgetall.return_value = {b'limit': b'1', b'lease:a': b'2000'}
+        self.store = RedisBucketStore(self.client, max_attempts=3)
+
+    def test_unchanged_state_is_not_written(self):
+        # 상태가 그대로라면 MULTI 없이 WATCH만 해제
+        self.assertEqual(self.store.update("key", lambda state: (state, "result")), "result")
+        self.pipeline.multi.assert_not_called()
+        self.pipeline.unwatch.assert_called_once()
+
+    def test_retries_are_bounded(self):
+        self.pipeline.execute.side_effect = redis.WatchError
+
+        with self.assertRaises(redis.WatchError):
+            self.store.update("key", lambda state: ({**state, 'limit': 2.0}, None))
+        self.assertEqual(self.pipeline.execute.call_count, 3)
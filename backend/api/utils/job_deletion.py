@@ -0,0 +1,143 @@
+"""
+BatchJob 삭제
+Django의 delete()는 연결된 TaskUnit, TaskUnitResponse, TaskUnitFiles를 모두 메모리로 읽어 하나씩 처리하므로
+batch_job_id로 찾은 행을 DELETE 한 번에 BATCH_JOB_DELETE_CHUNK_SIZE개씩 삭제하고,
+실행 중인 Celery 작업은 TaskUnit마다 조회하지 않고 모아서 한 번에 취소
+"""
+import logging
+
+from api.utils.cache_keys import batch_job_celery_cache_key, task_unit_celery_cache_key, batch_job_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def get_task_unit_models():
+    """삭제 순서: 응답, 파일을 먼저 지우고 이를 가리키던 TaskUnit을 마지막에 삭제"""
+    from api.models import TaskUnit, TaskUnitResponse, TaskUnitFiles
+
+    return [TaskUnitResponse, TaskUnitFiles, TaskUnit]
+
+
+def delete_rows(model, batch_job_id, chunk_size):
+    """
+    model 테이블에서 batch_job_id의 행을 chunk_size개씩 삭제
+    트랜잭션 밖에서 호출되면 DELETE마다 커밋되므로 잠금과 WAL이 한 번에 커지지 않음
+    :return: 삭제한 행 수
+    """
+    from django.db import connection
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field('batch_job').column)
+
+    deleted = 0
+    with connection.cursor() as cursor:
+        while True:
+            # batch_job_id로 시작하는 인덱스(파티션)만 읽도록 바깥 조건에도 batch_job_id 포함
+            cursor.execute(f'DELETE FROM {table} WHERE {column} = %s AND "id" IN '
+                           f'(SELECT "id" FROM {table} WHERE {column} = %s LIMIT %s)',
+                           [batch_job_id, batch_job_id, chunk_size])
+            deleted += cursor.rowcount
+
+            if cursor.rowcount < chunk_size:
+                return deleted
+
+
+def delete_task_units(batch_job_id, chunk_size=None):
+    """
+    BatchJob의 TaskUnitResponse, TaskUnitFiles, TaskUnit 삭제 (BatchJob은 남김)
+    TaskUnitFiles의 이미지 파일은 BatchJob 폴더와 함께 삭제되므로 여기서는 지우지 않음
+    :return: 테이블별 삭제한 행 수
+    """
+    from backend import settings
+
+    chunk_size = chunk_size or settings.BATCH_JOB_DELETE_CHUNK_SIZE
+    return {model._meta.db_table: delete_rows(model, batch_job_id, chunk_size) for model in get_task_unit_models()}
+
+
+def get_celery_task_ids(batch_job_id, chunk_size=None, include_ingestion=True):
+    """
+    BatchJob의 파일을 읽는 작업(include_ingestion)과 아직 끝나지 않은 TaskUnit을 처리 중인 Celery 작업 id
+    TaskUnit 하나만 처리하는 process_task_unit만 id를 등록하므로, 여러 TaskUnit을 처리하는
+    Micro-batch(process_task_units), async(dispatch_task_units) 작업은 포함되지 않음
+    cache.get을 TaskUnit마다 호출하지 않고 chunk_size개씩 get_many로 조회
+    """
+    from django.core.cache import cache
+    from api.models import TaskUnit, TaskUnitStatus
+    from backend import settings
+
+    chunk_size = chunk_size or settings.BATCH_JOB_DELETE_CHUNK_SIZE
+    celery_task_ids = set()
+
+    celery_task_id = cache.get(batch_job_celery_cache_key(batch_job_id)) if include_ingestion else None
+    if celery_task_id:
+        celery_task_ids.add(celery_task_id)
+
+    # 끝난 TaskUnit은 Celery 작업 id가 남아 있지 않으므로 task_unit_job_status_idx로 끝나지 않은 것만 조회
+    task_unit_ids = (TaskUnit.objects
+                     .filter(batch_job_id=batch_job_id,
+                             task_unit_status__in=[TaskUnitStatus.PENDING, TaskUnitStatus.IN_PROGRESS])
+                     .values_list('id', flat=True)
+                     .iterator(chunk_size=chunk_size))
+
+    cache_keys = []
+    for task_unit_id in task_unit_ids:
+        cache_keys.append(task_unit_celery_cache_key(task_unit_id))
+
+        if len(cache_keys) >= chunk_size:
+            celery_task_ids.update(cache.get_many(cache_keys).values())
+            cache_keys = []
+
+    if cache_keys:
+        celery_task_ids.update(cache.get_many(cache_keys).values())
+
+    return list(celery_task_ids)
+
+
+def revoke_celery_tasks(batch_job_id, chunk_size=None, include_ingestion=True):
+    """
+    BatchJob의 실행 중인 Celery 작업을 한 번의 broadcast로 취소
+    Micro-batch, async 작업에서 처리 중인 TaskUnit은 취소하지 않으며, DELETING 상태이므로 시작할 때 건너뜀
+    :return: 취소한 Celery 작업 수
+    """
+    from tasks.celery import app
+
+    celery_task_ids = get_celery_task_ids(batch_job_id, chunk_size, include_ingestion)
+    if not celery_task_ids:
+        return 0
+
+    try:
+        app.control.revoke(celery_task_ids, terminate=True)
+    except Exception as e:
+        # 취소하지 못한 작업은 TaskUnit이 삭제되어 있으므로 시작하더라도 건너뜀
+        logger.log(logging.WARNING, f"Celery: Cannot revoke the tasks of the job {batch_job_id}: {str(e)}")
+        return 0
+
+    return len(celery_task_ids)
+
+
+def delete_batch_job(batch_job_id):
+    """
+    DELETING 상태인 BatchJob과 TaskUnit, 업로드한 파일, 캐시를 삭제
+    중간에 실패하더라도 다시 호출하면 남은 행부터 이어서 삭제
+    :return: 삭제했다면 True
+    """
+    from django.core.cache import cache
+    from api.models import BatchJob, BatchJobStatus
+    from api.utils.job_status_utils import delete_job_counters
+
+    batch_job = BatchJob.objects.filter(id=batch_job_id).first()
+    if not batch_job or batch_job.batch_job_status != BatchJobStatus.DELETING:
+        return False
+
+    revoked = revoke_celery_tasks(batch_job_id)
+    deleted = delete_task_units(batch_job_id)
+
+    # 폴더째 파일 삭제 후 BatchJob 삭제 (남은 TaskUnit이 없으므로 Django가 읽는 행도 없음)
+    batch_job.delete()
+
+    delete_job_counters(batch_job_id)
+    cache.delete(batch_job_cache_key(batch_job_id))
+
+    logger.log(logging.INFO, f"Celery: The job with ID {batch_job_id} has been deleted "
+                             f"(revoked={revoked}, {', '.join(f'{table}={count}' for table, count in deleted.items())}).")
+    return True
@@ -1,11 +1,166 @@
 # job_status_utils.py
+import logging
 
+from api.utils.cache_keys import job_counter_cache_key
 
-def get_task_status_counts(batch_job_id):
-    from api.models import TaskUnit, TaskUnitStatus
+logger = logging.getLogger(__name__)
 
-    pending = TaskUnit.objects.filter(batch_job=batch_job_id, task_unit_status=TaskUnitStatus.PENDING).count()
-    in_progress = TaskUnit.objects.filter(batch_job=batch_job_id, task_unit_status=TaskUnitStatus.IN_PROGRESS).count()
-    fail = TaskUnit.objects.filter(batch_job=batch_job_id, task_unit_status=TaskUnitStatus.FAILED).count()
+# TaskUnitStatus -> 카운터 이름
+STATUS_COUNTER_FIELDS = {
+    'PENDING': 'pending',
+    'IN_PROGRESS': 'in_progress',
+    'COMPLETED': 'completed',
+    'FAILED': 'failed',
+}
+# 아직 끝나지 않은 TaskUnit 수 (pending + in_progress), 0이 되는 순간 작업 완료
+OUTSTANDING_COUNTER_FIELDS = ['pending', 'in_progress']
+# 상태별 개수와 함께 GPT에 실제로 요청한 토큰 수, 처리 시간 합계(ms), 대표 Prompt를 가리키는 TaskUnit 수를 누적
+JOB_COUNTER_FIELDS = list(STATUS_COUNTER_FIELDS.values()) + ['outstanding', 'total_tokens', 'processing_time_ms',
+                                                             'duplicated']
+JOB_COUNTER_TIMEOUT = 60 * 60 * 24 * 7
 
-    return pending, in_progress, fail
+
+def get_job_counters(batch_job_id):
+    """
+    BatchJob의 유효한 TaskUnit 상태별 개수와 토큰, 처리 시간 합계를 캐시에서 O(1)로 반환
+    캐시에 없다면 task_unit 테이블로 다시 계산
+    """
+    from django.core.cache import cache
+
+    cache_keys = {field: job_counter_cache_key(batch_job_id, field) for field in JOB_COUNTER_FIELDS}
+    values = cache.get_many(list(cache_keys.values()))
+
+    if len(values) < len(cache_keys):
+        return rebuild_job_counters(batch_job_id)
+
+    return {field: values[cache_key] for field, cache_key in cache_keys.items()}
+
+
+def add_job_counters(batch_job_id, **deltas):
+    """
+    카운터를 원자적으로 증감 (Redis INCRBY)
+    값이 없다면(만료, 삭제) 다음 조회 시 테이블로 다시 계산되도록 모두 삭제
+    :return: outstanding이 바뀌었다면 증감 후의 값, 아니라면 None
+    """
+    from django.core.cache import cache
+
+    outstanding = sum(deltas.get(field, 0) for field in OUTSTANDING_COUNTER_FIELDS)
+
+    try:
+        for field, delta in deltas.items():
+            if delta:
+                cache.incr(job_counter_cache_key(batch_job_id, field), int(delta))
+
+        # 여러 작업자가 동시에 끝내더라도 0을 받는 작업자는 하나뿐
+        if outstanding:
+            return cache.incr(job_counter_cache_key(batch_job_id, 'outstanding'), outstanding)
+    except ValueError:
+        delete_job_counters(batch_job_id)
+
+    return None
+
+
+def move_job_counters(batch_job_id, from_status, to_status, count=1, **totals):
+    """
+    count개의 TaskUnit이 from_status에서 to_status로 바뀐 만큼 카운터 이동 (from_status가 None이면 새 TaskUnit)
+    :return: add_job_counters와 같이 outstanding이 바뀌었다면 그 값
+    """
+    deltas = dict(totals)
+    if from_status:
+        deltas[STATUS_COUNTER_FIELDS[from_status]] = deltas.get(STATUS_COUNTER_FIELDS[from_status], 0) - count
+    if to_status:
+        deltas[STATUS_COUNTER_FIELDS[to_status]] = deltas.get(STATUS_COUNTER_FIELDS[to_status], 0) + count
+
+    return add_job_counters(batch_job_id, **deltas)
+
+
+def count_job_counters(batch_job_id):
+    """task_unit 테이블에서 카운터 값을 계산 (GROUP BY 한 번, 합계 한 번)"""
+    from django.db.models import Count, IntegerField, Sum, Q
+    from django.db.models.fields.json import KeyTextTransform
+    from django.db.models.functions import Cast
+    from api.models import TaskUnit, TaskUnitQuerySet
+
+    task_units = TaskUnit.objects.filter(batch_job_id=batch_job_id, is_valid=True)
+    counters = {field: 0 for field in JOB_COUNTER_FIELDS}
+    latest_response = TaskUnitQuerySet.LATEST_RESPONSE
+
+    for row in task_units.values('task_unit_status').annotate(count=Count('id')).order_by():
+        counters[STATUS_COUNTER_FIELDS[row['task_unit_status']]] = row['count']
+    counters['outstanding'] = sum(counters[field] for field in OUTSTANDING_COUNTER_FIELDS)
+
+    totals = task_units.alias_latest_response().aggregate(
+        total_tokens=Sum(Cast(KeyTextTransform('Token', f'{latest_response}__response_data'), IntegerField()),
+                         filter=Q(**{f'{latest_response}__is_cached': False})),
+        processing_time=Sum(f'{latest_response}__processing_time'),
+        duplicated=Count('id', filter=Q(duplicate_of__isnull=False)),
+    )
+    counters['total_tokens'] = totals['total_tokens'] or 0
+    counters['processing_time_ms'] = round((totals['processing_time'] or 0) * 1000)
+    counters['duplicated'] = totals['duplicated']
+
+    return counters
+
+
+def rebuild_job_counters(batch_job_id):
+    """task_unit 테이블로 카운터를 다시 계산하여 저장"""
+    from django.core.cache import cache
+
+    counters = count_job_counters(batch_job_id)
+    cache.set_many({job_counter_cache_key(batch_job_id, field): value for field, value in counters.items()},
+                   timeout=JOB_COUNTER_TIMEOUT)
+    return counters
+
+
+def reset_job_counters(batch_job_id):
+    """모든 TaskUnit이 무효화되어 처음부터 다시 등록하는 경우"""
+    from django.core.cache import cache
+
+    cache.set_many({job_counter_cache_key(batch_job_id, field): 0 for field in JOB_COUNTER_FIELDS},
+                   timeout=JOB_COUNTER_TIMEOUT)
+
+
+def delete_job_counters(batch_job_id):
+    """카운터 삭제, 다음 조회 시 테이블로 다시 계산"""
+    from django.core.cache import cache
+
+    cache.delete_many([job_counter_cache_key(batch_job_id, field) for field in JOB_COUNTER_FIELDS])
+
+
+def reconcile_job_counters(batch_job_id):
+    """
+    카운터가 task_unit 테이블과 다르다면 테이블 값으로 수정
+    계산하는 동안 카운터가 바뀌었다면 어느 쪽이 맞는지 알 수 없으므로 다음 주기로 미룸
+    :return: 수정했다면 True
+    """
+    from django.core.cache import cache
+
+    before = get_job_counters(batch_job_id)
+    counters = count_job_counters(batch_job_id)
+    after = get_job_counters(batch_job_id)
+
+    if before != after or counters == after:
+        return False
+
+    cache.set_many({job_counter_cache_key(batch_job_id, field): value for field, value in counters.items()},
+                   timeout=JOB_COUNTER_TIMEOUT)
+    logger.log(logging.INFO, f"Celery: The counters of job with ID {batch_job_id} are reconciled. "
+                             f"({after} -> {counters})")
+    return True
+
+
+def get_dedup_summary(batch_job_id, counters=None):
+    """
+    작업 전체 TaskUnit 중 대표 Prompt만 요청하여 줄어든 요청 비율
+    TaskUnit을 등록할 때 누적한 카운터로 계산하므로 테이블을 읽지 않음
+    """
+    counters = counters or get_job_counters(batch_job_id)
+    total = sum(counters[field] for field in STATUS_COUNTER_FIELDS.values())
+    duplicated = counters['duplicated']
+
+    return {
+        "total_task_units": total,
+        "unique_prompts": total - duplicated,
+        "duplicated_task_units": duplicated,
+        "dedup_ratio": duplicated / total if total else 0.0,
+    }
@@ -0,0 +1,196 @@
+"""
+task_unit, task_unit_response, task_unit_files를 batch_job_id 범위로 나눈 PostgreSQL 파티션 관리
+파티션 하나에 연속된 TASK_UNIT_PARTITION_SIZE개의 BatchJob을 담으므로
+한 작업의 조회는 파티션 하나만 읽고, 오래된 작업은 파티션 단위로 분리(DETACH)하거나 삭제(DROP)할 수 있음
+PostgreSQL이 아닌 DB(SQLite 테스트)에서는 아무것도 하지 않음
+"""
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ['task_unit', 'task_unit_response', 'task_unit_files']
+PARTITION_KEY = 'batch_job_id'
+
+# 파티션을 동시에 만드는 작업자끼리 기다리도록 하는 advisory lock 키
+PARTITION_LOCK_KEY = 'task_unit_partitions'
+
+PARTITION_BOUND_PATTERN = re.compile(r"FROM \('?(\d+)'?\) TO \('?(\d+)'?\)")
+
+
+def is_partitioning_supported(connection):
+    return connection.vendor == 'postgresql'
+
+
+def get_partition_name(table, start):
+    return f"{table}_p{start}"
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def get_partitions(cursor, table):
+    """
+    테이블의 파티션 목록
+    :return: (파티션 이름, 시작 batch_job_id, 끝 batch_job_id(미포함)) 목록, 시작 순서
+    """
+    cursor.execute("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+    """, [table])
+
+    partitions = []
+    for name, bound in cursor.fetchall():
+        match = PARTITION_BOUND_PATTERN.search(bound or '')
+        if match:
+            partitions.append((name, int(match.group(1)), int(match.group(2))))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partitions(cursor, table, up_to, partition_size):
+    """
+    마지막 파티션 뒤로 partition_size 간격의 파티션을 up_to(batch_job_id)가 포함될 때까지 생성
+    크기를 바꾸더라도 기존 파티션과 겹치지 않도록 마지막 파티션의 끝에서 이어서 만듦
+    :return: 만든 파티션 이름 목록
+    """
+    partitions = get_partitions(cursor, table)
+    start = partitions[-1][2] if partitions else 0
+
+    created = []
+    while start <= up_to:
+        name = get_partition_name(table, start)
+        cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                       f'FOR VALUES FROM ({int(start)}) TO ({int(start + partition_size)})')
+        created.append(name)
+        start += partition_size
+
+    return created
+
+
+def ensure_partitions(batch_job_id, partition_size=None):
+    """
+    batch_job_id의 TaskUnit, TaskUnitResponse, TaskUnitFiles를 저장할 파티션이 없다면 생성
+    BatchJob이 만들어질 때 호출되므로 파티션이 없어 INSERT가 실패하지 않음
+    """
+    from django.db import connection, transaction
+    from backend import settings
+
+    if not is_partitioning_supported(connection):
+        return []
+
+    partition_size = partition_size or settings.TASK_UNIT_PARTITION_SIZE
+    created = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [PARTITION_LOCK_KEY])
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(cursor, table):
+                created += create_partitions(cursor, table, batch_job_id, partition_size)
+
+    if created:
+        logger.log(logging.INFO, f"API: Partitions are created: {', '.join(created)}")
+    return created
+
+
+def get_table_definitions(cursor, table):
+    """
+    테이블을 다시 만들 때 그대로 실행할 인덱스, 제약 조건(UNIQUE, FOREIGN KEY) 정의
+    PRIMARY KEY와 제약 조건이 만든 인덱스는 제외
+    """
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+        ORDER BY conname
+    """, [table])
+    constraints = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT indexdef
+        FROM pg_indexes
+        WHERE tablename = %s
+          AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)
+        ORDER BY indexname
+    """, [table, table])
+    indexes = [row[0] for row in cursor.fetchall()]
+
+    return constraints, indexes
+
+
+def rebuild_table(cursor, table, partitioned, partition_size=None):
+    """
+    테이블을 파티션 테이블로(또는 일반 테이블로) 다시 만들고 데이터를 옮김
+    migration 안에서 실행되며, 이름을 바꾼 시점부터 트랜잭션이 끝날 때까지 다른 쓰기는 기다림
+
+    파티션 테이블의 PRIMARY KEY, UNIQUE는 파티션 키를 포함해야 하므로 PRIMARY KEY는 (id, batch_job_id)
+    id만으로 찾는 쿼리는 각 파티션의 PRIMARY KEY 인덱스를 사용
+    PostgreSQL 15는 파티션 테이블의 IDENTITY 열을 지원하지 않으므로 id는 sequence 기본값 사용
+    """
+    old_table = f"{table}_old"
+    sequence = f"{table}_id_seq"
+    constraints, indexes = get_table_definitions(cursor, table)
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+    cursor.execute(f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+                   f'INCLUDING STORAGE)' + (f' PARTITION BY RANGE ("{PARTITION_KEY}")' if partitioned else ''))
+    cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" DROP DEFAULT')
+
+    if partitioned:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM batch_job')
+        create_partitions(cursor, table, cursor.fetchone()[0], partition_size)
+
+    cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old_table}"')
+    cursor.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM "{old_table}"')
+    next_id = cursor.fetchone()[0]
+
+    # 이전 테이블의 id sequence(IDENTITY 또는 OWNED BY)도 함께 삭제
+    cursor.execute(f'DROP TABLE "{old_table}"')
+
+    if partitioned:
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" START WITH {int(next_id)} OWNED BY "{table}"."id"')
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{sequence}"\')')
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("id", "{PARTITION_KEY}")')
+    else:
+        cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "id" ADD GENERATED BY DEFAULT AS IDENTITY '
+                       f'(START WITH {int(next_id)})')
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ("id")')
+
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def detach_partitions(cursor, start, archive=False):
+    """
+    batch_job_id가 start부터인 파티션을 세 테이블에서 분리
+    archive라면 archived_ 이름으로 남기고 (FOREIGN KEY 제거, pg_dump -t로 내보낸 뒤 삭제), 아니라면 삭제
+    :return: 처리한 파티션 이름 목록
+    """
+    detached = []
+    for table in PARTITIONED_TABLES:
+        name = get_partition_name(table, start)
+        if name not in [partition[0] for partition in get_partitions(cursor, table)]:
+            continue
+
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+
+        if archive:
+            cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                           [name])
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"')
+            cursor.execute(f'ALTER TABLE "{name}" RENAME TO "archived_{name}"')
+        else:
+            cursor.execute(f'DROP TABLE "{name}"')
+
+        detached.append(name)
+
+    return detached
@@ -4,6 +4,7 @@ import os
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from django.http import JsonResponse, HttpResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
@@ -12,40 +13,36 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN, \
-    HTTP_204_NO_CONTENT, HTTP_500_INTERNAL_SERVER_ERROR, HTTP_202_ACCEPTED, HTTP_404_NOT_FOUND, HTTP_423_LOCKED
+    HTTP_500_INTERNAL_SERVER_ERROR, HTTP_202_ACCEPTED, HTTP_404_NOT_FOUND, HTTP_423_LOCKED
 from rest_framework.views import APIView
 
 from api.models import BatchJob, TaskUnitStatus, BatchJobStatus
-from api.models import TaskUnit, TaskUnitResponse
+from api.models import TaskUnit, TaskUnitResponse, TaskUnitFiles
 from api.serializers.BatchJobSerializer import BatchJobSerializer, BatchJobCreateSerializer, BatchJobConfigSerializer
 from api.utils.cache_keys import batch_job_cache_key, task_unit_cache_key, \
     task_unit_response_cache_key, CACHE_TIMEOUT_BATCH_JOB, CACHE_TIMEOUT_TASK_UNIT, CACHE_TIMEOUT_TASK_UNIT_RESPONSE, \
-    get_cache_or_database
+    get_cache_or_database, file_index_celery_cache_key, CACHE_TIMEOUT_FILE_INDEX
 from api.utils.files_processor.file_settings import FileSettings
 from api.utils.files_processor.pdf_processor import PDFProcessMode
+from api.utils.files_processor.render_profiles import PDFRenderProfile
 from api.utils.gpt_processor.gpt_settings import get_gpt_processor
-from api.utils.job_status_utils import get_task_status_counts
+from api.utils.job_status_utils import get_job_counters, get_dedup_summary
 from backend import settings
-from tasks.queue_batch_job_process import process_batch_job
+from tasks.queue_batch_job_process import process_batch_job, index_file_metadata, delete_batch_job
+from tasks.queue_task_units import finish_batch_job
 
 logger = logging.getLogger(__name__)
 
 
 def updateBatchJobStatus(batch_job):
+    """
+    작업자에서 완료 처리하지 못한 경우(예: 카운터가 만료되어 다시 계산된 경우)를 조회 시 보완
+    카운터만 확인하므로 task_unit 테이블을 다시 세지 않음
+    """
     if batch_job.batch_job_status in [BatchJobStatus.IN_PROGRESS]:
-        if TaskUnit.objects.filter(batch_job=batch_job).count() > 0:
-            pending, in_progress, fail = get_task_status_counts(batch_job.id)
-
-            if pending > 0 or in_progress > 0:
-                pass
-            elif fail > 0:
-                logger.log(logging.DEBUG, f"API: The job with ID {batch_job.id} has been marked as Failed.")
-                batch_job.set_status(BatchJobStatus.FAILED)
-                batch_job.save()
-            else:
-                logger.log(logging.DEBUG, f"API: The job with ID {batch_job.id} has been marked as Completed.")
-                batch_job.set_status(BatchJobStatus.COMPLETED)
-                batch_job.save()
+        if finish_batch_job(batch_job.id):
+            logger.log(logging.DEBUG, f"API: The job with ID {batch_job.id} has been marked as finished.")
+            batch_job.refresh_from_db()
 
 
 @method_decorator(login_required, name='dispatch')
@@ -167,6 +164,7 @@ class BatchJobDetailView(APIView):
     def delete(self, request, batch_id):
         """
         사용자가 자신이 생성한 BatchJob을 삭제하는 기능
+        작업이 많더라도 바로 응답하도록 DELETING으로 표시한 뒤 Celery에서 삭제
         :param request:
         :param batch_id:
         :return:
@@ -185,21 +183,20 @@ class BatchJobDetailView(APIView):
                 status=HTTP_403_FORBIDDEN,
             )
 
-        task_units = TaskUnit.objects.filter(batch_job=batch_job).only('id')
-        if not task_units:
-            from api.utils.cache_keys import task_unit_celery_cache_key
-            from celery.worker.control import revoke
-            from django.core.cache import cache
+        from django.core.cache import cache
 
-            for task_unit in task_units:
-                celery_task_id = cache.get(task_unit_celery_cache_key(task_unit.id))
-                revoke(celery_task_id, terminate=True)
+        # TaskUnit 등은 백그라운드에서 삭제하고, 그 전까지는 DELETING 상태로 표시
+        if batch_job.batch_job_status != BatchJobStatus.DELETING:
+            batch_job.set_status(BatchJobStatus.DELETING)
+            # 캐시에서 가져온 객체일 수 있으므로 상태만 저장
+            batch_job.save(update_fields=['batch_job_status', 'updated_at'])
+            cache.delete(batch_job_cache_key(batch_id))
 
-            task_units.delete()
+        delete_batch_job.apply_async(args=[batch_id])
+        logger.log(logging.DEBUG, f"API: {request.user.email} has requested to delete BatchJob with ID {batch_id}.")
 
-        batch_job.delete()
-        logger.log(logging.DEBUG, f"API: {request.user.email} has successfully deleted BatchJob with ID {batch_id}.")
-        return Response(status=HTTP_204_NO_CONTENT)
+        serializer = BatchJobSerializer(batch_job)
+        return Response(serializer.data, status=HTTP_202_ACCEPTED)
 
 
 @method_decorator(login_required, name='dispatch')
@@ -228,7 +225,7 @@ class BatchJobFileUploadView(APIView):
             )
 
         if batch_job.batch_job_status in [BatchJobStatus.PENDING, BatchJobStatus.IN_PROGRESS,
-                                          BatchJobStatus.COMPLETED, BatchJobStatus.FAILED]:
+                                          BatchJobStatus.COMPLETED, BatchJobStatus.FAILED, BatchJobStatus.DELETING]:
             logger.log(logging.ERROR,
                        f"API: For safety reasons, file modifications are not allowed once a batch job has been executed. "
                        f"To work with a new file, please create a new batch job.")
@@ -246,9 +243,15 @@ class BatchJobFileUploadView(APIView):
                 status=HTTP_400_BAD_REQUEST,
             )
 
+        from django.core.cache import cache
+
         try:
-            total_size = FileSettings.get_size(file)
-            if total_size <= 0:
+            # 앞부분만 읽어 encoding, 구분자, header를 확인하고, 전체 행 개수는 백그라운드에서 계산
+            file_metadata = FileSettings.sniff(file)
+            # 백그라운드에서 계산한 메타데이터가 이 파일의 것인지 내용 해시로 확인
+            file_metadata['content_hash'], file_metadata['file_size'] = FileSettings.get_content_hash(file)
+            total_size = file_metadata.get('total_size')
+            if total_size is not None and total_size <= 0:
                 logger.log(logging.ERROR, f"API: The file cannot be read because its size is 0 or less."
                                           f"It seems to be an invalid file. Please try with a different file.")
                 raise ValidationError(
@@ -257,10 +260,16 @@ class BatchJobFileUploadView(APIView):
 
             batch_job.file = file
             batch_job.file_name = file.name
+            batch_job.file_metadata = file_metadata
             batch_job.configs = {}  # 파일이 새로 업로드 되었다면, 기존 설정 초기화
             batch_job.set_status(BatchJobStatus.UPLOADED)
+
+            # 계산 중 표시가 남아 있는 동안에는 get_file_metadata가 파일을 다시 읽지 않음
+            cache.set(file_index_celery_cache_key(batch_job.id), True, timeout=CACHE_TIMEOUT_FILE_INDEX)
             batch_job.save()
 
+            index_file_metadata.apply_async(args=[batch_job.id])
+
         except ValidationError as e:
             return Response(
                 {"error": ("The BatchJob cannot be modified at this time."
@@ -330,19 +339,40 @@ class BatchJobConfigView(APIView):
 
         updated_data = request.data
 
-        if batch_job.batch_job_status in [BatchJobStatus.PENDING, BatchJobStatus.IN_PROGRESS]:
+        if batch_job.batch_job_status in [BatchJobStatus.PENDING, BatchJobStatus.IN_PROGRESS, BatchJobStatus.DELETING]:
             logger.log(logging.ERROR, f"API: You cannot change the settings because it is already in operation.")
             return Response(
                 {"error": "Warning: You cannot change the settings because it is already in operation."},
                 status=HTTP_423_LOCKED,
             )
 
+        if updated_data.get('render_profile') is not None:
+            try:
+                PDFRenderProfile.resolve(updated_data.get('render_profile'))
+            except (NotImplementedError, ValueError) as e:
+                logger.log(logging.ERROR, f"API: Invalid render profile: {str(e)}")
+                return Response(
+                    {"error": f"Invalid render profile: {str(e)}"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+
+        if updated_data.get('hybrid_fallback') is not None:
+            try:
+                PDFProcessMode.hybrid_fallback(updated_data.get('hybrid_fallback'))
+            except NotImplementedError as e:
+                logger.log(logging.ERROR, f"API: Invalid hybrid fallback: {str(e)}")
+                return Response(
+                    {"error": f"Invalid hybrid fallback: {str(e)}"},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+
         current_data = batch_job.configs or {}
         current_data.update(updated_data)
 
         batch_job.configs = current_data
         batch_job.set_status(BatchJobStatus.CONFIGS)
-        batch_job.save()
+        # 백그라운드에서 저장한 file_metadata(index_file_metadata)를 읽어 둔 값으로 덮어쓰지 않음
+        batch_job.save(update_fields=['configs', 'batch_job_status', 'updated_at'])
 
         serializer = BatchJobConfigSerializer(batch_job)
         return Response(serializer.data, status=HTTP_200_OK)
@@ -381,7 +411,10 @@ class BatchJobPreView(APIView):
             file_path = os.path.join(settings.BASE_DIR, file.path)
 
             processor = FileSettings.get_file_processor(FileSettings.get_file_extension(file_path))
-            preview = processor.get_preview(file_path, work_unit=work_unit, pdf_mode=pdf_mode)
+            preview = processor.get_preview(file_path, work_unit=work_unit, pdf_mode=pdf_mode,
+                                            render_profile=batch_job.configs.get('render_profile'),
+                                            hybrid_fallback=batch_job.configs.get('hybrid_fallback'),
+                                            dialect=batch_job.get_csv_dialect())
 
             logger.log(logging.DEBUG,
                        f"API: The file preview was successfully returned for the user {request.user.email}.")
@@ -430,6 +463,26 @@ class BatchJobSupportPDFMode(APIView):
         return JsonResponse({"modes": modes})
 
 
+@method_decorator(login_required, name='dispatch')
+class BatchJobSupportRenderProfile(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @method_decorator(cache_page(60 * 60), name='get')
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
+
+    def get(self, request):
+        """
+        클라이언트 측에서 PDF 이미지 모드의 렌더링 프로필을 요청하면 반환하는 기능
+        :param request:
+        :return:
+        """
+        descriptions = PDFRenderProfile.get_descriptions()
+        profiles = [{"key": name, "description": descriptions[name], "options": options}
+                    for name, options in PDFRenderProfile.PROFILES.items()]
+        return JsonResponse({"profiles": profiles})
+
+
 class TaskUnitResponsePagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
@@ -447,8 +500,8 @@ class TaskUnitResponseListAPIView(ListAPIView):
         queryset = (
             TaskUnit.objects
             .filter(batch_job_id=batch_id, is_valid=True)
-            .select_related("latest_response")  # latest_response 조인을 최적화
-            .prefetch_related("files")  # 수정된 부분: related_name 'files' 사용
+            .select_latest_response()  # latest_response를 해당 BatchJob의 파티션에서만 조인
+            .prefetch_related(Prefetch("files", queryset=TaskUnitFiles.objects.order_by('id')))
             .only("id", "unit_index", "text_data", "has_files", "task_unit_status", "latest_response")
             .order_by("unit_index")
         )
@@ -465,7 +518,7 @@ class TaskUnitResponseListAPIView(ListAPIView):
         # 결과를 직렬화
         results = []
         for item in page:
-            latest_response = item.latest_response  # select_related로 인해 별도 쿼리 없이 접근 가능
+            latest_response = item.get_latest_response()  # select_latest_response로 인해 별도 쿼리 없이 접근 가능
 
             request_data = {
                 "prompt": item.text_data,
@@ -473,8 +526,9 @@ class TaskUnitResponseListAPIView(ListAPIView):
             }
 
             if item.has_files:
+                # 이미지 파일은 현재 페이지의 것만 읽어 base64로 변환
                 request_data["files_data"] = [
-                    task_unit_file.base64_image_data for task_unit_file in item.files.all()  # 수정된 부분
+                    task_unit_file.get_base64_data() for task_unit_file in item.files.all()
                 ]
 
             response = latest_response.response_data if latest_response else None
@@ -568,7 +622,10 @@ class BatchJobRunView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, batch_id):
-        """작업을 시작"""
+        """
+        작업을 시작
+        incremental이 true라면 Prompt가 바뀌었거나 실패한 작업 단위만 다시 요청
+        """
         try:
             batch_job = get_cache_or_database(
                 model=BatchJob,
@@ -582,9 +639,10 @@ class BatchJobRunView(APIView):
                 return Response(serializer.data, status=HTTP_202_ACCEPTED)
 
             batch_job.set_status(BatchJobStatus.PENDING)
-            batch_job.save()
+            batch_job.save(update_fields=['batch_job_status', 'updated_at'])
 
-            process_batch_job.apply_async(args=[batch_id])
+            incremental = str(request.data.get('incremental', False)).lower() == 'true'
+            process_batch_job.apply_async(args=[batch_id], kwargs={'incremental': incremental})
             logger.info(f"API: BatchJob with ID {batch_id} is going to process now.")
 
             return Response(serializer.data, status=HTTP_202_ACCEPTED)
@@ -612,10 +670,16 @@ class BatchJobRunView(APIView):
             )
 
             status = batch_job.get_batch_job_status_display()
+            counters = get_job_counters(batch_id)
 
             return Response(
                 {"id": batch_id,
-                 "batch_job_status": status},
+                 "batch_job_status": status,
+                 "started_at": batch_job.started_at,
+                 "completed_at": batch_job.completed_at,
+                 "elapsed_time": batch_job.elapsed_time,
+                 "counters": counters,
+                 "summary": get_dedup_summary(batch_id, counters)},
                 status=HTTP_200_OK
             )
 
@@ -636,6 +700,16 @@ class BatchJobResultDownload(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def get_queryset(batch_id):
+        return (
+            TaskUnit.objects
+            .filter(batch_job_id=batch_id, is_valid=True)
+            .select_latest_response()  # latest_response를 해당 BatchJob의 파티션에서만 조인
+            .only("id", "unit_index", "task_unit_status", "text_data", "latest_response")
+            .order_by("unit_index")
+        )
+
     def get(self, request, batch_id):
         response = HttpResponse(content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="result_{batch_id}.csv"'
@@ -647,16 +721,8 @@ class BatchJobResultDownload(APIView):
             'Request', 'Response'
         ])
 
-        queryset = (
-            TaskUnit.objects
-            .filter(batch_job_id=batch_id, is_valid=True)
-            .select_related("latest_response")  # latest_response 조인을 최적화
-            .only("id", "unit_index", "task_unit_status", "text_data", "latest_response")
-            .order_by("unit_index")
-        )
-
-        for item in queryset:
-            latest_response = item.latest_response
+        for item in self.get_queryset(batch_id):
+            latest_response = item.get_latest_response()
             response_data = latest_response.response_data if latest_response else None
             gpt_processor = get_gpt_processor(company=response_data.get('Company') if response_data else None)
 
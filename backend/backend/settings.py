@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import json
 import os
 from pathlib import Path
 
@@ -119,6 +120,11 @@ DATABASES = {
     }
 }
 
+# task_unit, task_unit_response, task_unit_files를 batch_job_id 범위로 나눌 때 한 파티션에 담는 BatchJob 수 (PostgreSQL)
+TASK_UNIT_PARTITION_SIZE = int(os.getenv('TASK_UNIT_PARTITION_SIZE', 100))
+# BatchJob 삭제 시 TaskUnit, TaskUnitResponse, TaskUnitFiles를 DELETE 한 번에 지우는 최대 행 수
+BATCH_JOB_DELETE_CHUNK_SIZE = int(os.getenv('BATCH_JOB_DELETE_CHUNK_SIZE', 5000))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -245,6 +251,73 @@ CHANNEL_LAYERS = {
 
 # Section: OPENAI_API_KEY
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # 기본값: https://api.openai.com/v1
+
+# Section: GPT Client
+# 워커 프로세스마다 하나의 GPT Client를 재사용하며, 아래 값으로 연결 풀과 타임아웃을 설정
+GPT_CLIENT_MAX_CONNECTIONS = int(os.getenv('GPT_CLIENT_MAX_CONNECTIONS', 20))
+GPT_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('GPT_CLIENT_MAX_KEEPALIVE_CONNECTIONS', 20))
+GPT_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv('GPT_CLIENT_KEEPALIVE_EXPIRY', 60))  # 초 단위
+GPT_CLIENT_TIMEOUT = float(os.getenv('GPT_CLIENT_TIMEOUT', 600))  # 초 단위
+GPT_CLIENT_CONNECT_TIMEOUT = float(os.getenv('GPT_CLIENT_CONNECT_TIMEOUT', 5))  # 초 단위
+# SDK가 429를 워커마다 따로 재시도하지 않도록 기본값은 0 (429는 공유 Rate Limiter가 Retry-After 동안 모든 워커를 멈춤)
+GPT_CLIENT_MAX_RETRIES = int(os.getenv('GPT_CLIENT_MAX_RETRIES', 0))
+
+# Section: GPT Rate Limit
+# 모든 워커가 Redis(REDIS_DB_DJANGO)를 공유하며 gpt_model별 분당 요청 수(rpm), 분당 토큰 수(tpm)를 제한 (0이면 제한 없음)
+# 예) GPT_RATE_LIMITS={"gpt-4o-mini": {"rpm": 500, "tpm": 200000}}
+GPT_RATE_LIMITS = json.loads(os.getenv('GPT_RATE_LIMITS', '{}'))
+GPT_RATE_LIMIT_DEFAULT_RPM = int(os.getenv('GPT_RATE_LIMIT_DEFAULT_RPM', 0))
+GPT_RATE_LIMIT_DEFAULT_TPM = int(os.getenv('GPT_RATE_LIMIT_DEFAULT_TPM', 0))
+GPT_RATE_LIMIT_MAX_RETRIES = int(os.getenv('GPT_RATE_LIMIT_MAX_RETRIES', 5))  # 429 응답 시 다시 요청하는 횟수
+GPT_RATE_LIMIT_DEFAULT_RETRY_AFTER = float(os.getenv('GPT_RATE_LIMIT_DEFAULT_RETRY_AFTER', 5))  # 초 단위
+
+# Section: GPT Adaptive Concurrency
+# 응답 시간, 429, 오류 비율에 따라 gpt_model별 동시 요청 수를 AIMD 방식으로 조절
+# 현재 제한 값과 변경 기록: python manage.py gpt_concurrency
+GPT_ADAPTIVE_CONCURRENCY = os.getenv('GPT_ADAPTIVE_CONCURRENCY', 'False') == 'True'
+GPT_CONCURRENCY_MIN_LIMIT = int(os.getenv('GPT_CONCURRENCY_MIN_LIMIT', 1))
+GPT_CONCURRENCY_MAX_LIMIT = int(os.getenv('GPT_CONCURRENCY_MAX_LIMIT', 512))
+GPT_CONCURRENCY_INITIAL_LIMIT = int(os.getenv('GPT_CONCURRENCY_INITIAL_LIMIT', 8))
+# 평균 응답 시간이 최소 응답 시간의 몇 배를 넘으면 제한 값을 줄일지
+GPT_CONCURRENCY_LATENCY_TOLERANCE = float(os.getenv('GPT_CONCURRENCY_LATENCY_TOLERANCE', 3))
+
+# Section: GPT Response Cache
+# 같은 gpt_model, Prompt, 이미지, max_tokens의 요청은 저장된 응답을 재사용
+GPT_RESPONSE_CACHE = os.getenv('GPT_RESPONSE_CACHE', 'True') == 'True'
+GPT_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('GPT_RESPONSE_CACHE_MAX_ENTRIES', 100000))
+GPT_RESPONSE_CACHE_TTL_DAYS = int(os.getenv('GPT_RESPONSE_CACHE_TTL_DAYS', 30))  # 마지막 사용 후 보관 기간
+
+# Section: Ingestion
+# 파일을 TaskUnit으로 변환할 때 한 번에 저장하는 작업 단위 수
+INGESTION_CHUNK_SIZE = int(os.getenv('INGESTION_CHUNK_SIZE', 1000))
+# chunk가 다 차지 않아도 이 시간(초)이 지나면 저장 후 바로 Celery에 등록
+INGESTION_FLUSH_INTERVAL = float(os.getenv('INGESTION_FLUSH_INTERVAL', 2))
+# Broker 큐에 쌓인 메시지가 이 값 이상이면 다음 chunk 등록을 대기
+DISPATCH_MAX_QUEUE_DEPTH = int(os.getenv('DISPATCH_MAX_QUEUE_DEPTH', 10000))
+DISPATCH_BACKPRESSURE_INTERVAL = float(os.getenv('DISPATCH_BACKPRESSURE_INTERVAL', 1))  # 초 단위
+TASK_UNIT_DEDUP = os.getenv('TASK_UNIT_DEDUP', 'True') == 'True'  # 한 작업 안의 같은 Prompt는 한 번만 요청
+# pandas: 모든 열을 읽음 / pyarrow: 멀티스레드로 Prompt에 필요한 열만 읽음 (pyarrow 설치 필요)
+CSV_ENGINE = os.getenv('CSV_ENGINE', 'pandas')
+CSV_ARROW_BLOCK_SIZE = int(os.getenv('CSV_ARROW_BLOCK_SIZE', 1024 * 1024))  # record batch 하나의 바이트 수
+# PDF 페이지 추출에 사용할 프로세스 수 (1이면 현재 프로세스에서 순서대로 추출)
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', 1))
+PDF_EXTRACT_UNITS_PER_TASK = int(os.getenv('PDF_EXTRACT_UNITS_PER_TASK', 8))  # 작업자에게 한 번에 맡기는 작업 단위 수
+# IMAGE_OCR 모드: PyMuPDF가 사용하는 Tesseract 언어, 렌더링 DPI, 프로세스 수
+PDF_OCR_LANGUAGE = os.getenv('PDF_OCR_LANGUAGE', 'kor+eng')
+PDF_OCR_DPI = int(os.getenv('PDF_OCR_DPI', 300))
+PDF_OCR_WORKERS = int(os.getenv('PDF_OCR_WORKERS', 1))  # 1이면 현재 프로세스에서 순서대로 인식
+PDF_OCR_CACHE_TIMEOUT = int(os.getenv('PDF_OCR_CACHE_TIMEOUT', 60 * 60 * 24 * 30))  # 페이지 해시별 OCR 결과 보관 시간(초)
+# HYBRID 모드: 공백을 제외한 글자 수가 이 값 이상이고 이미지가 덮는 비율이 이 값 이하인 페이지만 텍스트로 추출
+PDF_HYBRID_MIN_CHARS = int(os.getenv('PDF_HYBRID_MIN_CHARS', 50))
+PDF_HYBRID_MAX_IMAGE_COVERAGE = float(os.getenv('PDF_HYBRID_MAX_IMAGE_COVERAGE', 0.5))
+
+# Section: Task Unit Dispatcher
+# celery: TaskUnit 하나당 Celery 작업 하나 / async: 하나의 Celery 작업이 여러 TaskUnit을 asyncio로 동시에 요청
+TASK_UNIT_DISPATCH_MODE = os.getenv('TASK_UNIT_DISPATCH_MODE', 'celery')
+TASK_UNIT_MICRO_BATCH_SIZE = int(os.getenv('TASK_UNIT_MICRO_BATCH_SIZE', 1))  # celery 모드에서 메시지 하나의 TaskUnit 수
+ASYNC_DISPATCH_BATCH_SIZE = int(os.getenv('ASYNC_DISPATCH_BATCH_SIZE', 500))  # Celery 작업 하나가 가져가는 TaskUnit 수
+ASYNC_DISPATCH_MAX_IN_FLIGHT = int(os.getenv('ASYNC_DISPATCH_MAX_IN_FLIGHT', 200))  # 작업 하나의 최대 동시 요청 수
 
 # Section: Pagination
 REST_FRAMEWORK = {
@@ -0,0 +1,84 @@
+"""
+CSV 엔진 벤치마크
+
+열이 많은 임시 CSV 파일(기본 200열)에서 Prompt가 2개 열만 사용할 때
+pandas 엔진(before)과 pyarrow 엔진(after)의 초당 행 수와 최대 메모리(RSS)를 비교한다.
+각 엔진은 별도 프로세스에서 실행한다.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_csv_engine --rows 100000 --columns 200
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+PROMPT = "Translate {col_1} written by {col_2}"
+SELECTED_HEADERS = ["col_1", "col_2"]
+
+
+def write_csv(file_path, rows, columns):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([f"col_{index}" for index in range(columns)])
+        for row in range(rows):
+            writer.writerow([f"value {row}-{index}" for index in range(columns)])
+
+
+def render(engine, file_path, queue):
+    from api.utils.files_processor.csv_processor import CSVProcessor
+
+    if engine == 'pyarrow':
+        import pyarrow.compute  # noqa: F401, import 크기는 비교에서 제외
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    start_time = time.perf_counter()
+    with mock.patch('backend.settings.CSV_ENGINE', engine):
+        count = sum(1 for _ in CSVProcessor().process_prompts(file_path, PROMPT, SELECTED_HEADERS))
+    elapsed = time.perf_counter() - start_time
+
+    queue.put((count, elapsed, base_rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def run(label, engine, file_path, rows):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=render, args=(engine, file_path, queue))
+    process.start()
+    count, elapsed, base_rss, max_rss = queue.get()
+    process.join()
+
+    assert count == rows, f"{label}: rendered {count} rows, expected {rows}"
+    print(f"{label:<20} {rows / elapsed:>12.0f} rows/s ({elapsed:.2f}s) max RSS {max_rss:.0f}MB (+{max_rss - base_rss:.0f}MB while reading)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=200)
+    args = parser.parse_args()
+
+    from api.utils.files_processor.csv_processor import CSVEngine
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "bench.csv")
+        write_csv(file_path, args.rows, args.columns)
+        print(f"rows={args.rows} columns={args.columns} size={os.path.getsize(file_path) / 1024 / 1024:.1f}MB")
+
+        run("before: pandas", CSVEngine.PANDAS, file_path, args.rows)
+        run("after: pyarrow", CSVEngine.PYARROW, file_path, args.rows)
+
+
+if __name__ == '__main__':
+    import django
+
+    django.setup()
+    main()
@@ -0,0 +1,74 @@
+"""
+CSV Prompt 렌더링 벤치마크
+
+임시 CSV 파일을 만들고 행마다 dict를 만들어 get_prompt를 호출하는 방식(before)과
+PromptTemplate으로 chunk의 열 단위로 렌더링하는 방식(after)의 초당 행 수를 비교한다.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_csv_render --rows 1000000
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+PROMPT = "Summarize the review of {product} ({category}) written by {name}: {review}"
+HEADERS = ["id", "name", "product", "category", "review", "rating", "created_at"]
+SELECTED_HEADERS = ["name", "product", "category", "review"]
+
+
+def write_csv(file_path, rows):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for index in range(rows):
+            writer.writerow([index, f"user {index % 997}", f"product {index % 101}", f"category {index % 7}",
+                             f" review text number {index} ", index % 5, "2025-01-01"])
+
+
+def run(label, render, file_path, rows):
+    start_time = time.perf_counter()
+    count = sum(1 for _ in render(file_path))
+    elapsed = time.perf_counter() - start_time
+
+    assert count == rows, f"{label}: rendered {count} rows, expected {rows}"
+    print(f"{label:<32} {rows / elapsed:>12.0f} rows/s ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    from api.utils.files_processor.csv_processor import CSVProcessor
+
+    processor = CSVProcessor()
+
+    def render_per_row(file_path):
+        for _, (columns, row) in processor.process(file_path):
+            yield processor.process_text(PROMPT, columns=columns, row=row, selected_headers=SELECTED_HEADERS)
+
+    def render_column_wise(file_path):
+        for _, text_data in processor.process_prompts(file_path, PROMPT, SELECTED_HEADERS):
+            yield text_data
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "bench.csv")
+        write_csv(file_path, args.rows)
+        print(f"rows={args.rows} size={os.path.getsize(file_path) / 1024 / 1024:.1f}MB")
+
+        run("before: get_prompt per row", render_per_row, file_path, args.rows)
+        run("after: PromptTemplate per chunk", render_column_wise, file_path, args.rows)
+
+
+if __name__ == '__main__':
+    import django
+
+    django.setup()
+    main()
@@ -0,0 +1,115 @@
+"""
+GPT Client 재사용 벤치마크
+
+로컬 Stub HTTP 서버를 띄우고 chat.completions.create 요청을 반복하여
+요청마다 OpenAI Client를 생성하는 방식(before)과 워커 프로세스의 Client를 재사용하는 방식(after)의
+초당 요청 수를 비교한다.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_gpt_client --requests 500 --threads 8
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+STUB_RESPONSE = json.dumps({
+    "id": "chatcmpl-benchmark",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "Hello, world!"},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+}).encode('utf-8')
+
+REQUEST_KWARGS = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": [{"type": "text", "text": "Hello"}]}],
+    "max_tokens": 500,
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 지원
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label, send, total_requests, threads):
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: send(), range(total_requests)))
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{label:<32} {total_requests / elapsed:>10.1f} req/s ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    from openai import OpenAI
+    from api.utils.gpt_processor.gpt_clients import get_client_options, init_gpt_clients, get_gpt_client, \
+        close_gpt_clients
+
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    def send_with_new_client():
+        client = OpenAI(api_key="benchmark", base_url=base_url)
+        client.chat.completions.create(**REQUEST_KWARGS)
+
+    def send_with_pooled_client():
+        get_gpt_client(company="openai").chat.completions.create(**REQUEST_KWARGS)
+
+    options = get_client_options()
+    print(f"requests={args.requests} threads={args.threads} "
+          f"max_connections={options['max_connections']} "
+          f"max_keepalive_connections={options['max_keepalive_connections']}")
+
+    run("before: new client per task", send_with_new_client, args.requests, args.threads)
+
+    init_gpt_clients(api_key="benchmark", base_url=base_url)
+    run("after: pooled client", send_with_pooled_client, args.requests, args.threads)
+
+    close_gpt_clients()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    import django
+
+    django.setup()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    main()
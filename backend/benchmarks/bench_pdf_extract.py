@@ -0,0 +1,69 @@
+"""
+PDF 페이지 추출 벤치마크
+
+임시 PDF 파일(기본 200쪽)에서 작업자 수(PDF_EXTRACT_WORKERS)에 따른
+초당 페이지 수를 비교한다. 1은 기존과 같이 현재 프로세스에서 순서대로 추출한다.
+병렬 추출의 효과는 CPU 코어 수에 따라 달라진다.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_pdf_extract --pages 200 --mode image --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+
+def write_pdf(file_path, pages):
+    import fitz
+
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            page = doc.new_page()
+            for line in range(40):
+                page.insert_text((50, 60 + line * 18), f"Page {page_num} line {line} " + "lorem ipsum " * 6)
+            page.draw_rect(fitz.Rect(50, 500, 300, 700), color=(0, 0, 1), fill=(0.8, 0.8, 1))
+        doc.save(file_path)
+
+
+def run(file_path, pages, pdf_mode, workers, units_per_task):
+    from api.utils.files_processor.pdf_processor import PDFProcessor
+
+    start_time = time.perf_counter()
+    with mock.patch('backend.settings.PDF_EXTRACT_WORKERS', workers), \
+            mock.patch('backend.settings.PDF_EXTRACT_UNITS_PER_TASK', units_per_task):
+        count = sum(1 for _ in PDFProcessor().process(file_path, work_unit=1, pdf_mode=pdf_mode))
+    elapsed = time.perf_counter() - start_time
+
+    assert count == pages, f"workers={workers}: extracted {count} pages, expected {pages}"
+    print(f"workers={workers:<3} {pages / elapsed:>10.1f} pages/s ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--mode', default='image', choices=['text', 'image'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--units-per-task', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "bench.pdf")
+        write_pdf(file_path, args.pages)
+        print(f"pages={args.pages} mode={args.mode} cpus={os.cpu_count()}")
+
+        for workers in args.workers:
+            run(file_path, args.pages, args.mode, workers, args.units_per_task)
+
+
+if __name__ == '__main__':
+    import django
+
+    django.setup()
+    main()
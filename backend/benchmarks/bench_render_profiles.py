@@ -0,0 +1,82 @@
+"""
+PDF 렌더링 프로필 벤치마크
+
+A4 크기의 임시 PDF 파일(기본 20쪽, 본문 텍스트와 도형)을 렌더링 프로필별로 이미지로 변환하여
+페이지당 이미지 크기, 요청에 들어가는 base64 크기, 추정 이미지 토큰 수, 렌더링 시간을 비교한다.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_render_profiles --pages 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+
+def write_pdf(file_path, pages):
+    import fitz
+
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            page = doc.new_page(width=595, height=842)
+            page.insert_text((72, 90), f"Quarterly report - page {page_num}", fontsize=18)
+            for line in range(30):
+                page.insert_text((72, 130 + line * 14), f"{line:02d} " + "The quick brown fox jumps over the lazy dog. " * 2,
+                                 fontsize=9)
+            page.draw_rect(fitz.Rect(72, 560, 400, 700), color=(0, 0, 0.6), fill=(0.85, 0.9, 1))
+        doc.save(file_path)
+
+
+def run(file_path, name):
+    import fitz
+    from api.utils.files_processor.render_profiles import PDFRenderProfile, get_render_options, render_page
+    from api.utils.gpt_processor.rate_limiter import estimate_image_tokens
+
+    render_profile = PDFRenderProfile.resolve(name)
+    total_bytes = 0
+    total_tokens = 0
+    size = None
+
+    with fitz.open(file_path) as doc:
+        start_time = time.perf_counter()
+        for page in doc:
+            image = render_page(page, render_profile)
+            matrix, clip = get_render_options(page, render_profile)
+            size = (clip * matrix).irect
+
+            total_bytes += len(image)
+            total_tokens += estimate_image_tokens(size.width, size.height, render_profile['detail'])
+        elapsed = time.perf_counter() - start_time
+        pages = len(doc)
+
+    print(f"{name:<15} {size.width:>5}x{size.height:<5} {total_bytes / pages / 1024:>9.1f}KB "
+          f"{total_bytes * 4 / 3 / pages / 1024:>9.1f}KB {total_tokens / pages:>9.0f} {elapsed / pages * 1000:>9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    args = parser.parse_args()
+
+    from api.utils.files_processor.render_profiles import PDFRenderProfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "bench.pdf")
+        write_pdf(file_path, args.pages)
+
+        print(f"pages={args.pages}")
+        print(f"{'profile':<15} {'size':>11} {'bytes/page':>11} {'base64/page':>11} {'tokens':>9} {'render':>11}")
+        for name in PDFRenderProfile.PROFILES:
+            run(file_path, name)
+
+
+if __name__ == '__main__':
+    import django
+
+    django.setup()
+    main()
@@ -5,6 +5,7 @@ import os
 
 import redis
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from celery.schedules import crontab
 
 # Django settings 파일을 Celery에 설정
@@ -25,6 +26,14 @@ app.conf.beat_schedule = {
         'task': 'tasks.queue_batch_job_process.resume_pending_jobs',
         'schedule': crontab(minute='*/5'),
     },
+    'reconcile-job-counters-every-5-minutes': {
+        'task': 'tasks.queue_batch_job_process.reconcile_job_counters',
+        'schedule': crontab(minute='*/5'),
+    },
+    'evict-response-cache-every-hour': {
+        'task': 'tasks.queue_task_units.evict_response_cache',
+        'schedule': crontab(minute=0),
+    },
 }
 
 # Celery 작업 자동 발견
@@ -44,3 +53,18 @@ def setup_periodic_tasks(sender, **kwargs):
 
     resume_pending_jobs.apply_async()
     resume_pending_tasks.apply_async()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # fork 이후 워커 프로세스마다 연결 풀을 가진 GPT Client 생성
+    from api.utils.gpt_processor.gpt_clients import init_gpt_clients
+
+    init_gpt_clients()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    from api.utils.gpt_processor.gpt_clients import close_gpt_clients
+
+    close_gpt_clients()
@@ -0,0 +1,98 @@
+# tasks/dispatcher.py
+import logging
+import time
+
+import redis
+
+from api.utils.cache_keys import batch_job_celery_cache_key, CACHE_TIMEOUT_BATCH_JOB_CELERY
+from tasks.queue_task_units import process_task_unit, process_task_units
+from tasks.queue_task_units_async import dispatch_task_units
+
+logger = logging.getLogger(__name__)
+
+# kombu Redis transport가 우선순위별로 나누어 저장하는 큐 이름 규칙
+PRIORITY_SEPARATOR = '\x06\x16'
+PRIORITY_STEPS = [0, 3, 6, 9]
+
+_broker_client = None
+
+
+class DispatchMode:
+    """TaskUnit을 Celery에 등록하는 방식"""
+    CELERY = 'celery'  # TaskUnit 하나당 Celery 작업 하나
+    ASYNC = 'async'  # 여러 TaskUnit을 하나의 Celery 작업에서 asyncio로 동시에 요청
+
+
+def enqueue_task_units(task_unit_ids, batch_job_id, priority=None):
+    """
+    설정된 Dispatch 모드에 맞게 TaskUnit 작업을 Celery에 등록
+    - async: ASYNC_DISPATCH_BATCH_SIZE개씩 dispatch_task_units 메시지 하나로 묶음
+    - celery: TASK_UNIT_MICRO_BATCH_SIZE개씩 process_task_units 메시지 하나로 묶음 (1이면 process_task_unit)
+    메시지에 파티션 키(batch_job_id)를 함께 보내 작업자가 해당 BatchJob의 파티션만 읽도록 함
+    :param task_unit_ids: 모두 batch_job_id의 TaskUnit
+    """
+    from backend import settings
+
+    task_unit_ids = list(task_unit_ids)
+
+    if settings.TASK_UNIT_DISPATCH_MODE == DispatchMode.ASYNC:
+        messages = [(dispatch_task_units, [batch, batch_job_id])
+                    for batch in split_batches(task_unit_ids, settings.ASYNC_DISPATCH_BATCH_SIZE)]
+    elif settings.TASK_UNIT_MICRO_BATCH_SIZE > 1:
+        messages = [(process_task_units, [batch, batch_job_id])
+                    for batch in split_batches(task_unit_ids, settings.TASK_UNIT_MICRO_BATCH_SIZE)]
+    else:
+        messages = [(process_task_unit, [task_unit_id, batch_job_id]) for task_unit_id in task_unit_ids]
+
+    publish_messages(messages, priority=priority)
+
+
+def split_batches(items, batch_size):
+    return [items[start_index:start_index + batch_size] for start_index in range(0, len(items), batch_size)]
+
+
+def publish_messages(messages, priority=None):
+    """
+    하나의 Producer 연결을 재사용하여 여러 Celery 메시지를 연속으로 발행
+    :param messages: (task, args) 목록
+    """
+    from tasks.celery import app
+
+    options = {} if priority is None else {'priority': priority}
+
+    with app.producer_or_acquire() as producer:
+        for task, args in messages:
+            task.apply_async(args=args, producer=producer, **options)
+
+    logger.log(logging.DEBUG, f"Celery: {len(messages)} messages are published.")
+
+
+def get_broker_queue_depth(queue_name='celery'):
+    """Broker(Redis)에 아직 전달되지 않고 쌓여 있는 메시지 수"""
+    global _broker_client
+    from backend import settings
+
+    if _broker_client is None:
+        _broker_client = redis.Redis.from_url(settings.REDIS_DB_CELERY)
+
+    queue_keys = [queue_name if step == 0 else f"{queue_name}{PRIORITY_SEPARATOR}{step}" for step in PRIORITY_STEPS]
+
+    pipeline = _broker_client.pipeline(transaction=False)
+    for queue_key in queue_keys:
+        pipeline.llen(queue_key)
+    return sum(pipeline.execute())
+
+
+def wait_for_broker_capacity(batch_job_id=None):
+    """
+    Broker 큐의 메시지 수가 DISPATCH_MAX_QUEUE_DEPTH 미만이 될 때까지 대기
+    :param batch_job_id: 파일을 읽고 있는 BatchJob, 기다리는 동안 등록 중 표시가 만료되지 않도록 갱신
+    """
+    from django.core.cache import cache
+    from backend import settings
+
+    while (queue_depth := get_broker_queue_depth()) >= settings.DISPATCH_MAX_QUEUE_DEPTH:
+        logger.log(logging.DEBUG, f"Celery: The broker queue has {queue_depth} messages. Waiting for workers.")
+        if batch_job_id is not None:
+            cache.touch(batch_job_celery_cache_key(batch_job_id), timeout=CACHE_TIMEOUT_BATCH_JOB_CELERY)
+        time.sleep(settings.DISPATCH_BACKPRESSURE_INTERVAL)
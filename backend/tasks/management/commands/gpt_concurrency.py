@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.utils.gpt_processor.concurrency_controller import get_concurrency_controller
+
+
+# Usage:
+# python manage.py gpt_concurrency <gpt_model> [<gpt_model> ...]
+#
+# Example:
+# python manage.py gpt_concurrency gpt-4o-mini
+# This will show the current in-flight limit of 'gpt-4o-mini' and why it has changed.
+class Command(BaseCommand):
+    help = 'Show the adaptive concurrency limit and its history per GPT model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='+', type=str)
+        parser.add_argument('--history', type=int, default=20)
+
+    def handle(self, *args, **kwargs):
+        concurrency_controller = get_concurrency_controller()
+        if not concurrency_controller:
+            self.stdout.write(self.style.ERROR('GPT_ADAPTIVE_CONCURRENCY is disabled.'))
+            return
+
+        for model in kwargs['models']:
+            status = concurrency_controller.get_status(model)
+            self.stdout.write(self.style.SUCCESS(
+                f"{model}: limit={status['limit']} in_flight={status['in_flight']} "
+                f"latency_ewma={status['latency_ewma']} latency_min={status['latency_min']}"))
+
+            for entry in status['history'][:kwargs['history']]:
+                at = datetime.fromtimestamp(entry['at']).strftime('%Y-%m-%d %H:%M:%S')
+                self.stdout.write(
+                    f"  [{at}] {int(entry['previous_limit'])} -> {int(entry['limit'])} "
+                    f"reason={entry['reason']} latency={entry['latency']:.2f}s in_flight={entry['in_flight']}")
@@ -1,126 +1,319 @@
+import hashlib
 import logging
 import os
+import time
+from collections import Counter
 
 from celery import shared_task
-from celery.worker.control import revoke
 
-from api.utils.cache_keys import batch_job_celery_cache_key, locked_celery_cache_key
+from api.utils.cache_keys import batch_job_celery_cache_key, locked_celery_cache_key, task_unit_cache_key, \
+    batch_job_cache_key, file_index_celery_cache_key, CACHE_TIMEOUT_BATCH_JOB_CELERY
 from api.utils.files_processor.base_processor import ResultType
 from api.utils.files_processor.csv_processor import CSVProcessor
 from api.utils.files_processor.pdf_processor import PDFProcessor
+from api.utils.job_status_utils import add_job_counters, reset_job_counters, STATUS_COUNTER_FIELDS
 from tasks.celery import app
-from tasks.queue_task_units import process_task_unit
+from tasks.dispatcher import enqueue_task_units, wait_for_broker_capacity
+from tasks.queue_task_units import finish_batch_job
 
 logger = logging.getLogger(__name__)
 
 
-def handle_request_data(index, batch_job, prompt, result_type, files=None):
-    from api.models import TaskUnit, TaskUnitStatus, TaskUnitFiles
+def iter_chunks(iterable, chunk_size, max_wait=None):
+    """
+    iterable을 chunk_size 크기의 list로 나누어 반환
+    max_wait(초)가 주어지면 chunk가 다 차지 않아도 그 시간이 지난 뒤 바로 반환
+    """
+    chunk = []
+    started_at = time.monotonic()
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) >= chunk_size or (max_wait is not None and time.monotonic() - started_at >= max_wait):
+            yield chunk
+            chunk = []
+            started_at = time.monotonic()
+
+    if chunk:
+        yield chunk
+
+
+def get_prompt_hash(prompt, files=None, gpt_model=None):
+    """gpt_model, Prompt와 첨부 파일 내용이 같다면 같은 값을 가지는 SHA-256 해시"""
+    digest = hashlib.sha256(str(gpt_model).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(str(prompt).encode('utf-8'))
+    for file in files or []:
+        digest.update(b'\0')
+        digest.update(hashlib.sha256(file if isinstance(file, bytes) else str(file).encode('utf-8')).digest())
+    return digest.hexdigest()
+
+
+def build_task_unit(index, batch_job, prompt, result_type, files=None):
+    """저장 전의 TaskUnit 객체 생성"""
+    from api.models import TaskUnit, TaskUnitStatus
 
     match result_type:
         case ResultType.TEXT:
             if not str(prompt).strip():
                 logger.log(logging.ERROR, f"Celery: The request_data cannot be empty or just whitespace.")
                 raise ValueError("The request_data cannot be empty or just whitespace.")
-
-            task_unit, created = TaskUnit.objects.update_or_create(
-                batch_job=batch_job,
-                unit_index=index,
-                defaults={
-                    'text_data': prompt,
-                    'has_files': False,
-                    'task_unit_status': TaskUnitStatus.PENDING,
-                    'latest_response': None,
-                    'is_valid': True,
-                }
-            )
-
-            return task_unit.id
+            has_files = False
 
         case ResultType.IMAGE:
             if files is None:
                 logger.log(logging.ERROR, f"Celery: The provided file is None, which is not allowed.")
                 raise ValueError("The provided file is None, which is not allowed.")
-
-            task_unit, created = TaskUnit.objects.update_or_create(
-                batch_job=batch_job,
-                unit_index=index,
-                defaults={
-                    'text_data': prompt,
-                    'has_files': True,
-                    'task_unit_status': TaskUnitStatus.PENDING,
-                    'latest_response': None,
-                    'is_valid': True,
-                }
-            )
-
-            TaskUnitFiles.objects.filter(task_unit=task_unit).delete()
-            for file in files:
-                TaskUnitFiles.objects.create(
-                    task_unit=task_unit,
-                    base64_image_data=file
-                )
-
-            return task_unit.id
+            has_files = True
 
         case _:
             raise NotImplementedError
 
+    return TaskUnit(
+        batch_job=batch_job,
+        unit_index=index,
+        text_data=prompt,
+        has_files=has_files,
+        task_unit_status=TaskUnitStatus.PENDING,
+        latest_response=None,
+        is_valid=True,
+        prompt_hash=get_prompt_hash(prompt, files, (batch_job.configs or {}).get('gpt_model')),
+        duplicate_of=None,
+    )
+
+
+def bulk_handle_request_data(batch_job, request_data):
+    """
+    여러 작업 단위를 한 번에 TaskUnit, TaskUnitFiles로 저장
+    (batch_job, unit_index)가 이미 있다면 기존 TaskUnit을 갱신
+    이미지는 저장소에 파일로 쓰고 DB에는 경로와 해시만 저장
+    :param request_data: (index, prompt, result_type, files) 목록, files는 이미지(bytes) 목록
+    :return: request_data 순서의 task_unit_id 목록
+    """
+    from django.core.cache import cache
+    from django.db import transaction
+    from api.models import TaskUnit, TaskUnitFiles, TaskUnitStatus
+
+    task_units = [build_task_unit(index, batch_job, prompt, result_type, files)
+                  for index, prompt, result_type, files in request_data]
+
+    with transaction.atomic():
+        # 덮어쓰는 TaskUnit의 이전 상태 (카운터에서 PENDING으로 옮김)와 대표 Prompt를 가리키고 있었는지
+        previous_units = (TaskUnit.objects
+                          .filter(batch_job=batch_job, is_valid=True,
+                                  unit_index__in=[task_unit.unit_index for task_unit in task_units])
+                          .values_list('task_unit_status', 'duplicate_of_id'))
+        previous_statuses = Counter()
+        previous_duplicated = 0
+        for status, duplicate_of_id in previous_units:
+            previous_statuses[status] += 1
+            previous_duplicated += duplicate_of_id is not None
+
+        task_units = TaskUnit.objects.bulk_create(
+            task_units,
+            update_conflicts=True,
+            unique_fields=['batch_job', 'unit_index'],
+            update_fields=['text_data', 'has_files', 'task_unit_status', 'latest_response', 'is_valid',
+                           'prompt_hash', 'duplicate_of', 'updated_at'],
+        )
+        task_unit_ids = [task_unit.id for task_unit in task_units]
+
+        old_files = TaskUnitFiles.objects.filter(task_unit_id__in=task_unit_ids)
+        old_file_names = [name for name in old_files.values_list('file_data', flat=True) if name]
+        old_files.delete()
+
+        TaskUnitFiles.objects.bulk_create([
+            TaskUnitFiles.from_image(task_unit, file)
+            for task_unit, (_, _, _, files) in zip(task_units, request_data)
+            for file in (files or [])
+        ])
+
+        # 이전 실행의 이미지 파일은 새 TaskUnitFiles가 저장된 뒤에 삭제
+        transaction.on_commit(lambda: delete_stored_files(old_file_names))
+
+    deltas = Counter({STATUS_COUNTER_FIELDS[TaskUnitStatus.PENDING]: len(task_units)})
+    deltas.subtract({STATUS_COUNTER_FIELDS[status]: count for status, count in previous_statuses.items()})
+    deltas['duplicated'] -= previous_duplicated  # duplicate_of는 None으로 덮어씀
+    add_job_counters(batch_job.id, **deltas)
+
+    # bulk_create는 post_save 시그널을 보내지 않으므로 이전 실행의 캐시를 직접 삭제
+    cache.delete_many([task_unit_cache_key(task_unit_id) for task_unit_id in task_unit_ids])
+    return task_unit_ids
+
+
+def delete_stored_files(file_names):
+    from django.core.files.storage import default_storage
+
+    for file_name in file_names:
+        try:
+            default_storage.delete(file_name)
+        except OSError as e:
+            logger.log(logging.WARNING, f"Celery: Cannot delete the file {file_name}: {str(e)}")
+
+
+def mark_duplicate_task_units(batch_job, task_unit_ids, prompt_hashes, primary_ids):
+    """
+    같은 Prompt의 TaskUnit 중 처음 나온 것만 대표로 요청하고 나머지는 대표를 가리키도록 저장
+    :param primary_ids: 작업 전체에서 공유하는 prompt_hash -> 대표 task_unit_id (갱신됨)
+    :return: 요청해야 하는 대표 task_unit_id 목록
+    """
+    from api.models import TaskUnit
+    from tasks.queue_task_units import resolve_finished_duplicates
+
+    dispatch_ids = []
+    duplicates = []
+
+    for task_unit_id, prompt_hash in zip(task_unit_ids, prompt_hashes):
+        primary_id = primary_ids.setdefault(prompt_hash, task_unit_id)
+        if primary_id == task_unit_id:
+            dispatch_ids.append(task_unit_id)
+        else:
+            duplicates.append(TaskUnit(id=task_unit_id, duplicate_of_id=primary_id))
+
+    if duplicates:
+        TaskUnit.objects.filter(batch_job=batch_job).bulk_update(duplicates, ['duplicate_of'])
+        add_job_counters(batch_job.id, duplicated=len(duplicates))
+
+        # 이전 묶음의 대표가 이미 끝났다면 대표의 응답을 바로 복사
+        resolve_finished_duplicates(batch_job, {duplicate.duplicate_of_id for duplicate in duplicates})
+
+    return dispatch_ids
+
+
+def get_existing_task_units(batch_job):
+    """
+    incremental 재실행에서 비교할 기존 TaskUnit
+    :return: unit_index -> (task_unit_id, prompt_hash, task_unit_status)
+    """
+    from api.models import TaskUnit
+
+    task_units = (TaskUnit.objects
+                  .filter(batch_job=batch_job, is_valid=True)
+                  .values_list('unit_index', 'id', 'prompt_hash', 'task_unit_status'))
+    return {unit_index: (task_unit_id, prompt_hash, status)
+            for unit_index, task_unit_id, prompt_hash, status in task_units.iterator()}
+
+
+def filter_changed_request_data(request_data, prompt_hashes, existing_units, primary_ids=None):
+    """
+    같은 unit_index의 기존 TaskUnit과 Prompt가 같고 COMPLETED 상태라면 다시 요청하지 않음
+    비교한 TaskUnit은 existing_units에서 제거되므로, 파일을 모두 읽은 뒤 남은 것은 더 이상 없는 작업 단위
+    :return: Prompt가 바뀌었거나 실패한 작업 단위의 (request_data, prompt_hashes)
+    """
+    from api.models import TaskUnitStatus
+
+    changed_request_data = []
+    changed_prompt_hashes = []
+
+    for data, prompt_hash in zip(request_data, prompt_hashes):
+        task_unit_id, existing_hash, status = existing_units.pop(data[0], (None, None, None))
+
+        if existing_hash == prompt_hash and status == TaskUnitStatus.COMPLETED:
+            # 바뀌지 않은 TaskUnit도 같은 Prompt의 대표가 될 수 있음
+            if primary_ids is not None:
+                primary_ids.setdefault(prompt_hash, task_unit_id)
+            continue
+
+        changed_request_data.append(data)
+        changed_prompt_hashes.append(prompt_hash)
+
+    return changed_request_data, changed_prompt_hashes
+
+
+def dispatch_request_data(batch_job, request_data, primary_ids=None, existing_units=None):
+    """
+    작업 단위 묶음을 저장한 뒤, 파일의 나머지 부분을 읽기 전에 곧바로 Celery에 등록
+    primary_ids가 주어지면 같은 Prompt는 한 번만 요청
+    existing_units가 주어지면 (incremental 재실행) 바뀌었거나 실패한 작업 단위만 저장하고 요청
+    """
+    from django.core.cache import cache
+
+    gpt_model = (batch_job.configs or {}).get('gpt_model')
+    prompt_hashes = [get_prompt_hash(prompt, files, gpt_model) for _, prompt, _, files in request_data]
+
+    if existing_units is not None:
+        request_data, prompt_hashes = filter_changed_request_data(request_data, prompt_hashes, existing_units,
+                                                                  primary_ids)
+
+    if request_data:
+        task_unit_ids = bulk_handle_request_data(batch_job, request_data)
+
+        if primary_ids is not None:
+            task_unit_ids = mark_duplicate_task_units(batch_job, task_unit_ids, prompt_hashes, primary_ids)
+
+        wait_for_broker_capacity(batch_job.id)
+        enqueue_task_units(task_unit_ids, batch_job.id)
+
+    # 파일을 읽는 동안에는 BatchJob이 완료 처리되지 않도록 표시 유지
+    cache.touch(batch_job_celery_cache_key(batch_job.id), timeout=CACHE_TIMEOUT_BATCH_JOB_CELERY)
+
+
+def process_csv(processor, prompt, batch_job, file_path, primary_ids=None, existing_units=None):
+    from backend import settings
 
-def process_csv(processor, prompt, batch_job, file_path):
     selected_headers = batch_job.configs['selected_headers']
     selected_headers = [header.strip() for header in selected_headers]
-    task_ids = []
 
-    for index, (result_type, data) in enumerate(processor.process(file_path), start=1):
-        match result_type:
-            case ResultType.TEXT:
-                columns, row = data
-                request_data = processor.process_text(prompt, columns=columns, row=row,
-                                                      selected_headers=selected_headers)
-                task_unit_id = handle_request_data(index, batch_job, request_data, result_type)
-                task_ids.append(task_unit_id)
+    rows = enumerate(processor.process_prompts(file_path, prompt, selected_headers,
+                                               dialect=batch_job.get_csv_dialect()), start=1)
+    for chunk in iter_chunks(rows, settings.INGESTION_CHUNK_SIZE, max_wait=settings.INGESTION_FLUSH_INTERVAL):
+        request_data = []
+
+        for index, (result_type, text_data) in chunk:
+            match result_type:
+                case ResultType.TEXT:
+                    request_data.append((index, text_data, result_type, None))
 
-            case _:
-                raise NotImplementedError
+                case _:
+                    raise NotImplementedError
 
-    for task_id in task_ids:
-        process_task_unit.apply_async(args=[task_id])
+        dispatch_request_data(batch_job, request_data, primary_ids, existing_units)
 
 
-def process_pdf(processor, prompt, batch_job, file_path):
+def process_pdf(processor, prompt, batch_job, file_path, primary_ids=None, existing_units=None):
+    from backend import settings
+
     work_unit = batch_job.configs.get('work_unit', 1)
     pdf_mode = batch_job.configs.get('pdf_mode')
-    task_ids = []
 
-    for index, (result_type, data) in \
-            enumerate(processor.process(file_path, work_unit=work_unit, pdf_mode=pdf_mode),
-                      start=1):
+    render_profile = batch_job.configs.get('render_profile')
+
+    pages = enumerate(processor.process(file_path, work_unit=work_unit, pdf_mode=pdf_mode,
+                                        render_profile=render_profile,
+                                        hybrid_fallback=batch_job.configs.get('hybrid_fallback')), start=1)
+    for chunk in iter_chunks(pages, settings.INGESTION_CHUNK_SIZE, max_wait=settings.INGESTION_FLUSH_INTERVAL):
+        request_data = []
 
-        match result_type:
-            case ResultType.TEXT:
-                request_data = processor.process_text(prompt, data=data)
-                task_unit_id = handle_request_data(index, batch_job, request_data, result_type)
-                task_ids.append(task_unit_id)
+        for index, (result_type, data) in chunk:
+            match result_type:
+                case ResultType.TEXT:
+                    text_data = processor.process_text(prompt, data=data)
+                    request_data.append((index, text_data, result_type, None))
 
-            case ResultType.IMAGE:
-                task_unit_id = handle_request_data(index, batch_job, prompt, result_type, files=data)
-                task_ids.append(task_unit_id)
+                case ResultType.IMAGE:
+                    request_data.append((index, prompt, result_type, data))
 
-            case _:
-                raise NotImplementedError
+                case _:
+                    raise NotImplementedError
 
-    for task_id in task_ids:
-        process_task_unit.apply_async(args=[task_id])
+        dispatch_request_data(batch_job, request_data, primary_ids, existing_units)
 
 
 @shared_task(bind=True, max_retries=1, autoretry_for=(Exception,))
-def process_batch_job(self, batch_job_id):
+def process_batch_job(self, batch_job_id, incremental=False):
+    """
+    BatchJob의 파일을 읽어 TaskUnit을 생성하고 Celery에 등록
+    incremental이면 기존 TaskUnit을 모두 다시 만들지 않고, Prompt가 바뀌었거나 COMPLETED가 아닌 작업 단위만 요청
+    """
     from django.db import connections, transaction
     from django.core.cache import cache
     from django.core.files.uploadedfile import InMemoryUploadedFile
+    from django.utils import timezone
     from api.models import BatchJob, BatchJobStatus, TaskUnit
     from api.utils.files_processor.file_settings import FileSettings
+    from api.utils.job_deletion import revoke_celery_tasks
+    from api.utils.job_status_utils import get_dedup_summary
     from backend import settings
 
     batch_job = None
@@ -128,7 +321,7 @@ def process_batch_job(self, batch_job_id):
     logger.info(f"Celery: The job with ID {batch_job_id} is detected.")
 
     try:
-        cache.set(batch_job_celery_cache_key(batch_job_id), self.request.id, timeout=60 * 5)
+        cache.set(batch_job_celery_cache_key(batch_job_id), self.request.id, timeout=CACHE_TIMEOUT_BATCH_JOB_CELERY)
 
         with transaction.atomic():
             batch_job = BatchJob.objects.select_for_update(skip_locked=True).filter(id=batch_job_id).first()
@@ -146,29 +339,32 @@ def process_batch_job(self, batch_job_id):
                 logger.info(f"Celery: The job with ID {batch_job_id} has already been progressed.")
                 return
 
+            if batch_job.batch_job_status in [BatchJobStatus.DELETING]:
+                logger.info(f"Celery: The job with ID {batch_job_id} is being deleted.")
+                return
+
             prompt = batch_job.configs.get('prompt', None)
             if not prompt:
                 logger.error("Celery: Cannot generate prompts because prompt is None")
                 raise ValueError("Cannot generate prompts because prompt is None")
 
             task_units = TaskUnit.objects.filter(batch_job=batch_job)
-            if task_units.exists():
+            if not incremental and task_units.exists():
                 task_units.update(is_valid=False)
 
-                from api.utils.cache_keys import task_unit_celery_cache_key
-                from django.core.cache import cache
-
-                for task_unit in task_units:
-                    celery_task_id = cache.get(task_unit_celery_cache_key(task_unit.id))
-                    if celery_task_id:
-                        try:
-                            revoke(celery_task_id, terminate=True)
-                        except Exception as e:
-                            pass
+                # 이전 실행에서 TaskUnit 하나만 처리 중인 Celery 작업을 한 번에 취소 (이 작업 자신은 제외)
+                # Micro-batch, async 작업은 다른 BatchJob의 TaskUnit도 처리하므로 취소하지 않음
+                revoke_celery_tasks(batch_job_id, include_ingestion=False)
 
             batch_job.set_status(BatchJobStatus.IN_PROGRESS)
+            batch_job.started_at = timezone.now()
+            batch_job.completed_at = None
             batch_job.save()
 
+        if not incremental:
+            # 이전 TaskUnit은 모두 무효화되었으므로 처음부터 다시 셈
+            reset_job_counters(batch_job_id)
+
         file = batch_job.file
         if not file:
             logger.error(f"Celery: The job with ID {batch_job_id} does not have an associated file")
@@ -180,15 +376,39 @@ def process_batch_job(self, batch_job_id):
         if not processor:
             raise ValueError(f"Celery: Unsupported file extension for {file_path}")
 
+        # 작업 전체에서 같은 Prompt는 한 번만 요청
+        primary_ids = {} if settings.TASK_UNIT_DEDUP else None
+        existing_units = get_existing_task_units(batch_job) if incremental else None
+
         if isinstance(processor, CSVProcessor):
-            process_csv(processor, prompt, batch_job, file_path)
+            process_csv(processor, prompt, batch_job, file_path, primary_ids, existing_units)
         elif isinstance(processor, PDFProcessor):
-            process_pdf(processor, prompt, batch_job, file_path)
+            process_pdf(processor, prompt, batch_job, file_path, primary_ids, existing_units)
         else:
             raise NotImplementedError("Celery: Unsupported processor type")
 
+        if existing_units:
+            # 파일이 줄어들어 더 이상 없는 작업 단위
+            removed_units = TaskUnit.objects.filter(
+                id__in=[task_unit_id for task_unit_id, _, _ in existing_units.values()])
+            removed_duplicated = removed_units.filter(duplicate_of__isnull=False).count()
+            removed_units.update(is_valid=False)
+
+            removed_statuses = Counter(status for _, _, status in existing_units.values())
+            add_job_counters(batch_job_id, duplicated=-removed_duplicated,
+                             **{STATUS_COUNTER_FIELDS[status]: -count for status, count in removed_statuses.items()})
+
+        if primary_ids:
+            summary = get_dedup_summary(batch_job_id)
+            logger.info(f"Celery: The job with ID {batch_job_id} requests {summary['unique_prompts']} distinct prompts "
+                        f"for {summary['total_task_units']} tasks (dedup ratio: {summary['dedup_ratio']:.2%}).")
+
         logger.info(f"Celery: All tasks for job with ID {batch_job_id} have been completed.")
 
+        # 등록하는 동안 모든 TaskUnit이 끝났다면 마지막 TaskUnit에서 완료 처리하지 않았으므로 여기서 처리
+        cache.delete(batch_job_celery_cache_key(batch_job_id))
+        finish_batch_job(batch_job_id)
+
     except Exception as e:
         logger.error(f"Celery: The job with ID {batch_job_id} has failed for the following reason: {str(e)}")
 
@@ -204,6 +424,49 @@ def process_batch_job(self, batch_job_id):
         connections.close_all()
 
 
+@shared_task
+def index_file_metadata(batch_job_id):
+    """
+    업로드 후 파일 전체를 한 번 읽어 행 개수, 내용 해시 등을 BatchJob.file_metadata에 저장
+    업로드 요청에서 찾은 dialect를 그대로 사용
+    실패하더라도 계산 중 표시를 지우므로, 다음 BatchJob.get_file_metadata 호출에서 다시 계산
+    """
+    from django.core.cache import cache
+    from django.db import connections
+    from api.models import BatchJob
+    from api.utils.files_processor.file_settings import FileSettings
+
+    try:
+        batch_job = BatchJob.objects.filter(id=batch_job_id).first()
+        if not batch_job or not batch_job.file:
+            return
+
+        file_metadata = batch_job.file_metadata or {}
+        content_hash = file_metadata.get('content_hash')
+        file_metadata.update(FileSettings.get_metadata(batch_job.file, dialect=batch_job.get_csv_dialect()))
+
+        # 그 사이 다른 파일이 업로드되었다면 저장하지 않음 (파일 경로는 원래 이름으로 만들어지므로 내용 해시로 비교)
+        if file_metadata['content_hash'] != content_hash:
+            logger.log(logging.INFO, f"Celery: The file of job with ID {batch_job_id} has been replaced. "
+                                     f"Skipping indexing.")
+            return
+
+        if BatchJob.objects.filter(id=batch_job_id, file_metadata__content_hash=content_hash) \
+                .update(file_metadata=file_metadata):
+            cache.delete(batch_job_cache_key(batch_job_id))
+
+        logger.log(logging.INFO, f"Celery: The file metadata of job with ID {batch_job_id} has been indexed. "
+                                 f"({file_metadata.get('total_size')} rows)")
+
+    except Exception as e:
+        logger.log(logging.ERROR,
+                   f"Celery: Cannot index the file of job with ID {batch_job_id}: {str(e)}")
+
+    finally:
+        cache.delete(file_index_celery_cache_key(batch_job_id))
+        connections.close_all()
+
+
 @app.task
 def resume_pending_jobs():
     from api.models import BatchJob, BatchJobStatus
@@ -222,6 +485,12 @@ def resume_pending_jobs():
         for job_id in pending_job_ids:
             process_batch_job.apply_async(args=[job_id])
 
+        # 삭제 중 작업자가 종료되어 남은 BatchJob도 다시 삭제
+        deleting_job_ids = list(BatchJob.objects.filter(batch_job_status=BatchJobStatus.DELETING)
+                                .values_list("id", flat=True))
+        for job_id in deleting_job_ids:
+            delete_batch_job.apply_async(args=[job_id])
+
     except Exception as e:
         logger.log(logging.ERROR,
                    f"Celery: Unknown Error: {str(e)}")
@@ -229,3 +498,60 @@ def resume_pending_jobs():
     finally:
         cache.delete(locked_celery_cache_key('resume_pending_jobs'))
         connections.close_all()
+
+
+@shared_task(bind=True, max_retries=1, autoretry_for=(Exception,))
+def delete_batch_job(self, batch_job_id):
+    """
+    API에서 DELETING으로 표시한 BatchJob을 백그라운드에서 삭제
+    Celery 작업 취소 -> TaskUnit 등 chunk 단위 삭제 -> 파일, BatchJob, 캐시 삭제
+    """
+    from django.db import connections
+    from api.utils.job_deletion import delete_batch_job as delete
+
+    logger.info(f"Celery: The deletion of job with ID {batch_job_id} is detected.")
+
+    try:
+        if not delete(batch_job_id):
+            logger.info(f"Celery: The job with ID {batch_job_id} is not marked for deletion.")
+
+    except Exception as e:
+        logger.log(logging.ERROR,
+                   f"Celery: Cannot delete the job with ID {batch_job_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=10)
+
+    finally:
+        connections.close_all()
+
+
+@app.task
+def reconcile_job_counters():
+    """
+    진행 중인 BatchJob의 카운터를 task_unit 테이블과 비교하여 어긋났다면 수정
+    카운터가 어긋나 마지막 TaskUnit에서 완료 처리하지 못한 BatchJob은 여기서 완료 처리
+    """
+    from api.models import BatchJob, BatchJobStatus
+    from api.utils.job_status_utils import reconcile_job_counters as reconcile
+    from django.core.cache import cache
+    from django.db import connections
+
+    try:
+        if cache.get(locked_celery_cache_key('reconcile_job_counters')): return
+        cache.set(locked_celery_cache_key('reconcile_job_counters'), True, timeout=60 * 5)
+
+        job_ids = list(BatchJob.objects.filter(batch_job_status=BatchJobStatus.IN_PROGRESS)
+                       .values_list("id", flat=True))
+        reconciled = 0
+        for job_id in job_ids:
+            reconciled += reconcile(job_id)
+            # outstanding이 0이 아니거나 아직 파일을 읽는 중이라면 finish_batch_job에서 건너뜀
+            finish_batch_job(job_id)
+        logger.log(logging.INFO, f"Celery: {reconciled} of {len(job_ids)} job counters are reconciled.")
+
+    except Exception as e:
+        logger.log(logging.ERROR,
+                   f"Celery: Unknown Error: {str(e)}")
+
+    finally:
+        cache.delete(locked_celery_cache_key('reconcile_job_counters'))
+        connections.close_all()
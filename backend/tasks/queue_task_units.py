@@ -2,116 +2,387 @@
 import json
 import logging
 import time
+from collections import defaultdict, Counter
 
 from celery import shared_task
 from channels.layers import get_channel_layer
-from openai import OpenAI
+from openai import RateLimitError
 
 from api.utils.cache_keys import batch_job_cache_key, \
-    CACHE_TIMEOUT_BATCH_JOB, get_cache_or_database, task_unit_celery_cache_key, locked_celery_cache_key
+    CACHE_TIMEOUT_BATCH_JOB, get_cache_or_database, task_unit_celery_cache_key, locked_celery_cache_key, \
+    task_unit_cache_key, batch_job_celery_cache_key
+from api.utils.files_processor.render_profiles import PDFRenderProfile
+from api.utils.job_status_utils import move_job_counters, get_job_counters
+from api.utils.gpt_processor.concurrency_controller import get_concurrency_controller, ConcurrencySignal, \
+    get_error_signal
+from api.utils.gpt_processor.gpt_clients import get_gpt_client
 from api.utils.gpt_processor.gpt_settings import get_gpt_processor
+from api.utils.gpt_processor.rate_limiter import get_rate_limiter, estimate_tokens, get_retry_after
+from api.utils.gpt_processor.response_cache import get_response_cache_key, get_cached_response, \
+    save_cached_response, evict_cached_responses
 from tasks.celery import app
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=1, autoretry_for=(Exception,))
-def process_task_unit(self, task_unit_id):
-    from django.core.cache import cache
-    from django.db import connections, transaction
-    from api.models import TaskUnit, TaskUnitResponse, TaskUnitStatus, BatchJob, TaskUnitFiles
-    from backend.settings import OPENAI_API_KEY
+def start_task_unit(task_unit_id, batch_job_id=None, retry=False):
+    """
+    TaskUnit을 IN_PROGRESS 상태로 전환
+    :param batch_job_id: 파티션 키, 주어지면 해당 BatchJob의 파티션만 읽음 (없다면 모든 파티션의 id 인덱스를 찾음)
+    :param retry: Celery 작업의 재시도라면 FAILED 상태의 TaskUnit도 다시 처리
+    :return: 처리할 (task_unit, batch_job), 처리 대상이 아니라면 (None, None)
+    """
+    from django.db import transaction
+    from api.models import TaskUnit, TaskUnitStatus, BatchJob, BatchJobStatus
+
+    task_units = TaskUnit.objects.filter(id=task_unit_id)
+    if batch_job_id is not None:
+        task_units = task_units.filter(batch_job_id=batch_job_id)
+
+    with transaction.atomic():
+        task_unit = task_units.select_for_update(skip_locked=True).first()
+
+        if not task_unit:
+            logger.debug(f"Celery: The task with ID {task_unit_id} is already being processed by another worker. "
+                         f"Skipping this job.")
+            return None, None
+
+        if not task_unit.is_valid:
+            logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has been invalidated by a re-run.")
+            return None, None
+
+        if task_unit.task_unit_status in [TaskUnitStatus.IN_PROGRESS]:
+            logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has already been progressed.")
+            return None, None
+
+        batch_job = get_cache_or_database(
+            model=BatchJob,
+            primary_key=task_unit.batch_job_id,
+            cache_key=batch_job_cache_key(task_unit.batch_job_id),
+            timeout=CACHE_TIMEOUT_BATCH_JOB,
+        )
 
-    start_time = time.time()
-    task_unit = None
-    batch_job = None
+        if task_unit.task_unit_status in [TaskUnitStatus.COMPLETED]:
+            logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has already been completed.")
+            return None, None
 
-    logger.info(f"Celery: The task with ID {task_unit_id} is detected.")
+        if task_unit.task_unit_status in [TaskUnitStatus.FAILED] and not retry:
+            logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has already failed.")
+            return None, None
 
-    try:
-        cache.set(task_unit_celery_cache_key(task_unit_id), self.request.id, timeout=60 * 5)
+        if batch_job.batch_job_status in [BatchJobStatus.DELETING]:
+            logger.log(logging.INFO, f"Celery: The job of task with ID {task_unit_id} is being deleted.")
+            return None, None
 
-        with transaction.atomic():
-            task_unit = TaskUnit.objects.select_for_update(skip_locked=True).filter(id=task_unit_id).first()
+        previous_status = task_unit.task_unit_status
+        task_unit.set_status(TaskUnitStatus.IN_PROGRESS)
+        task_unit.save()
 
-            if not task_unit:
-                logger.debug(f"Celery: The task with ID {task_unit_id} is already being processed by another worker. "
-                             f"Skipping this job.")
-                return
+    move_job_counters(batch_job.id, previous_status, TaskUnitStatus.IN_PROGRESS)
 
-            if task_unit.task_unit_status in [TaskUnitStatus.IN_PROGRESS]:
-                logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has already been progressed.")
-                return
+    return task_unit, batch_job
 
-            batch_job = get_cache_or_database(
-                model=BatchJob,
-                primary_key=task_unit.batch_job_id,
-                cache_key=batch_job_cache_key(task_unit.batch_job_id),
-                timeout=CACHE_TIMEOUT_BATCH_JOB,
-            )
 
-            if task_unit.task_unit_status in [TaskUnitStatus.COMPLETED]:
-                logger.log(logging.INFO, f"Celery: The task with ID {task_unit_id} has already been completed.")
-                return
+def build_request_kwargs(task_unit, batch_job):
+    """TaskUnit의 Prompt와 파일로 chat.completions.create 요청 인자 생성"""
+    from api.models import TaskUnitFiles
 
-            task_unit.set_status(TaskUnitStatus.IN_PROGRESS)
-            task_unit.save()
+    batch_job_config = batch_job.configs or {}
+    model = batch_job_config['gpt_model']
 
-        logger.info(f"Celery: The task with ID {task_unit_id} is being started.")
+    content_data = [{
+        "type": "text",
+        "text": task_unit.text_data,
+    }]
+
+    if task_unit.has_files:
+        # 렌더링 프로필에 detail이 지정된 경우에만 요청에 포함
+        detail = PDFRenderProfile.resolve(batch_job_config.get('render_profile'))['detail']
+
+        # 저장소의 이미지 파일은 요청을 만들 때에만 base64로 변환
+        task_unit_files = TaskUnitFiles.objects.filter(task_unit=task_unit).order_by('id')
+        base64_images = [{
+            "type": "image_url",
+            "image_url": {"url": task_unit_file.get_data_url(), **({"detail": detail} if detail else {})},
+        } for task_unit_file in task_unit_files]
+        content_data += base64_images
+        logger.log(logging.INFO,
+                   f"Base64 images added to content data. "
+                   f"Total content length: {len(content_data)}")
+
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": content_data,
+            }
+        ],
+        "max_tokens": 500,
+    }
 
-        batch_job_config = batch_job.configs or {}
-        model = batch_job_config['gpt_model']
-
-        content_data = [{
-            "type": "text",
-            "text": task_unit.text_data,
-        }]
-
-        if task_unit.has_files:
-            task_unit_files = TaskUnitFiles.objects.filter(task_unit=task_unit)
-            base64_images = [{
-                "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{task_unit_file.base64_image_data}"},
-            } for task_unit_file in task_unit_files]
-            content_data += base64_images
-            logging.info(logging.INFO,
-                         f"Base64 images added to content data. "
-                         f"Total content length: {len(content_data)}")
-
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": content_data,
-                }
-            ],
-            max_tokens=500
-        )
 
-        response_json = response.model_dump_json()
-        gpt_response = response_json if isinstance(response_json, dict) else json.loads(response_json)
-        gpt_processor = get_gpt_processor(company="openai")
-        response_data = gpt_processor.process_response(gpt_response)
+def request_chat_completion(client, request_kwargs):
+    """
+    gpt_model별 Rate Limit 용량과 동시 요청 슬롯이 생길 때까지 기다린 뒤 요청
+    429 응답을 받으면 Retry-After 동안 모든 워커의 요청을 멈추고 다시 요청
+    """
+    from backend import settings
+
+    rate_limiter = get_rate_limiter()
+    concurrency_controller = get_concurrency_controller()
+    model = request_kwargs['model']
+    estimated_tokens = estimate_tokens(request_kwargs)
+
+    for attempt in range(settings.GPT_RATE_LIMIT_MAX_RETRIES + 1):
+        rate_limiter.acquire(model, estimated_tokens)
+        lease_id = concurrency_controller.acquire(model) if concurrency_controller else None
+        started_at = time.time()
+        signal = ConcurrencySignal.SUCCESS
+
+        try:
+            response = client.chat.completions.create(**request_kwargs)
+        except Exception as e:
+            signal = get_error_signal(e)
+            if not isinstance(e, RateLimitError) or attempt >= settings.GPT_RATE_LIMIT_MAX_RETRIES:
+                raise
+            retry_after = get_retry_after(e, settings.GPT_RATE_LIMIT_DEFAULT_RETRY_AFTER)
+            logger.log(logging.INFO, f"Celery: Rate limited by the provider for {model}. Retry after {retry_after}s.")
+            rate_limiter.penalize(model, retry_after)
+            continue
+        finally:
+            if lease_id:
+                concurrency_controller.release(model, lease_id, time.time() - started_at, signal)
+
+        if response.usage:
+            rate_limiter.adjust(model, response.usage.total_tokens - estimated_tokens)
+        return response
+
+
+def normalize_response(response):
+    """GPT 응답을 format_response로 정규화한 dict로 변환"""
+    response_json = response.model_dump_json()
+    gpt_response = response_json if isinstance(response_json, dict) else json.loads(response_json)
+    return get_gpt_processor(company="openai").process_response(gpt_response)
+
+
+def get_response_from_cache(request_kwargs):
+    """
+    동일한 요청의 응답이 캐시에 있는지 확인
+    :return: (cache_key, 캐시된 응답), GPT_RESPONSE_CACHE가 꺼져 있다면 (None, None)
+    """
+    from backend import settings
+
+    if not settings.GPT_RESPONSE_CACHE:
+        return None, None
+
+    cache_key = get_response_cache_key(request_kwargs)
+    return cache_key, get_cached_response(cache_key)
+
+
+def save_response_to_cache(cache_key, request_kwargs, response_data):
+    if cache_key:
+        save_cached_response(cache_key, request_kwargs['model'], response_data)
+
+
+def complete_task_unit(batch_job, task_unit, response_data, start_time, is_cached=False):
+    """
+    정규화된 GPT 응답을 TaskUnitResponse로 저장하고 TaskUnit을 COMPLETED 상태로 전환
+    :return: 클라이언트에게 전달할 응답 내용
+    """
+    from django.db import transaction
+    from api.models import TaskUnitResponse, TaskUnitStatus
+
+    task_unit_response = TaskUnitResponse.objects.create(
+        batch_job=batch_job,
+        task_unit=task_unit,
+        task_unit_index=task_unit.unit_index,
+        task_response_status=TaskUnitStatus.COMPLETED,
+        request_data=task_unit.text_data,
+        response_data=response_data,
+        processing_time=calculate_processing_time(start_time),
+        is_cached=is_cached,
+    )
+
+    with transaction.atomic():
+        previous_status = task_unit.task_unit_status
+        task_unit.set_status(TaskUnitStatus.COMPLETED)
+        task_unit.latest_response = task_unit_response
+        task_unit.save()
+
+    if task_unit.is_valid:
+        # 캐시된 응답은 GPT에 요청하지 않았으므로 토큰을 더하지 않음
+        outstanding = move_job_counters(batch_job.id, previous_status, TaskUnitStatus.COMPLETED,
+                                        total_tokens=0 if is_cached else response_data.get('Token') or 0,
+                                        processing_time_ms=round(task_unit_response.processing_time * 1000))
+        if outstanding == 0:
+            finish_batch_job(batch_job.id)
+
+    return get_gpt_processor(company="openai").get_content(response_data)
 
+
+def fail_task_unit(batch_job, task_unit, error, start_time):
+    """실패 내용을 TaskUnitResponse로 저장하고 TaskUnit을 FAILED 상태로 전환"""
+    from django.db import transaction
+    from api.models import TaskUnitResponse, TaskUnitStatus
+
+    with transaction.atomic():
         task_unit_response = TaskUnitResponse.objects.create(
             batch_job=batch_job,
             task_unit=task_unit,
             task_unit_index=task_unit.unit_index,
-            task_response_status=TaskUnitStatus.COMPLETED,
+            task_response_status=TaskUnitStatus.FAILED,
             request_data=task_unit.text_data,
-            response_data=response_data,
-            processing_time=calculate_processing_time(start_time)
+            error_message=str(error),
+            processing_time=calculate_processing_time(start_time),
         )
 
-        with transaction.atomic():
-            task_unit.set_status(TaskUnitStatus.COMPLETED)
-            task_unit.latest_response = task_unit_response
-            task_unit.save()
+        previous_status = task_unit.task_unit_status
+        task_unit.set_status(TaskUnitStatus.FAILED)
+        task_unit.latest_response = task_unit_response
+        task_unit.save()
+
+    if task_unit.is_valid:
+        outstanding = move_job_counters(batch_job.id, previous_status, TaskUnitStatus.FAILED,
+                                        processing_time_ms=round(task_unit_response.processing_time * 1000))
+        if outstanding == 0:
+            finish_batch_job(batch_job.id)
+
+
+def resolve_duplicate_task_units(batch_job, task_unit):
+    """
+    대표 TaskUnit의 최종 응답을 같은 Prompt의 중복 TaskUnit에 복사하고 WebSocket으로 알림
+    GPT에 다시 요청하지 않으므로 응답은 is_cached로 표시
+    등록하는 작업과 대표 TaskUnit을 처리한 작업이 동시에 호출할 수 있으므로 잠금을 기다린 뒤 PENDING인 것만 처리
+    대표 TaskUnit이 재시도로 완료되었다면 이전 실패를 복사한 FAILED 중복 TaskUnit도 완료로 바꿈
+    """
+    from django.core.cache import cache
+    from django.db import transaction
+    from api.models import TaskUnit, TaskUnitResponse, TaskUnitStatus
+
+    primary_response = task_unit.get_latest_response()
+    if primary_response is None:
+        return
+
+    statuses = [TaskUnitStatus.PENDING]
+    if primary_response.task_response_status == TaskUnitStatus.COMPLETED:
+        statuses.append(TaskUnitStatus.FAILED)
+
+    with transaction.atomic():
+        # skip_locked로 건너뛰면 다시 처리할 작업이 없으므로 기다림 (id 순서로 잠가 교착 상태 방지)
+        duplicates = list(TaskUnit.objects.select_for_update()
+                          .filter(batch_job=batch_job, duplicate_of=task_unit,
+                                  task_unit_status__in=statuses, is_valid=True)
+                          .order_by('id'))
+        if not duplicates:
+            return
+        previous_statuses = Counter(duplicate.task_unit_status for duplicate in duplicates)
+
+        responses = TaskUnitResponse.objects.bulk_create([
+            TaskUnitResponse(
+                batch_job=batch_job,
+                task_unit=duplicate,
+                task_unit_index=duplicate.unit_index,
+                task_response_status=primary_response.task_response_status,
+                request_data=duplicate.text_data,
+                response_data=primary_response.response_data,
+                error_message=primary_response.error_message,
+                processing_time=0,
+                is_cached=True,
+            ) for duplicate in duplicates
+        ])
+
+        for duplicate, response in zip(duplicates, responses):
+            if primary_response.task_response_status == TaskUnitStatus.COMPLETED:
+                duplicate.set_status(TaskUnitStatus.IN_PROGRESS)
+            duplicate.set_status(primary_response.task_response_status)
+            duplicate.latest_response = response
+
+        TaskUnit.objects.filter(batch_job=batch_job).bulk_update(duplicates, ['task_unit_status', 'latest_response'])
+
+    outstanding = None
+    for previous_status, count in previous_statuses.items():
+        moved = move_job_counters(batch_job.id, previous_status, primary_response.task_response_status, count=count)
+        outstanding = moved if moved is not None else outstanding
+
+    # bulk_update는 post_save 시그널을 보내지 않으므로 캐시를 직접 삭제
+    cache.delete_many([task_unit_cache_key(duplicate.id) for duplicate in duplicates])
+
+    if primary_response.task_response_status == TaskUnitStatus.COMPLETED:
+        result = get_gpt_processor(company="openai").get_content(primary_response.response_data)
+    else:
+        result = primary_response.error_message
+
+    for duplicate in duplicates:
+        notify_task_completion(batch_job.id, duplicate.id, duplicate.get_task_unit_status_display(), result)
+
+    logger.log(logging.INFO, f"Celery: {len(duplicates)} duplicated tasks are resolved by {task_unit.id}.")
+
+    # FAILED에서 바뀐 중복 TaskUnit은 outstanding을 바꾸지 않지만 FAILED로 끝난 BatchJob의 상태를 바꿀 수 있음
+    if outstanding == 0 or previous_statuses[TaskUnitStatus.FAILED]:
+        finish_batch_job(batch_job.id)
+
+
+def resolve_finished_duplicates(batch_job, primary_ids):
+    """이미 COMPLETED, FAILED 상태인 대표 TaskUnit의 중복 TaskUnit 처리"""
+    from api.models import TaskUnit, TaskUnitStatus
+
+    primaries = (TaskUnit.objects
+                 .filter(batch_job=batch_job, id__in=primary_ids,
+                         task_unit_status__in=[TaskUnitStatus.COMPLETED, TaskUnitStatus.FAILED])
+                 .select_latest_response())
+
+    for primary in primaries:
+        resolve_duplicate_task_units(batch_job, primary)
+
+
+def resolve_unresolved_duplicates(limit=1000):
+    """
+    대표 TaskUnit이 끝났는데도 PENDING으로 남은 중복 TaskUnit 처리 (resume_pending_tasks에서 주기적으로 호출)
+    :return: 처리한 대표 TaskUnit 수
+    """
+    from api.models import BatchJob
+
+    primary_ids = defaultdict(set)
+    for batch_job_id, primary_id in get_unresolved_duplicate_primaries()[:limit]:
+        primary_ids[batch_job_id].add(primary_id)
+
+    for batch_job in BatchJob.objects.filter(id__in=primary_ids):
+        resolve_finished_duplicates(batch_job, primary_ids[batch_job.id])
+
+    return sum(len(ids) for ids in primary_ids.values())
 
-        notify_task_completion(batch_job.id, task_unit_id, task_unit.get_task_unit_status_display(),
-                               gpt_processor.get_content(response_data))
+
+def run_task_unit(task_unit_id, batch_job_id=None, retry=False):
+    """
+    하나의 TaskUnit을 GPT에 요청하고 결과를 저장한 뒤 WebSocket으로 알림
+    동일한 요청의 응답이 캐시에 있다면 GPT에 요청하지 않고 재사용
+    실패한 경우 FAILED 상태로 저장하고 예외를 다시 발생
+    :param retry: 재시도라면 이전 시도에서 FAILED로 저장된 TaskUnit을 다시 요청
+    """
+    start_time = time.time()
+    task_unit = None
+    batch_job = None
+
+    try:
+        task_unit, batch_job = start_task_unit(task_unit_id, batch_job_id, retry=retry)
+        if not task_unit:
+            return
+
+        logger.info(f"Celery: The task with ID {task_unit_id} is being started.")
+
+        request_kwargs = build_request_kwargs(task_unit, batch_job)
+        cache_key, response_data = get_response_from_cache(request_kwargs)
+        is_cached = response_data is not None
+
+        if not is_cached:
+            client = get_gpt_client(company="openai")
+            response_data = normalize_response(request_chat_completion(client, request_kwargs))
+            save_response_to_cache(cache_key, request_kwargs, response_data)
+
+        result = complete_task_unit(batch_job, task_unit, response_data, start_time, is_cached=is_cached)
+
+        notify_task_completion(batch_job.id, task_unit_id, task_unit.get_task_unit_status_display(), result)
         logger.log(logging.INFO, f"Celery: The request for {task_unit_id} has been completed.")
 
     except Exception as e:
@@ -119,24 +390,31 @@ def process_task_unit(self, task_unit_id):
                    f"Celery: The request for {task_unit_id} has failed for the following reason: {str(e)}")
 
         if batch_job and task_unit:
-            with transaction.atomic():
-                task_unit_response = TaskUnitResponse.objects.create(
-                    batch_job=batch_job,
-                    task_unit=task_unit,
-                    task_unit_index=task_unit.unit_index,
-                    task_response_status=TaskUnitStatus.FAILED,
-                    request_data=task_unit.text_data,
-                    error_message=str(e),
-                    processing_time=calculate_processing_time(start_time),
-                )
-
-                task_unit.set_status(TaskUnitStatus.FAILED)
-                task_unit.latest_response = task_unit_response
-                task_unit.save()
+            fail_task_unit(batch_job, task_unit, e, start_time)
 
             # TODO 에러 메세지 처리 메소드 필요
             notify_task_completion(batch_job.id, task_unit_id, task_unit.get_task_unit_status_display(), str(e))
 
+            resolve_duplicate_task_units(batch_job, task_unit)
+
+        raise
+
+    else:
+        resolve_duplicate_task_units(batch_job, task_unit)
+
+
+@shared_task(bind=True, max_retries=1, autoretry_for=(Exception,))
+def process_task_unit(self, task_unit_id, batch_job_id=None):
+    from django.core.cache import cache
+    from django.db import connections
+
+    logger.info(f"Celery: The task with ID {task_unit_id} is detected.")
+
+    try:
+        cache.set(task_unit_celery_cache_key(task_unit_id), self.request.id, timeout=60 * 5)
+        run_task_unit(task_unit_id, batch_job_id, retry=self.request.retries > 0)
+
+    except Exception as e:
         raise self.retry(exc=e, countdown=10)
 
     finally:
@@ -144,9 +422,64 @@ def process_task_unit(self, task_unit_id):
         connections.close_all()
 
 
+@shared_task(bind=True, max_retries=1)
+def process_task_units(self, task_unit_ids, batch_job_id=None):
+    """
+    여러 TaskUnit을 하나의 Celery 메시지로 받아 순서대로 처리 (Micro-batch)
+    하나의 Celery 작업 id가 여러 TaskUnit을 처리하므로 TaskUnit별로 취소할 수 없도록 id를 등록하지 않음
+    삭제 중이거나 무효화된 TaskUnit은 start_task_unit에서 건너뜀
+    process_task_unit과 같이 실패한 TaskUnit만 모아 한 번 더 요청
+    """
+    from django.db import connections
+
+    logger.info(f"Celery: {len(task_unit_ids)} tasks are detected as a micro-batch.")
+
+    failed_ids = []
+    error = None
+
+    try:
+        for task_unit_id in task_unit_ids:
+            try:
+                run_task_unit(task_unit_id, batch_job_id, retry=self.request.retries > 0)
+            except Exception as e:
+                # 실패 내용은 TaskUnitResponse에 저장되었으므로 다음 TaskUnit을 계속 처리
+                failed_ids.append(task_unit_id)
+                error = e
+
+    finally:
+        connections.close_all()
+
+    if failed_ids and self.request.retries < self.max_retries:
+        raise self.retry(args=[failed_ids, batch_job_id], exc=error, countdown=10)
+
+
+def get_unresolved_duplicate_primaries():
+    """
+    대표 TaskUnit은 끝났지만 PENDING으로 남은 중복 TaskUnit의 (batch_job_id, 대표 id) (복사 중 실패한 경우)
+    task_unit_outstanding_idx 부분 인덱스로 PENDING만 읽음
+    """
+    from django.db.models import F
+    from api.models import TaskUnit, TaskUnitStatus
+
+    return (TaskUnit.objects
+            .filter(task_unit_status=TaskUnitStatus.PENDING, is_valid=True,
+                    duplicate_of__batch_job_id=F('batch_job_id'),
+                    duplicate_of__task_unit_status__in=[TaskUnitStatus.COMPLETED, TaskUnitStatus.FAILED])
+            .values_list('batch_job_id', 'duplicate_of_id')
+            .order_by()
+            .distinct())
+
+
+def get_resumable_task_units():
+    """다시 요청할 PENDING 상태의 유효한 TaskUnit (id, batch_job_id) (task_unit_outstanding_idx 부분 인덱스 사용)"""
+    from api.models import TaskUnit, TaskUnitStatus
+
+    return (TaskUnit.objects.filter(task_unit_status=TaskUnitStatus.PENDING, is_valid=True, duplicate_of__isnull=True)
+            .values_list("id", "batch_job_id"))
+
+
 @app.task
 def resume_pending_tasks():
-    from api.models import TaskUnit, TaskUnitStatus
     from django.core.cache import cache
     from django.db import connections
 
@@ -154,12 +487,18 @@ def resume_pending_tasks():
         if cache.get(locked_celery_cache_key('resume_pending_tasks')): return
         cache.set(locked_celery_cache_key('resume_pending_tasks'), True, timeout=60 * 5)
 
-        pending_task_ids = list(TaskUnit.objects.filter(task_unit_status=TaskUnitStatus.PENDING)
-                                .values_list("id", flat=True)[:1000])
-        logger.log(logging.INFO, f"Celery: Found {len(pending_task_ids)} pending tasks.")
+        # 중복 TaskUnit은 대표 TaskUnit이 끝날 때 함께 처리됨
+        pending_task_ids = defaultdict(list)
+        for task_unit_id, batch_job_id in get_resumable_task_units()[:1000]:
+            pending_task_ids[batch_job_id].append(task_unit_id)
+        logger.log(logging.INFO,
+                   f"Celery: Found {sum(len(ids) for ids in pending_task_ids.values())} pending tasks.")
+
+        from tasks.dispatcher import enqueue_task_units
+        for batch_job_id, task_unit_ids in pending_task_ids.items():
+            enqueue_task_units(task_unit_ids, batch_job_id, priority=255)
 
-        for task_id in pending_task_ids:
-            process_task_unit.apply_async(args=[task_id], priority=255)
+        resolve_unresolved_duplicates()
 
     except Exception as e:
         logger.log(logging.INFO,
@@ -170,24 +509,123 @@ def resume_pending_tasks():
         connections.close_all()
 
 
-def notify_task_completion(batch_id, task_unit_id, status, result):
-    """ Celery 작업 완료 시 WebSocket으로 특정 TaskUnit 구독자에게 알림 전송 """
+@app.task
+def evict_response_cache():
+    """GPT_RESPONSE_CACHE_TTL_DAYS 동안 사용되지 않았거나 GPT_RESPONSE_CACHE_MAX_ENTRIES를 넘는 캐시 삭제"""
+    from django.core.cache import cache
+    from django.db import connections
+    from backend import settings
+
+    try:
+        if cache.get(locked_celery_cache_key('evict_response_cache')): return
+        cache.set(locked_celery_cache_key('evict_response_cache'), True, timeout=60 * 5)
+
+        evict_cached_responses(settings.GPT_RESPONSE_CACHE_MAX_ENTRIES, settings.GPT_RESPONSE_CACHE_TTL_DAYS)
+
+    except Exception as e:
+        logger.log(logging.INFO,
+                   f"Celery: Unknown Error: {str(e)}")
+
+    finally:
+        cache.delete(locked_celery_cache_key('evict_response_cache'))
+        connections.close_all()
+
+
+def finish_batch_job(batch_job_id):
+    """
+    마지막 TaskUnit이 끝났을 때 BatchJob을 COMPLETED 또는 FAILED로 전환하고 WebSocket으로 알림
+    아직 파일을 읽으며 TaskUnit을 등록하는 중이라면, 등록이 끝난 뒤 process_batch_job에서 다시 호출
+    :return: 전환했다면 True
+    """
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.utils import timezone
+    from api.models import BatchJob, BatchJobStatus
+
+    if cache.get(batch_job_celery_cache_key(batch_job_id)):
+        return False
+
+    counters = get_job_counters(batch_job_id)
+    if counters['outstanding'] > 0:
+        return False
+
+    new_status = BatchJobStatus.FAILED if counters['failed'] > 0 else BatchJobStatus.COMPLETED
+
+    with transaction.atomic():
+        batch_job = BatchJob.objects.select_for_update().filter(id=batch_job_id).first()
+        if not batch_job or batch_job.batch_job_status not in [BatchJobStatus.IN_PROGRESS, BatchJobStatus.FAILED]:
+            return False
+        if batch_job.batch_job_status == new_status:
+            return False
+
+        if batch_job.batch_job_status == BatchJobStatus.FAILED:
+            # 실패한 TaskUnit이 재시도로 완료된 경우
+            batch_job.set_status(BatchJobStatus.IN_PROGRESS)
+        batch_job.set_status(new_status)
+        batch_job.completed_at = timezone.now()
+        batch_job.save()
+
+    logger.log(logging.INFO, f"Celery: The job with ID {batch_job_id} has been marked as "
+                             f"{batch_job.get_batch_job_status_display()}. ({batch_job.elapsed_time}s)")
+
+    notify_job_completion(batch_job, counters)
+    return True
+
+
+def job_status_event(batch_job, counters):
+    """ WebSocket 그룹에 전송할 BatchJob 상태 이벤트 생성 """
+    return {
+        "type": "job_status",  # 메시지 타입
+        "batch_id": batch_job.id,
+        "status": batch_job.get_batch_job_status_display(),
+        "elapsed_time": batch_job.elapsed_time,
+        "counters": counters,
+    }
+
+
+def notify_job_completion(batch_job, counters):
+    """ BatchJob이 끝났을 때 WebSocket으로 작업 구독자에게 알림 전송 """
     from asgiref.sync import async_to_sync
 
-    event_data = {
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f"batch_{batch_job.id}",  # 그룹 이름
+        job_status_event(batch_job, counters)
+    )
+
+    logger.log(logging.INFO, f"Celery: Batch job with ID {batch_job.id}'s status sent to Clients.")
+
+
+def task_status_event(batch_id, task_unit_id, status, result):
+    """ WebSocket 그룹에 전송할 TaskUnit 상태 이벤트 생성 """
+    return {
+        "type": "task_status",  # 메시지 타입
         "batch_id": batch_id,
         "task_unit_id": task_unit_id,
         "status": status,
         "result": result,
     }
 
+
+def notify_task_completion(batch_id, task_unit_id, status, result):
+    """ Celery 작업 완료 시 WebSocket으로 특정 TaskUnit 구독자에게 알림 전송 """
+    from asgiref.sync import async_to_sync
+
     channel_layer = get_channel_layer()
     async_to_sync(channel_layer.group_send)(
         f"batch_{batch_id}",  # 그룹 이름
-        {
-            "type": "task_status",  # 메시지 타입
-            **event_data  # 전송할 데이터
-        }
+        task_status_event(batch_id, task_unit_id, status, result)
+    )
+
+    logger.log(logging.INFO, f"Celery: Batch job with ID {batch_id}'s {task_unit_id} tasks sent to Clients.")
+
+
+async def notify_task_completion_async(batch_id, task_unit_id, status, result):
+    """ 이벤트 루프 안에서 WebSocket으로 특정 TaskUnit 구독자에게 알림 전송 """
+    channel_layer = get_channel_layer()
+    await channel_layer.group_send(
+        f"batch_{batch_id}",  # 그룹 이름
+        task_status_event(batch_id, task_unit_id, status, result)
     )
 
     logger.log(logging.INFO, f"Celery: Batch job with ID {batch_id}'s {task_unit_id} tasks sent to Clients.")
@@ -0,0 +1,163 @@
+# tasks/queue_task_units_async.py
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from celery import shared_task
+from openai import RateLimitError
+
+from api.utils.gpt_processor.concurrency_controller import get_concurrency_controller, ConcurrencySignal, \
+    get_error_signal
+from api.utils.gpt_processor.gpt_clients import create_async_gpt_client
+from api.utils.gpt_processor.rate_limiter import get_rate_limiter, estimate_tokens, get_retry_after
+from tasks.queue_task_units import start_task_unit, build_request_kwargs, complete_task_unit, fail_task_unit, \
+    notify_task_completion_async, normalize_response, get_response_from_cache, save_response_to_cache, \
+    resolve_duplicate_task_units
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=1)
+def dispatch_task_units(self, task_unit_ids, batch_job_id=None):
+    """
+    여러 TaskUnit을 하나의 Celery 작업에서 asyncio로 동시에 요청
+    하나의 HTTP 연결 풀을 공유하며 최대 ASYNC_DISPATCH_MAX_IN_FLIGHT개의 요청을 유지
+    여러 TaskUnit을 함께 처리하므로 TaskUnit별로 취소할 수 없도록 Celery 작업 id를 등록하지 않음
+    process_task_unit과 같이 실패한 TaskUnit만 모아 한 번 더 요청
+    """
+    from django.db import connections
+    from backend import settings
+
+    logger.info(f"Celery: {len(task_unit_ids)} tasks are detected by the async dispatcher.")
+
+    try:
+        failed_ids = asyncio.run(dispatch(task_unit_ids, batch_job_id,
+                                          max_in_flight=settings.ASYNC_DISPATCH_MAX_IN_FLIGHT,
+                                          retry=self.request.retries > 0))
+
+    finally:
+        connections.close_all()
+
+    if failed_ids and self.request.retries < self.max_retries:
+        raise self.retry(args=[failed_ids, batch_job_id], countdown=10)
+
+
+async def dispatch(task_unit_ids, batch_job_id, max_in_flight, retry=False):
+    """
+    TaskUnit을 max_in_flight개까지 동시에 요청
+    :param retry: 재시도라면 이전 시도에서 FAILED로 저장된 TaskUnit을 다시 요청
+    :return: 실패한 task_unit_id 목록
+    """
+    from django.db import connections
+
+    semaphore = asyncio.Semaphore(max_in_flight)
+    client = create_async_gpt_client(company="openai",
+                                     max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    try:
+        results = await asyncio.gather(
+            *(process_task_unit_async(client, semaphore, task_unit_id, batch_job_id, retry)
+              for task_unit_id in task_unit_ids),
+            return_exceptions=True,
+        )
+
+        failed_ids = []
+        for task_unit_id, result in zip(task_unit_ids, results):
+            if isinstance(result, Exception):
+                logger.log(logging.ERROR,
+                           f"Celery: Unknown Error while dispatching {task_unit_id}: {str(result)}")
+            if result is False or isinstance(result, Exception):
+                failed_ids.append(task_unit_id)
+
+        return failed_ids
+
+    finally:
+        await client.close()
+        await sync_to_async(connections.close_all)()
+
+
+async def process_task_unit_async(client, semaphore, task_unit_id, batch_job_id=None, retry=False):
+    """
+    process_task_unit과 동일한 상태 전환, TaskUnitResponse 저장, WebSocket 알림을 비동기로 수행
+    :return: 실패했다면 False
+    """
+    async with semaphore:
+        start_time = time.time()
+        task_unit = None
+        batch_job = None
+
+        try:
+            task_unit, batch_job = await sync_to_async(start_task_unit)(task_unit_id, batch_job_id, retry)
+            if not task_unit:
+                return
+
+            logger.info(f"Celery: The task with ID {task_unit_id} is being started.")
+
+            request_kwargs = await sync_to_async(build_request_kwargs)(task_unit, batch_job)
+            cache_key, response_data = await sync_to_async(get_response_from_cache)(request_kwargs)
+            is_cached = response_data is not None
+
+            if not is_cached:
+                response_data = normalize_response(await request_chat_completion_async(client, request_kwargs))
+                await sync_to_async(save_response_to_cache)(cache_key, request_kwargs, response_data)
+
+            result = await sync_to_async(complete_task_unit)(batch_job, task_unit, response_data, start_time,
+                                                             is_cached=is_cached)
+
+            await notify_task_completion_async(batch_job.id, task_unit_id, task_unit.get_task_unit_status_display(),
+                                               result)
+            logger.log(logging.INFO, f"Celery: The request for {task_unit_id} has been completed.")
+
+        except Exception as e:
+            logger.log(logging.INFO,
+                       f"Celery: The request for {task_unit_id} has failed for the following reason: {str(e)}")
+
+            if batch_job and task_unit:
+                await sync_to_async(fail_task_unit)(batch_job, task_unit, e, start_time)
+                await notify_task_completion_async(batch_job.id, task_unit_id,
+                                                   task_unit.get_task_unit_status_display(), str(e))
+                await sync_to_async(resolve_duplicate_task_units)(batch_job, task_unit)
+
+            return False
+
+        else:
+            await sync_to_async(resolve_duplicate_task_units)(batch_job, task_unit)
+
+
+async def request_chat_completion_async(client, request_kwargs):
+    """
+    request_chat_completion과 같은 Rate Limit 규칙으로 비동기 요청
+    Rate Limiter, Concurrency Controller는 동기 Redis 클라이언트를 사용하므로 스레드에서 호출
+    """
+    from backend import settings
+
+    rate_limiter = get_rate_limiter()
+    concurrency_controller = get_concurrency_controller()
+    model = request_kwargs['model']
+    estimated_tokens = estimate_tokens(request_kwargs)
+
+    for attempt in range(settings.GPT_RATE_LIMIT_MAX_RETRIES + 1):
+        await rate_limiter.acquire_async(model, estimated_tokens)
+        lease_id = await concurrency_controller.acquire_async(model) if concurrency_controller else None
+        started_at = time.time()
+        signal = ConcurrencySignal.SUCCESS
+
+        try:
+            response = await client.chat.completions.create(**request_kwargs)
+        except Exception as e:
+            signal = get_error_signal(e)
+            if not isinstance(e, RateLimitError) or attempt >= settings.GPT_RATE_LIMIT_MAX_RETRIES:
+                raise
+            retry_after = get_retry_after(e, settings.GPT_RATE_LIMIT_DEFAULT_RETRY_AFTER)
+            logger.log(logging.INFO, f"Celery: Rate limited by the provider for {model}. Retry after {retry_after}s.")
+            await asyncio.to_thread(rate_limiter.penalize, model, retry_after)
+            continue
+        finally:
+            if lease_id:
+                await asyncio.to_thread(concurrency_controller.release, model, lease_id, time.time() - started_at,
+                                        signal)
+
+        if response.usage:
+            await asyncio.to_thread(rate_limiter.adjust, model, response.usage.total_tokens - estimated_tokens)
+        return response
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.utils.cache_keys import batch_job_celery_cache_key
+from tasks.dispatcher import enqueue_task_units, DispatchMode, wait_for_broker_capacity
+from tasks.queue_task_units import process_task_unit, process_task_units
+from tasks.queue_task_units_async import dispatch_task_units
+
+
+@mock.patch('tasks.dispatcher.publish_messages')
+class EnqueueTaskUnitsTest(SimpleTestCase):
+    @mock.patch('backend.settings.TASK_UNIT_MICRO_BATCH_SIZE', 1)
+    @mock.patch('backend.settings.TASK_UNIT_DISPATCH_MODE', DispatchMode.CELERY)
+    def test_one_message_per_task_unit(self, publish_messages):
+        enqueue_task_units([1, 2, 3], 7)
+        publish_messages.assert_called_once_with(
+            [(process_task_unit, [1, 7]), (process_task_unit, [2, 7]), (process_task_unit, [3, 7])], priority=None)
+
+    @mock.patch('backend.settings.TASK_UNIT_MICRO_BATCH_SIZE', 2)
+    @mock.patch('backend.settings.TASK_UNIT_DISPATCH_MODE', DispatchMode.CELERY)
+    def test_micro_batch(self, publish_messages):
+        enqueue_task_units([1, 2, 3], 7, priority=255)
+        publish_messages.assert_called_once_with(
+            [(process_task_units, [[1, 2], 7]), (process_task_units, [[3], 7])], priority=255)
+
+    @mock.patch('backend.settings.ASYNC_DISPATCH_BATCH_SIZE', 2)
+    @mock.patch('backend.settings.TASK_UNIT_DISPATCH_MODE', DispatchMode.ASYNC)
+    def test_async_dispatcher(self, publish_messages):
+        enqueue_task_units([1, 2, 3], 7)
+        publish_messages.assert_called_once_with(
+            [(dispatch_task_units, [[1, 2], 7]), (dispatch_task_units, [[3], 7])], priority=None)
+
+
+@mock.patch('tasks.dispatcher.time.sleep')
+class WaitForBrokerCapacityTest(SimpleTestCase):
+    @mock.patch('backend.settings.DISPATCH_MAX_QUEUE_DEPTH', 10)
+    @mock.patch('tasks.dispatcher.get_broker_queue_depth', side_effect=[10, 20, 5])
+    def test_ingestion_flag_is_refreshed_while_waiting(self, get_broker_queue_depth, sleep):
+        with mock.patch('django.core.cache.cache') as cache:
+            wait_for_broker_capacity(7)
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(cache.touch.call_count, 2)
+        self.assertEqual(cache.touch.call_args.args, (batch_job_celery_cache_key(7),))
@@ -0,0 +1,335 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from api.models import BatchJob, BatchJobStatus, TaskUnit, TaskUnitFiles, TaskUnitResponse, TaskUnitStatus
+from api.utils.cache_keys import task_unit_celery_cache_key, file_index_celery_cache_key
+from api.utils.job_deletion import delete_batch_job
+from api.utils.files_processor.base_processor import ResultType, get_content_hash
+from api.utils.files_processor.csv_processor import CSVProcessor
+from api.utils.job_status_utils import get_dedup_summary, get_job_counters, count_job_counters
+from tasks.queue_batch_job_process import bulk_handle_request_data, iter_chunks, dispatch_request_data, \
+    get_existing_task_units, index_file_metadata
+from tasks.queue_task_units import complete_task_unit, resolve_duplicate_task_units, build_request_kwargs, \
+    start_task_unit, get_unresolved_duplicate_primaries, resolve_unresolved_duplicates, get_resumable_task_units
+from users.models import User
+
+
+class BulkHandleRequestDataTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(self.media_root.cleanup)
+
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    def test_iter_chunks(self):
+        self.assertEqual(list(iter_chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_iter_chunks_flushes_after_max_wait(self):
+        self.assertEqual(list(iter_chunks(range(3), 100, max_wait=0)), [[0], [1], [2]])
+
+    def test_task_units_are_created_in_order(self):
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [
+            (1, "first", ResultType.TEXT, None),
+            (2, "second", ResultType.IMAGE, [b"image1", b"image2"]),
+        ])
+
+        task_units = TaskUnit.objects.filter(id__in=task_unit_ids).order_by('unit_index')
+        self.assertEqual([task_unit.id for task_unit in task_units], task_unit_ids)
+        self.assertEqual([task_unit.text_data for task_unit in task_units], ["first", "second"])
+        self.assertEqual(TaskUnitFiles.objects.filter(task_unit_id=task_unit_ids[1]).count(), 2)
+
+    def test_images_are_stored_as_files(self):
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [
+            (1, "describe", ResultType.IMAGE, [b"image1", b"image2"]),
+        ])
+
+        task_unit_files = list(TaskUnitFiles.objects.filter(task_unit_id=task_unit_ids[0]).order_by('id'))
+        self.assertTrue(all(task_unit_file.file_data for task_unit_file in task_unit_files))
+        self.assertIsNone(task_unit_files[0].base64_image_data)
+        self.assertTrue(os.path.isfile(task_unit_files[0].file_data.path))
+
+        # base64는 요청을 만들 때에만 변환
+        request_kwargs = build_request_kwargs(TaskUnit.objects.get(id=task_unit_ids[0]), self.batch_job)
+        image_urls = [item['image_url']['url'] for item in request_kwargs['messages'][0]['content'][1:]]
+        self.assertEqual(image_urls, ["data:image/jpeg;base64,aW1hZ2Ux", "data:image/jpeg;base64,aW1hZ2Uy"])
+
+    def test_legacy_base64_rows_are_still_readable(self):
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [(1, "describe", ResultType.IMAGE, [])])
+        task_unit_file = TaskUnitFiles.objects.create(task_unit_id=task_unit_ids[0], batch_job=self.batch_job,
+                                                     base64_image_data="aW1hZ2Ux")
+
+        self.assertEqual(task_unit_file.get_base64_data(), "aW1hZ2Ux")
+
+    def test_existing_task_units_are_updated(self):
+        first_ids = bulk_handle_request_data(self.batch_job, [
+            (1, "before", ResultType.IMAGE, [b"image1"]),
+        ])
+        old_file_path = TaskUnitFiles.objects.get(task_unit_id=first_ids[0]).file_data.path
+        TaskUnit.objects.filter(id__in=first_ids).update(task_unit_status=TaskUnitStatus.FAILED, is_valid=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second_ids = bulk_handle_request_data(self.batch_job, [
+                (1, "after", ResultType.TEXT, None),
+            ])
+
+        task_unit = TaskUnit.objects.get(id=second_ids[0])
+        self.assertEqual(first_ids, second_ids)
+        self.assertEqual(task_unit.text_data, "after")
+        self.assertEqual(task_unit.task_unit_status, TaskUnitStatus.PENDING)
+        self.assertTrue(task_unit.is_valid)
+        self.assertFalse(TaskUnitFiles.objects.filter(task_unit=task_unit).exists())
+        self.assertFalse(os.path.exists(old_file_path))
+
+    def test_empty_prompt(self):
+        with self.assertRaises(ValueError):
+            bulk_handle_request_data(self.batch_job, [(1, " ", ResultType.TEXT, None)])
+
+
+class PromptDeduplicationTest(TestCase):
+    response_data = {
+        "Company": 'openai',
+        "Version": 'v1.0',
+        "Model": 'gpt-4o-mini',
+        "Token": 20,
+        "Result": {"choices": [{"message": {"content": "answer"}}]},
+    }
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    @mock.patch('tasks.queue_task_units.notify_task_completion')
+    @mock.patch('tasks.queue_batch_job_process.enqueue_task_units')
+    @mock.patch('tasks.queue_batch_job_process.wait_for_broker_capacity')
+    def test_duplicated_prompts_are_requested_once(self, wait_for_broker_capacity, enqueue_task_units,
+                                                   notify_task_completion):
+        primary_ids = {}
+        dispatch_request_data(self.batch_job, [
+            (1, "same", ResultType.TEXT, None),
+            (2, "other", ResultType.TEXT, None),
+            (3, "same", ResultType.TEXT, None),
+        ], primary_ids)
+        dispatch_request_data(self.batch_job, [
+            (4, "same", ResultType.TEXT, None),
+        ], primary_ids)
+
+        dispatched_ids = [task_unit_id for call in enqueue_task_units.call_args_list for task_unit_id in call.args[0]]
+        self.assertEqual(len(dispatched_ids), 2)
+        self.assertEqual(get_dedup_summary(self.batch_job.id)['dedup_ratio'], 0.5)
+
+        # 등록하면서 누적한 카운터는 테이블로 다시 계산한 값과 같음
+        self.assertEqual(get_job_counters(self.batch_job.id), count_job_counters(self.batch_job.id))
+
+        primary, _ = start_task_unit(TaskUnit.objects.get(batch_job=self.batch_job, unit_index=1).id, self.batch_job.id)
+        complete_task_unit(self.batch_job, primary, self.response_data, time.time())
+        resolve_duplicate_task_units(self.batch_job, primary)
+
+        duplicates = TaskUnit.objects.filter(batch_job=self.batch_job, unit_index__in=[3, 4])
+        self.assertTrue(all(task_unit.task_unit_status == TaskUnitStatus.COMPLETED for task_unit in duplicates))
+        self.assertTrue(all(task_unit.latest_response.is_cached for task_unit in duplicates))
+        self.assertEqual(notify_task_completion.call_count, 2)
+
+        # 다시 등록된 TaskUnit은 더 이상 대표를 가리키지 않음
+        dispatch_request_data(self.batch_job, [(3, "changed", ResultType.TEXT, None)])
+        self.assertEqual(get_job_counters(self.batch_job.id)['duplicated'], 1)
+        self.assertEqual(get_job_counters(self.batch_job.id), count_job_counters(self.batch_job.id))
+
+    @mock.patch('tasks.queue_task_units.notify_task_completion')
+    @mock.patch('tasks.queue_batch_job_process.enqueue_task_units')
+    @mock.patch('tasks.queue_batch_job_process.wait_for_broker_capacity')
+    def test_unresolved_duplicates_are_resolved_later(self, wait_for_broker_capacity, enqueue_task_units,
+                                                      notify_task_completion):
+        dispatch_request_data(self.batch_job, [(1, "same", ResultType.TEXT, None),
+                                               (2, "same", ResultType.TEXT, None)], {})
+
+        # 대표 TaskUnit은 끝났지만 중복 TaskUnit은 아직 복사하지 못함
+        primary, _ = start_task_unit(TaskUnit.objects.get(batch_job=self.batch_job, unit_index=1).id, self.batch_job.id)
+        complete_task_unit(self.batch_job, primary, self.response_data, time.time())
+        self.assertEqual(list(get_unresolved_duplicate_primaries()), [(self.batch_job.id, primary.id)])
+
+        self.assertEqual(resolve_unresolved_duplicates(), 1)
+
+        duplicate = TaskUnit.objects.get(batch_job=self.batch_job, unit_index=2)
+        self.assertEqual(duplicate.task_unit_status, TaskUnitStatus.COMPLETED)
+        self.assertEqual(list(get_unresolved_duplicate_primaries()), [])
+
+
+class IncrementalRerunTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    @mock.patch('tasks.queue_batch_job_process.enqueue_task_units')
+    @mock.patch('tasks.queue_batch_job_process.wait_for_broker_capacity')
+    def test_only_changed_or_failed_units_are_dispatched(self, wait_for_broker_capacity, enqueue_task_units):
+        request_data = [(index, f"prompt {index}", ResultType.TEXT, None) for index in range(1, 5)]
+        dispatch_request_data(self.batch_job, request_data)
+        TaskUnit.objects.filter(batch_job=self.batch_job).update(task_unit_status=TaskUnitStatus.COMPLETED)
+        TaskUnit.objects.filter(batch_job=self.batch_job, unit_index=2).update(task_unit_status=TaskUnitStatus.FAILED)
+        enqueue_task_units.reset_mock()
+
+        existing_units = get_existing_task_units(self.batch_job)
+        request_data[2] = (3, "changed", ResultType.TEXT, None)
+        dispatch_request_data(self.batch_job, request_data[:3], existing_units=existing_units)
+
+        dispatched = TaskUnit.objects.filter(id__in=enqueue_task_units.call_args.args[0])
+        self.assertEqual(sorted(dispatched.values_list('unit_index', flat=True)), [2, 3])
+        self.assertEqual([unit_index for unit_index in existing_units], [4])
+
+    @mock.patch('tasks.queue_batch_job_process.enqueue_task_units')
+    @mock.patch('tasks.queue_batch_job_process.wait_for_broker_capacity')
+    def test_invalidated_units_are_not_requested(self, wait_for_broker_capacity, enqueue_task_units):
+        dispatch_request_data(self.batch_job, [(1, "prompt 1", ResultType.TEXT, None),
+                                               (2, "prompt 2", ResultType.TEXT, None)])
+        valid, invalid = TaskUnit.objects.filter(batch_job=self.batch_job).order_by('unit_index')
+        TaskUnit.objects.filter(id=invalid.id).update(is_valid=False)
+
+        # 취소되지 않는 Micro-batch 메시지나 resume_pending_tasks로 다시 전달되어도 요청하지 않음
+        self.assertEqual(start_task_unit(invalid.id, self.batch_job.id), (None, None))
+        self.assertEqual(TaskUnit.objects.get(id=invalid.id).task_unit_status, TaskUnitStatus.PENDING)
+        self.assertEqual(list(get_resumable_task_units()), [(valid.id, self.batch_job.id)])
+
+
+class BatchJobDeletionTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root.name, BATCH_JOB_DELETE_CHUNK_SIZE=2)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(self.media_root.cleanup)
+
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+        self.other_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    @mock.patch('tasks.celery.app.control.revoke')
+    def test_rows_and_files_are_deleted(self, revoke):
+        from django.core.cache import cache
+
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [
+            (index, "describe", ResultType.IMAGE, [b"image"]) for index in range(1, 6)
+        ])
+        other_ids = bulk_handle_request_data(self.other_job, [(1, "describe", ResultType.IMAGE, [b"image"])])
+        TaskUnitResponse.objects.create(batch_job=self.batch_job, task_unit_id=task_unit_ids[0], task_unit_index=1,
+                                        task_response_status=TaskUnitStatus.COMPLETED)
+
+        file_path = TaskUnitFiles.objects.filter(task_unit_id=task_unit_ids[0]).first().file_data.path
+        cache.set_many({task_unit_celery_cache_key(task_unit_ids[0]): "celery-1",
+                        task_unit_celery_cache_key(task_unit_ids[1]): "celery-1"})
+
+        # DELETING으로 표시되지 않은 BatchJob은 삭제하지 않음
+        self.assertFalse(delete_batch_job(self.batch_job.id))
+
+        BatchJob.objects.filter(id=self.batch_job.id).update(batch_job_status=BatchJobStatus.DELETING)
+        self.assertTrue(delete_batch_job(self.batch_job.id))
+
+        revoke.assert_called_once_with(["celery-1"], terminate=True)
+        self.assertFalse(BatchJob.objects.filter(id=self.batch_job.id).exists())
+        self.assertFalse(TaskUnit.objects.filter(batch_job_id=self.batch_job.id).exists())
+        self.assertFalse(TaskUnitFiles.objects.filter(batch_job_id=self.batch_job.id).exists())
+        self.assertFalse(TaskUnitResponse.objects.filter(batch_job_id=self.batch_job.id).exists())
+        self.assertFalse(os.path.exists(file_path))
+
+        self.assertEqual(list(TaskUnit.objects.filter(batch_job=self.other_job).values_list('id', flat=True)),
+                         other_ids)
+        self.assertEqual(TaskUnitFiles.objects.filter(batch_job=self.other_job).count(), 1)
+
+
+class FileIndexTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.media_root = tempfile.TemporaryDirectory()
+        media_settings = override_settings(MEDIA_ROOT=self.media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.addCleanup(self.media_root.cleanup)
+
+        data = "이름;점수\n김철수;90\n이영희;85\n".encode('cp949')
+        file = SimpleUploadedFile("test.csv", data)
+        file_metadata = CSVProcessor().sniff(file)
+        file_metadata['content_hash'], file_metadata['file_size'] = get_content_hash(file)
+
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, file=file, file_metadata=file_metadata)
+
+    def test_failed_index_is_rebuilt(self):
+        from django.core.cache import cache
+
+        cache.set(file_index_celery_cache_key(self.batch_job.id), True)
+        # 테스트 트랜잭션의 연결을 닫지 않도록 close_all 대체
+        with mock.patch('api.utils.files_processor.file_settings.FileSettings.get_metadata',
+                        side_effect=ValueError("failed")), mock.patch('django.db.connections.close_all'):
+            index_file_metadata.apply(args=[self.batch_job.id])
+
+        batch_job = BatchJob.objects.get(id=self.batch_job.id)
+        self.assertIsNone(batch_job.file_metadata['total_size'])
+
+        # 계산 중 표시가 지워졌으므로 업로드 시 찾은 dialect로 다시 계산
+        self.assertEqual(batch_job.get_size(), 2)
+        self.assertEqual(BatchJob.objects.get(id=self.batch_job.id).file_metadata['dialect']['encoding'], "cp949")
+
+    def test_index(self):
+        with mock.patch('django.db.connections.close_all'):
+            index_file_metadata.apply(args=[self.batch_job.id])
+
+        self.assertEqual(BatchJob.objects.get(id=self.batch_job.id).file_metadata['total_size'], 2)
+
+    def test_index_of_replaced_file_is_not_saved(self):
+        from django.core.cache import cache
+
+        # 같은 이름의 다른 파일이 업로드되면 같은 경로에 저장되므로 내용 해시로 구분
+        BatchJob.objects.filter(id=self.batch_job.id).update(
+            file_metadata={**self.batch_job.file_metadata, 'content_hash': "replaced"})
+        cache.set(file_index_celery_cache_key(self.batch_job.id), True)
+
+        with mock.patch('django.db.connections.close_all'):
+            index_file_metadata.apply(args=[self.batch_job.id])
+
+        file_metadata = BatchJob.objects.get(id=self.batch_job.id).file_metadata
+        self.assertEqual(file_metadata['content_hash'], "replaced")
+        self.assertIsNone(file_metadata['total_size'])
+
+    def test_config_update_keeps_index(self):
+        from django.urls import reverse
+
+        # 색인이 끝나기 전에 읽어 둔 BatchJob으로 설정을 저장
+        stale_job = BatchJob.objects.get(id=self.batch_job.id)
+        stale_job.batch_job_status = BatchJobStatus.UPLOADED
+        with mock.patch('django.db.connections.close_all'):
+            index_file_metadata.apply(args=[self.batch_job.id])
+
+        self.client.force_login(self.batch_job.user)
+        with mock.patch('api.views.get_cache_or_database', return_value=stale_job), \
+                mock.patch('api.utils.files_processor.file_settings.FileSettings.get_metadata') as get_metadata:
+            response = self.client.patch(reverse('api:batch-job-configs', args=[self.batch_job.id]),
+                                         {"gpt_model": "gpt-4o-mini"}, content_type="application/json")
+
+        # 색인 결과를 덮어쓰지 않으므로 요청 안에서 파일을 다시 읽지 않음
+        get_metadata.assert_not_called()
+        self.assertEqual(response.json()['total_size'], 2)
+        batch_job = BatchJob.objects.get(id=self.batch_job.id)
+        self.assertEqual(batch_job.configs, {"gpt_model": "gpt-4o-mini"})
+        self.assertEqual(batch_job.file_metadata['total_size'], 2)
+
+    def test_index_in_flight_is_not_rebuilt(self):
+        from django.core.cache import cache
+
+        cache.set(file_index_celery_cache_key(self.batch_job.id), True)
+        with mock.patch('api.utils.files_processor.file_settings.FileSettings.get_metadata') as get_metadata:
+            self.assertIsNone(self.batch_job.get_size())
+
+        get_metadata.assert_not_called()
@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, SimpleTestCase
+from django.utils import timezone
+
+from django.core.cache import cache
+
+from api.models import BatchJob, BatchJobStatus, TaskUnit, TaskUnitResponse, TaskUnitStatus, GPTResponseCache
+from api.utils.cache_keys import task_unit_celery_cache_key
+from api.utils.files_processor.base_processor import ResultType
+from api.utils.gpt_processor.concurrency_controller import AIMDConcurrencyController
+from api.utils.gpt_processor.rate_limiter import TokenBucketRateLimiter, LocalBucketStore
+from api.utils.gpt_processor.response_cache import get_response_cache_key, evict_cached_responses
+from api.utils.job_status_utils import get_job_counters, count_job_counters, add_job_counters, \
+    reconcile_job_counters
+from tasks.queue_batch_job_process import bulk_handle_request_data, dispatch_request_data, \
+    reconcile_job_counters as reconcile_job_counters_task
+from tasks.queue_task_units import run_task_unit, build_request_kwargs, start_task_unit, complete_task_unit, \
+    fail_task_unit, process_task_unit, process_task_units
+from tasks.queue_task_units_async import request_chat_completion_async
+from users.models import User
+
+
+class ResponseCacheTest(TestCase):
+    response_data = {
+        "Company": 'openai',
+        "Version": 'v1.0',
+        "Model": 'gpt-4o-mini',
+        "Token": 20,
+        "Result": {"choices": [{"message": {"content": "cached"}}]},
+    }
+
+    def setUp(self):
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    def create_task_unit(self, unit_index, text_data):
+        return TaskUnit.objects.create(batch_job=self.batch_job, unit_index=unit_index, text_data=text_data)
+
+    def test_cache_key(self):
+        request_kwargs = build_request_kwargs(self.create_task_unit(1, "hello"), self.batch_job)
+
+        self.assertEqual(get_response_cache_key(request_kwargs), get_response_cache_key(dict(request_kwargs)))
+        self.assertNotEqual(get_response_cache_key(request_kwargs),
+                            get_response_cache_key({**request_kwargs, "max_tokens": 100}))
+
+    @mock.patch('tasks.queue_task_units.notify_task_completion')
+    @mock.patch('tasks.queue_task_units.get_gpt_client')
+    def test_cache_hit_skips_provider(self, get_gpt_client, notify_task_completion):
+        task_unit = self.create_task_unit(1, "hello")
+        GPTResponseCache.objects.create(
+            cache_key=get_response_cache_key(build_request_kwargs(task_unit, self.batch_job)),
+            gpt_model="gpt-4o-mini",
+            response_data=self.response_data,
+            last_used_at=timezone.now(),
+        )
+
+        run_task_unit(task_unit.id)
+
+        get_gpt_client.assert_not_called()
+        notify_task_completion.assert_called_once()
+
+        task_unit.refresh_from_db()
+        self.assertEqual(task_unit.task_unit_status, TaskUnitStatus.COMPLETED)
+        self.assertTrue(TaskUnitResponse.objects.get(task_unit=task_unit).is_cached)
+        self.assertEqual(GPTResponseCache.objects.get().hit_count, 1)
+
+    def test_evict_cached_responses(self):
+        now = timezone.now()
+        for index, days in enumerate([0, 1, 2, 40]):
+            GPTResponseCache.objects.create(cache_key=str(index), gpt_model="gpt-4o-mini",
+                                            response_data={}, last_used_at=now - timedelta(days=days))
+
+        self.assertEqual(evict_cached_responses(max_entries=2, ttl_days=30), 2)
+        self.assertEqual(sorted(GPTResponseCache.objects.values_list('cache_key', flat=True)), ["0", "1"])
+
+
+class JobCountersTest(TestCase):
+    response_data = {
+        "Company": 'openai',
+        "Version": 'v1.0',
+        "Model": 'gpt-4o-mini',
+        "Token": 20,
+        "Result": {"choices": [{"message": {"content": "answer"}}]},
+    }
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email="test@example.com", username="test", password="password1234")
+        self.batch_job = BatchJob.objects.create(user=user, configs={"gpt_model": "gpt-4o-mini"})
+
+    def test_counters_follow_status_changes(self):
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [
+            (index, f"prompt {index}", ResultType.TEXT, None) for index in range(1, 4)
+        ])
+        self.assertEqual(get_job_counters(self.batch_job.id)['pending'], 3)
+
+        # 다른 BatchJob의 파티션에서는 찾지 않음
+        self.assertEqual(start_task_unit(task_unit_ids[0], self.batch_job.id + 1), (None, None))
+        task_unit, _ = start_task_unit(task_unit_ids[0], self.batch_job.id)
+        complete_task_unit(self.batch_job, task_unit, self.response_data, time.time())
+        task_unit, _ = start_task_unit(task_unit_ids[1])
+        fail_task_unit(self.batch_job, task_unit, ValueError("error"), time.time())
+
+        counters = get_job_counters(self.batch_job.id)
+        self.assertEqual((counters['pending'], counters['in_progress'], counters['completed'], counters['failed']),
+                         (1, 0, 1, 1))
+        self.assertEqual(counters['total_tokens'], 20)
+        self.assertEqual(counters, count_job_counters(self.batch_job.id))
+
+        # 같은 unit_index를 다시 등록하면 이전 상태에서 PENDING으로 이동
+        bulk_handle_request_data(self.batch_job, [(1, "prompt 1", ResultType.TEXT, None)])
+        counters = get_job_counters(self.batch_job.id)
+        self.assertEqual((counters['pending'], counters['completed'], counters['failed']), (2, 0, 1))
+
+    def test_reconcile(self):
+        bulk_handle_request_data(self.batch_job, [(1, "prompt 1", ResultType.TEXT, None)])
+        get_job_counters(self.batch_job.id)
+        add_job_counters(self.batch_job.id, pending=5)
+
+        self.assertTrue(reconcile_job_counters(self.batch_job.id))
+        self.assertEqual(get_job_counters(self.batch_job.id)['pending'], 1)
+        self.assertFalse(reconcile_job_counters(self.batch_job.id))
+
+    @mock.patch('django.db.connections.close_all')
+    @mock.patch('tasks.queue_task_units.notify_job_completion')
+    def test_reconcile_finishes_job(self, notify_job_completion, close_all):
+        BatchJob.objects.filter(id=self.batch_job.id).update(batch_job_status=BatchJobStatus.IN_PROGRESS,
+                                                             started_at=timezone.now())
+        bulk_handle_request_data(self.batch_job, [(1, "prompt 1", ResultType.TEXT, None)])
+        get_job_counters(self.batch_job.id)
+
+        # 카운터를 옮기지 못한 채 TaskUnit이 끝난 경우
+        TaskUnit.objects.filter(batch_job=self.batch_job).update(task_unit_status=TaskUnitStatus.COMPLETED)
+        reconcile_job_counters_task()
+
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.batch_job_status, BatchJobStatus.COMPLETED)
+        notify_job_completion.assert_called_once()
+
+    @mock.patch('tasks.queue_task_units.notify_job_completion')
+    def test_last_task_unit_finishes_job(self, notify_job_completion):
+        BatchJob.objects.filter(id=self.batch_job.id).update(batch_job_status=BatchJobStatus.IN_PROGRESS,
+                                                             started_at=timezone.now())
+        task_unit_ids = bulk_handle_request_data(self.batch_job, [
+            (index, f"prompt {index}", ResultType.TEXT, None) for index in range(1, 3)
+        ])
+        get_job_counters(self.batch_job.id)
+
+        for task_unit_id in task_unit_ids:
+            self.batch_job.refresh_from_db()
+            self.assertEqual(self.batch_job.batch_job_status, BatchJobStatus.IN_PROGRESS)
+            task_unit, _ = start_task_unit(task_unit_id)
+            complete_task_unit(self.batch_job, task_unit, self.response_data, time.time())
+
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.batch_job_status, BatchJobStatus.COMPLETED)
+        self.assertIsNotNone(self.batch_job.elapsed_time)
+        notify_job_completion.assert_called_once()
+        self.assertEqual(notify_job_completion.call_args.args[1]['completed'], 2)
+
+    @mock.patch('django.db.connections.close_all')
+    @mock.patch('tasks.queue_task_units.notify_job_completion')
+    @mock.patch('tasks.queue_task_units.notify_task_completion')
+    @mock.patch('tasks.queue_task_units.get_gpt_client')
+    @mock.patch('tasks.queue_task_units.request_chat_completion')
+    @mock.patch('tasks.queue_batch_job_process.enqueue_task_units')
+    @mock.patch('tasks.queue_batch_job_process.wait_for_broker_capacity')
+    def test_failed_task_unit_is_retried(self, wait_for_broker_capacity, enqueue_task_units, request_chat_completion,
+                                         get_gpt_client, notify_task_completion, notify_job_completion, close_all):
+        BatchJob.objects.filter(id=self.batch_job.id).update(batch_job_status=BatchJobStatus.IN_PROGRESS,
+                                                             started_at=timezone.now())
+        dispatch_request_data(self.batch_job, [(1, "same", ResultType.TEXT, None),
+                                               (2, "same", ResultType.TEXT, None)], {})
+        primary = TaskUnit.objects.get(batch_job=self.batch_job, unit_index=1)
+
+        # 첫 요청은 일시적인 오류로 FAILED가 되고 중복 TaskUnit에도 실패가 복사된 뒤, 재시도에서 완료
+        request_chat_completion.side_effect = [RuntimeError("temporary"), mock.Mock()]
+        with mock.patch('tasks.queue_task_units.normalize_response', return_value=self.response_data):
+            process_task_unit.apply(args=[primary.id, self.batch_job.id])
+
+        self.assertEqual(request_chat_completion.call_count, 2)
+        self.assertEqual(
+            list(TaskUnit.objects.filter(batch_job=self.batch_job).order_by('unit_index')
+                 .values_list('task_unit_status', flat=True)),
+            [TaskUnitStatus.COMPLETED, TaskUnitStatus.COMPLETED])
+        counters = get_job_counters(self.batch_job.id)
+        self.assertEqual((counters['completed'], counters['failed']), (2, 0))
+        self.assertEqual(counters, count_job_counters(self.batch_job.id))
+
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.batch_job_status, BatchJobStatus.COMPLETED)
+
+        # 재시도가 아니라면 실패한 TaskUnit은 다시 처리하지 않음
+        TaskUnit.objects.filter(id=primary.id).update(task_unit_status=TaskUnitStatus.FAILED)
+        self.assertEqual(start_task_unit(primary.id, self.batch_job.id), (None, None))
+
+
+class CeleryTaskIdTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_single_unit_tasks_are_registered_for_revoke(self):
+        registered = {}
+
+        def run(task_unit_id, batch_job_id=None, retry=False):
+            registered[task_unit_id] = cache.get(task_unit_celery_cache_key(task_unit_id))
+
+        with mock.patch('tasks.queue_task_units.run_task_unit', side_effect=run):
+            process_task_unit.apply(args=[1, 7], task_id="single")
+            process_task_units.apply(args=[[2, 3], 7], task_id="micro-batch")
+
+        # Micro-batch 작업은 여러 TaskUnit을 처리하므로 TaskUnit별로 취소되지 않아야 함
+        self.assertEqual(registered, {1: "single", 2: None, 3: None})
+        self.assertIsNone(cache.get(task_unit_celery_cache_key(1)))
+
+    def test_failed_units_in_micro_batch_are_retried(self):
+        def run(task_unit_id, batch_job_id=None, retry=False):
+            if task_unit_id == 2:
+                raise RuntimeError("failed")
+
+        with mock.patch('tasks.queue_task_units.run_task_unit', side_effect=run) as run_task_unit:
+            process_task_units.apply(args=[[1, 2, 3], 7])
+
+        # 실패한 TaskUnit만 파티션 키와 함께 한 번 더 요청
+        self.assertEqual([call.args for call in run_task_unit.call_args_list], [(1, 7), (2, 7), (3, 7), (2, 7)])
+
+
+class AsyncRequestTest(SimpleTestCase):
+    def test_redis_calls_run_outside_event_loop(self):
+        threads = []
+
+        class RecordingStore(LocalBucketStore):
+            def update(self, key, func):
+                threads.append(threading.get_ident())
+                return super().update(key, func)
+
+        rate_limiter = TokenBucketRateLimiter(store=RecordingStore(), default_limits={'rpm': 60, 'tpm': 100000})
+        concurrency_controller = AIMDConcurrencyController(store=RecordingStore(), min_limit=1, max_limit=4,
+                                                           initial_limit=1, lease_timeout=60)
+        response = mock.Mock(usage=mock.Mock(total_tokens=10))
+        client = mock.Mock()
+        client.chat.completions.create = mock.AsyncMock(return_value=response)
+
+        async def request():
+            loop_thread = threading.get_ident()
+            await request_chat_completion_async(client, {"model": "gpt-4o-mini", "messages": []})
+            return loop_thread
+
+        with mock.patch('tasks.queue_task_units_async.get_rate_limiter', return_value=rate_limiter), \
+                mock.patch('tasks.queue_task_units_async.get_concurrency_controller',
+                           return_value=concurrency_controller):
+            loop_thread = asyncio.run(request())
+
+        # reserve, try_acquire, release, adjust 모두 이벤트 루프 스레드 밖에서 실행
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(loop_thread, threads)
@@ -69,6 +69,7 @@ export const BATCH_JOB_STATUS = {
     IN_PROGRESS: 'In Progress',
     COMPLETED: 'Completed',
     FAILED: 'Failed',
+    DELETING: 'Deleting',
 }
 
 
@@ -110,11 +111,11 @@ export function getJobLink(job) {
  * 즉, 모든 논리 연산은 return하기 전에 마쳐야한다.
  */
 export function shouldEditDisabled(status) {
-    return [BATCH_JOB_STATUS.PENDING, BATCH_JOB_STATUS.IN_PROGRESS].includes(status);
+    return [BATCH_JOB_STATUS.PENDING, BATCH_JOB_STATUS.IN_PROGRESS, BATCH_JOB_STATUS.DELETING].includes(status);
 }
 
 export function shouldDisableRunButton(batch_job_status) {
-    return [BATCH_JOB_STATUS.PENDING, BATCH_JOB_STATUS.IN_PROGRESS].includes(batch_job_status);
+    return [BATCH_JOB_STATUS.PENDING, BATCH_JOB_STATUS.IN_PROGRESS, BATCH_JOB_STATUS.DELETING].includes(batch_job_status);
 }
 
 export function canDownloadResultButton(batch_job_status) {